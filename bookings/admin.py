@@ -1,7 +1,23 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
-from .models import ExpertSlot, SlotRecurringPattern, Booking, InvestorSlot, InvestorBooking
+from calls.services.chat_state import invalidate_batch_membership
+from bookings.services.calendar import schedule_refresh
+from bookings.services.earnings import record_earnings
+from bookings.services.seat_holds import free_seats
+from bookings.services.slot_materializer import materialize_expert
+
+from .models import (
+    ExpertSlot, SlotRecurringPattern, Booking, BatchSeat, InvestorSlot, InvestorBooking,
+)
+
+
+def _calendar_days(queryset):
+    """
+    (expert_id, start_datetime) of ExpertSlots / Bookings, read before a bulk
+    .update() — the expert calendar summaries are refreshed by hand.
+    """
+    return list(queryset.values_list('expert_id', 'start_datetime'))
 
 
 # ─────────────────────────────────────────────
@@ -20,7 +36,7 @@ class ExpertSlotAdmin(admin.ModelAdmin):
     ordering = ('-start_datetime',)
     date_hierarchy = 'start_datetime'
 
-    readonly_fields = ('uuid', 'created_at', 'updated_at')
+    readonly_fields = ('uuid', 'pattern', 'created_at', 'updated_at')
 
     fieldsets = (
         ('Expert & Timing', {
@@ -30,7 +46,7 @@ class ExpertSlotAdmin(admin.ModelAdmin):
             'fields': ('chat_price', 'video_call_price', 'requires_approval', 'is_recurring', 'status'),
         }),
         ('System', {
-            'fields': ('uuid', 'created_at', 'updated_at'),
+            'fields': ('uuid', 'pattern', 'created_at', 'updated_at'),
             'classes': ('collapse',),
         }),
     )
@@ -45,12 +61,16 @@ class ExpertSlotAdmin(admin.ModelAdmin):
 
     @admin.action(description='Mark selected slots as ACTIVE')
     def mark_active(self, request, queryset):
+        days = _calendar_days(queryset)
         updated = queryset.update(status='ACTIVE')
+        schedule_refresh(days)
         self.message_user(request, f'{updated} slot(s) marked ACTIVE.')
 
     @admin.action(description='Mark selected slots as DISABLED')
     def mark_disabled(self, request, queryset):
+        days = _calendar_days(queryset)
         updated = queryset.update(status='DISABLED')
+        schedule_refresh(days)
         self.message_user(request, f'{updated} slot(s) marked DISABLED.')
 
 
@@ -63,7 +83,7 @@ class SlotRecurringPatternAdmin(admin.ModelAdmin):
     WEEKDAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
 
     list_display = (
-        'id', 'expert', 'weekday_name', 'start_time', 'end_time',
+        'id', 'expert', 'weekday_name', 'start_time', 'end_time', 'slot_mode',
         'start_date', 'end_date', 'is_active', 'created_at',
     )
     list_filter = ('is_active', 'weekday', 'start_date')
@@ -77,6 +97,12 @@ class SlotRecurringPatternAdmin(admin.ModelAdmin):
         ('Schedule', {
             'fields': ('weekday', 'start_time', 'end_time', 'start_date', 'end_date'),
         }),
+        ('Pricing & Mode', {
+            'fields': (
+                'slot_mode', 'chat_price', 'video_call_price',
+                'capacity', 'batch_price', 'requires_approval',
+            ),
+        }),
         ('Status', {'fields': ('is_active',)}),
         ('System', {
             'fields': ('uuid', 'created_at', 'updated_at'),
@@ -84,15 +110,33 @@ class SlotRecurringPatternAdmin(admin.ModelAdmin):
         }),
     )
 
+    actions = ['materialize_now']
+
     def weekday_name(self, obj):
         return self.WEEKDAY_NAMES[obj.weekday] if 0 <= obj.weekday <= 6 else obj.weekday
     weekday_name.short_description = 'Day'
 
+    @admin.action(description='Generate slots now for these experts')
+    def materialize_now(self, request, queryset):
+        created = 0
+        expert_ids = set(queryset.values_list('expert_id', flat=True))
+        for expert_id in expert_ids:
+            created += materialize_expert(expert_id)['created']
+        self.message_user(request, f'{created} slot(s) created for {len(expert_ids)} expert(s).')
+
 
 # ─────────────────────────────────────────────
 # BOOKING
 # ─────────────────────────────────────────────
 
+def _batch_pairs(queryset):
+    """
+    (slot_id, user_id) of batch bookings, read before a bulk .update() —
+    .update() skips post_save, so the call-chat access cache is cleared by hand.
+    """
+    return list(queryset.filter(is_batch=True).values_list('slot_id', 'user_id'))
+
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = (
@@ -175,33 +219,53 @@ class BookingAdmin(admin.ModelAdmin):
     @admin.action(description='Mark selected bookings as CONFIRMED')
     def mark_confirmed(self, request, queryset):
         now = timezone.now()
-        updated = queryset.filter(
-            status__in=['PENDING', 'AWAITING_PAYMENT', 'PAID']
-        ).update(status='CONFIRMED', confirmed_at=now)
+        qs = queryset.filter(status__in=['PENDING', 'AWAITING_PAYMENT', 'PAID'])
+        pairs = _batch_pairs(qs)
+        batch_ids = list(qs.filter(is_batch=True).values_list('id', flat=True))
+        days = _calendar_days(qs)
+        updated = qs.update(status='CONFIRMED', confirmed_at=now)
+        invalidate_batch_membership(pairs)
+        schedule_refresh(days)
+        BatchSeat.objects.filter(booking_id__in=batch_ids).update(held_until=None)
         self.message_user(request, f'{updated} booking(s) confirmed.')
 
     @admin.action(description='Mark selected bookings as COMPLETED')
     def mark_completed(self, request, queryset):
         now = timezone.now()
-        updated = queryset.filter(status='CONFIRMED').update(
-            status='COMPLETED', completed_at=now
-        )
+        qs = queryset.filter(status='CONFIRMED')
+        pairs = _batch_pairs(qs)
+        ids = list(qs.values_list('id', flat=True))
+        updated = qs.update(status='COMPLETED', completed_at=now)
+        invalidate_batch_membership(pairs)
+        record_earnings(ids)
         self.message_user(request, f'{updated} booking(s) completed.')
 
     @admin.action(description='Mark selected bookings as CANCELLED')
     def mark_cancelled(self, request, queryset):
         now = timezone.now()
-        updated = queryset.filter(
-            status__in=['PENDING', 'AWAITING_PAYMENT', 'PAID', 'CONFIRMED']
-        ).update(status='CANCELLED', cancelled_at=now)
+        qs = queryset.filter(status__in=['PENDING', 'AWAITING_PAYMENT', 'PAID', 'CONFIRMED'])
+        pairs = _batch_pairs(qs)
+        batch_ids = list(qs.filter(is_batch=True).values_list('id', flat=True))
+        days = _calendar_days(qs)
+        ids = list(qs.values_list('id', flat=True))
+        updated = qs.update(status='CANCELLED', cancelled_at=now)
+        invalidate_batch_membership(pairs)
+        schedule_refresh(days)
+        free_seats(batch_ids)
+        record_earnings(ids)
         self.message_user(request, f'{updated} booking(s) cancelled.')
 
     @admin.action(description='Mark selected bookings as EXPIRED')
     def mark_expired(self, request, queryset):
         now = timezone.now()
-        updated = queryset.filter(
-            status__in=['PENDING', 'AWAITING_PAYMENT']
-        ).update(status='EXPIRED', expired_at=now)
+        qs = queryset.filter(status__in=['PENDING', 'AWAITING_PAYMENT'])
+        pairs = _batch_pairs(qs)
+        batch_ids = list(qs.filter(is_batch=True).values_list('id', flat=True))
+        days = _calendar_days(qs)
+        updated = qs.update(status='EXPIRED', expired_at=now)
+        invalidate_batch_membership(pairs)
+        schedule_refresh(days)
+        free_seats(batch_ids)
         self.message_user(request, f'{updated} booking(s) expired.')
 
 
@@ -0,0 +1,129 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from bookings.models import Booking, ExpertSlot
+from bookings.services.conflicts import expert_conflicts, expert_conflicts_many, user_conflicts
+
+SEED_BATCH = 5000
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time slot / booking overlap checks against N synthetic slots of one expert "
+        "(and N bookings of one user): unbounded overlap scan vs services/conflicts.py, "
+        "single and batch. Runs inside a transaction that is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--slots", type=int, default=100_000)
+        parser.add_argument("--checks", type=int, default=500,
+                            help="Intervals checked per variant")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                expert, user = self._seed(options["slots"])
+                self._run(expert, user, options["checks"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count):
+        User = get_user_model()
+        tag = f"conflictbench{int(time.time())}"
+        expert = User.objects.create(username=f"{tag}_expert", email=f"{tag}_e@example.invalid")
+        user = User.objects.create(username=f"{tag}_user", email=f"{tag}_u@example.invalid")
+
+        # back to back 30-minute slots from two years ago onwards
+        self.origin = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(days=730)
+        started = time.monotonic()
+        for offset in range(0, count, SEED_BATCH):
+            slots = ExpertSlot.objects.bulk_create([
+                ExpertSlot(
+                    expert=expert,
+                    start_datetime=self.origin + timedelta(minutes=60 * n),
+                    end_datetime=self.origin + timedelta(minutes=60 * n + 30),
+                    duration_minutes=30,
+                    chat_price=Decimal("100"),
+                    status="ACTIVE",
+                )
+                for n in range(offset, min(offset + SEED_BATCH, count))
+            ])
+            if not slots[0].pk:  # backends that don't return ids from bulk_create
+                slots = list(ExpertSlot.objects.filter(
+                    expert=expert, start_datetime__in=[slot.start_datetime for slot in slots],
+                ))
+            Booking.objects.bulk_create([
+                Booking(
+                    user=user, expert=expert, slot=slot,
+                    start_datetime=slot.start_datetime, end_datetime=slot.end_datetime,
+                    duration_minutes=30, price=Decimal("100"),
+                    status=Booking.STATUS_CONFIRMED,
+                )
+                for slot in slots
+            ])
+        with connection.cursor() as cursor:  # fresh planner statistics
+            for table in (ExpertSlot._meta.db_table, Booking._meta.db_table):
+                cursor.execute(f"ANALYZE TABLE {table}" if connection.vendor == "mysql" else f"ANALYZE {table}")
+        self.stdout.write(f"Seeded {count} slots and bookings in {time.monotonic() - started:.1f}s.")
+        self.count = count
+        return expert, user
+
+    def _intervals(self, checks, span_minutes):
+        rng = random.Random(checks)
+        first = self.origin + timedelta(minutes=60 * self.count - span_minutes)  # the latest slots
+        out = []
+        for _ in range(checks):
+            start = first + timedelta(minutes=rng.randrange(0, span_minutes, 15))
+            out.append((start, start + timedelta(minutes=rng.choice((15, 30, 45, 60)))))
+        return out
+
+    def _time(self, label, fn, checks):
+        started = time.monotonic()
+        hits = fn()
+        ms = (time.monotonic() - started) * 1000
+        self.stdout.write(f"{label:<42} {ms:9.1f}ms total  {ms / checks:7.3f}ms/check  {hits} conflicts")
+
+    def _run(self, expert, user, checks):
+        intervals = self._intervals(checks, 60 * self.count)
+        # bulk creation: a batch of new slots within one week
+        week = sorted(self._intervals(checks, 7 * 24 * 60))
+
+        def unbounded_expert():
+            return sum(
+                ExpertSlot.objects.filter(
+                    expert=expert, status="ACTIVE", start_datetime__lt=e, end_datetime__gt=s,
+                ).exists()
+                for s, e in intervals
+            )
+
+        def unbounded_user():
+            return sum(
+                Booking.objects.filter(
+                    user=user, status__in=Booking.ACTIVE_STATUSES,
+                    start_datetime__lt=e, end_datetime__gt=s,
+                ).exists()
+                for s, e in intervals
+            )
+
+        self._time("expert: unbounded overlap scan", unbounded_expert, checks)
+        self._time("expert: expert_conflicts()",
+                   lambda: sum(expert_conflicts(expert.id, s, e).exists() for s, e in intervals), checks)
+        self._time("expert: expert_conflicts() on one week",
+                   lambda: sum(expert_conflicts(expert.id, s, e).exists() for s, e in week), checks)
+        self._time("expert: expert_conflicts_many() on one week",
+                   lambda: sum(expert_conflicts_many(expert.id, week)), checks)
+        self._time("user:   unbounded overlap scan", unbounded_user, checks)
+        self._time("user:   user_conflicts()",
+                   lambda: sum(user_conflicts(user.id, s, e).exists() for s, e in intervals), checks)
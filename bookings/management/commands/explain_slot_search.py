@@ -0,0 +1,138 @@
+import json
+import random
+import re
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from bookings.models import ExpertSlot
+from bookings.services.slot_search import MODES, search_slots
+
+SLOT_TABLE = ExpertSlot._meta.db_table
+SEED_BATCH = 5000
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _full_scan(qs):
+    """(plan text, True if the slot table is read without an index)."""
+    vendor = connection.vendor
+    if vendor == "mysql":
+        plan = qs.explain(format="json")
+
+        def _walk(node):
+            if isinstance(node, dict):
+                if node.get("table_name") == SLOT_TABLE and node.get("access_type") == "ALL":
+                    return True
+                return any(_walk(v) for v in node.values())
+            if isinstance(node, list):
+                return any(_walk(v) for v in node)
+            return False
+
+        return plan, _walk(json.loads(plan))
+
+    plan = qs.explain()
+    if vendor == "postgresql":
+        return plan, f"Seq Scan on {SLOT_TABLE}" in plan
+    # sqlite: "SCAN <table>" without an index; "SEARCH ... USING INDEX" is a range
+    return plan, bool(re.search(rf"\bSCAN {SLOT_TABLE}\b(?! USING)", plan))
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the cross-expert slot search query and fail if it full-scans the "
+        "slot table. --seed N adds N synthetic slots first, inside a transaction "
+        "that is rolled back"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=MODES, default=None)
+        parser.add_argument("--hours", type=int, default=24,
+                            help="Search window length, starting tomorrow 18:00")
+        parser.add_argument("--max-price", type=Decimal, default=None)
+        parser.add_argument("--expertise", default=None)
+        parser.add_argument("--seed", type=int, default=0,
+                            help="Synthetic slots to insert before explaining (rolled back)")
+        parser.add_argument("--experts", type=int, default=200,
+                            help="Synthetic experts the seeded slots are spread over")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options["seed"]:
+                    self._seed(options["seed"], options["experts"])
+                self._explain(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count, experts):
+        User = get_user_model()
+        tag = f"slotsearch{int(time.time())}"
+        users = User.objects.bulk_create([
+            User(username=f"{tag}_{i}", email=f"{tag}_{i}@example.invalid")
+            for i in range(experts)
+        ])
+        if not users[0].pk:  # backends that don't return ids from bulk_create
+            users = list(User.objects.filter(username__startswith=f"{tag}_"))
+
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        rng = random.Random(count)
+        started = time.monotonic()
+        for offset in range(0, count, SEED_BATCH):
+            batch = []
+            for n in range(offset, min(offset + SEED_BATCH, count)):
+                # a year of history and a year ahead, spread over the experts
+                start = now + timedelta(hours=rng.randint(-24 * 365, 24 * 365), minutes=30 * (n % 2))
+                batch_mode = rng.random() < 0.2
+                batch.append(ExpertSlot(
+                    expert=users[n % len(users)],
+                    start_datetime=start,
+                    end_datetime=start + timedelta(minutes=30),
+                    duration_minutes=30,
+                    slot_mode=ExpertSlot.MODE_BATCH if batch_mode else ExpertSlot.MODE_ONE_TO_ONE,
+                    capacity=10 if batch_mode else 1,
+                    batch_price=Decimal(rng.randint(1, 20) * 50) if batch_mode else 0,
+                    chat_price=0 if batch_mode else Decimal(rng.randint(0, 20) * 50),
+                    video_call_price=0 if batch_mode else Decimal(rng.randint(1, 20) * 50),
+                    requires_approval=False,
+                    status="ACTIVE" if rng.random() < 0.8 else "DISABLED",
+                ))
+            ExpertSlot.objects.bulk_create(batch)
+        self.stdout.write(f"Seeded {count} slots over {len(users)} experts in {time.monotonic() - started:.1f}s.")
+
+        with connection.cursor() as cursor:  # fresh planner statistics
+            if connection.vendor == "mysql":
+                cursor.execute(f"ANALYZE TABLE {SLOT_TABLE}")
+            else:
+                cursor.execute(f"ANALYZE {SLOT_TABLE}")
+
+    def _explain(self, options):
+        tz = timezone.get_current_timezone()
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        start_after = datetime.combine(tomorrow, datetime.min.time(), tzinfo=tz) + timedelta(hours=18)
+        qs = search_slots(
+            start_after=start_after,
+            start_before=start_after + timedelta(hours=options["hours"]),
+            mode=options["mode"],
+            max_price=options["max_price"],
+            expertise=options["expertise"],
+        )[:21]
+
+        plan, full_scan = _full_scan(qs)
+        self.stdout.write(plan)
+
+        started = time.monotonic()
+        rows = len(list(qs))
+        self.stdout.write(f"First page: {rows} rows in {(time.monotonic() - started) * 1000:.1f}ms.")
+
+        if full_scan:
+            raise CommandError(f"Slot search full-scans {SLOT_TABLE}.")
+        self.stdout.write(self.style.SUCCESS(f"Slot search reads {SLOT_TABLE} through an index."))
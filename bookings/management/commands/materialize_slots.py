@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from bookings.models import SlotRecurringPattern
+from bookings.services.slot_materializer import due_experts, materialize_expert
+
+
+class Command(BaseCommand):
+    help = "Generate ExpertSlots from active SlotRecurringPatterns up to the rolling horizon"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--expert", type=int, default=None,
+                            help="Only this expert (user id)")
+        parser.add_argument("--full", action="store_true",
+                            help="Re-expand the whole horizon, ignoring saved progress")
+        parser.add_argument("--horizon-days", type=int, default=None,
+                            help="Override SLOT_MATERIALIZE_HORIZON_DAYS for this run")
+
+    def handle(self, *args, **options):
+        horizon = options["horizon_days"]
+
+        if options["expert"]:
+            experts = [options["expert"]]
+        elif options["full"]:
+            experts = list(
+                SlotRecurringPattern.objects.filter(is_active=True)
+                .values_list("expert_id", flat=True).distinct()
+            )
+        else:
+            experts = due_experts(horizon_days=horizon, limit=None)
+
+        created = skipped = retired = 0
+        for expert_id in experts:
+            result = materialize_expert(expert_id, horizon_days=horizon, full=options["full"])
+            created += result["created"]
+            skipped += result["skipped_overlap"]
+            retired += result["retired"]
+            self.stdout.write(
+                f"expert {expert_id}: {result['created']} created, {result['retired']} retired, "
+                f"{result['skipped_overlap']} overlapping ({result['from']} .. {result['until']})"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {created} slots created, {retired} retired for {len(experts)} experts "
+            f"({skipped} overlapping skipped)."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from bookings.services.calendar import rebuild_calendar
+
+
+class Command(BaseCommand):
+    help = "Recompute ExpertDaySummary rows (expert calendar) from upcoming slots and bookings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--expert", type=int, default=None,
+                            help="Only this expert (user id)")
+
+    def handle(self, *args, **options):
+        result = rebuild_calendar(expert_id=options["expert"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {result['days']} open days for {result['experts']} experts."
+        ))
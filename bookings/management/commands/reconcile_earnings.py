@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from bookings.services.earnings import reconcile_earnings
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the expert earnings ledger against completed / cancelled bookings and the "
+        "day / month rollups against the ledger, for the last N days; repair what differs. "
+        "A large --days backfills the ledger for bookings completed before it existed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2)
+        parser.add_argument("--check", action="store_true",
+                            help="Only report; fail if anything differs")
+
+    def handle(self, *args, **options):
+        result = reconcile_earnings(days=options["days"], fix=not options["check"])
+        self.stdout.write(
+            f"{result['missing_entries']} booking(s) without a ledger entry "
+            f"({result['recorded']} recorded), {result['days_mismatched']} day and "
+            f"{result['months_mismatched']} month rollup row(s) mismatched."
+        )
+        drift = result["missing_entries"] or result["days_mismatched"] or result["months_mismatched"]
+        if options["check"] and drift:
+            raise CommandError("Earnings rollups are out of sync.")
+        self.stdout.write(self.style.SUCCESS("Done."))
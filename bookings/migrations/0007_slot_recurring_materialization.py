@@ -0,0 +1,67 @@
+# Generated by Django 5.2 on 2026-10-19 04:49
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_remove_booking_unique_active_booking_per_slot_and_more'),
+        ('users', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotMaterializationState',
+            fields=[
+                ('expert', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='slot_materialization', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('materialized_until', models.DateField(blank=True, null=True)),
+                ('patterns_signature', models.CharField(blank=True, default='', max_length=64)),
+                ('slots_created', models.PositiveIntegerField(default=0)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='expertslot',
+            name='pattern',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slots', to='bookings.slotrecurringpattern'),
+        ),
+        migrations.AddField(
+            model_name='slotrecurringpattern',
+            name='batch_price',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='slotrecurringpattern',
+            name='capacity',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='slotrecurringpattern',
+            name='chat_price',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='slotrecurringpattern',
+            name='requires_approval',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='slotrecurringpattern',
+            name='slot_mode',
+            field=models.CharField(choices=[('ONE_TO_ONE', 'One to One'), ('BATCH', 'Batch (Group Video Call)')], default='ONE_TO_ONE', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='slotrecurringpattern',
+            name='video_call_price',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.AddConstraint(
+            model_name='expertslot',
+            constraint=models.UniqueConstraint(fields=('pattern', 'start_datetime'), name='unique_pattern_occurrence'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 04:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_slot_recurring_materialization'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'end_datetime'], name='bookings_bo_status_9cc3ac_idx'),
+        ),
+    ]
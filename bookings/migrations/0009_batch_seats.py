@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 04:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_status_end_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchSeat',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('seat_no', models.PositiveSmallIntegerField()),
+                ('held_until', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='seat', to='bookings.booking')),
+                ('slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='bookings.expertslot')),
+            ],
+            options={
+                'ordering': ['slot', 'seat_no'],
+                'constraints': [models.UniqueConstraint(fields=('slot', 'seat_no'), name='unique_seat_per_slot')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-19 05:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_batch_seats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpertDaySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('open_slots', models.PositiveIntegerField(default=0)),
+                ('seats_left', models.PositiveIntegerField(default=0)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('has_chat', models.BooleanField(default=False)),
+                ('has_video_call', models.BooleanField(default=False)),
+                ('has_batch', models.BooleanField(default=False)),
+                ('first_open_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['expert', 'day'],
+                'constraints': [models.UniqueConstraint(fields=('expert', 'day'), name='unique_expert_day_summary')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 05:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0010_expert_day_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expertslot',
+            index=models.Index(fields=['status', 'start_datetime', 'slot_mode'], name='slot_search_idx'),
+        ),
+    ]
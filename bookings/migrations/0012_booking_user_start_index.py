@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 05:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0011_slot_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'start_datetime'], name='bookings_bo_user_id_2add19_idx'),
+        ),
+    ]
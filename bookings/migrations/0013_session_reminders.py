@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-19 05:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0012_booking_user_start_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionReminder',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('BOOKING', 'Booking'), ('BATCH_SLOT', 'Batch slot'), ('INVESTOR_BOOKING', 'Investor booking')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('lead_minutes', models.PositiveIntegerField()),
+                ('session_start', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'start_datetime'], name='bookings_bo_status_f6e1f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='investorbooking',
+            index=models.Index(fields=['status', 'start_datetime'], name='bookings_in_status_68bc71_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionreminder',
+            index=models.Index(fields=['session_start'], name='bookings_se_session_595723_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='sessionreminder',
+            constraint=models.UniqueConstraint(fields=('kind', 'lead_minutes', 'object_id'), name='unique_session_reminder'),
+        ),
+    ]
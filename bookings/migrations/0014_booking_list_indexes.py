@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 05:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0013_session_reminders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['expert', 'start_datetime'], name='bookings_bo_expert__442e11_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='investorbooking',
+            index=models.Index(fields=['user', 'status'], name='bookings_in_user_id_46d572_idx'),
+        ),
+    ]
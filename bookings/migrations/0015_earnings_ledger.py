@@ -0,0 +1,74 @@
+# Generated by Django 5.2 on 2026-10-19 05:16
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0014_booking_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EarningsEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('EARNING', 'Earning'), ('CANCELLATION', 'Cancellation')], max_length=16)),
+                ('gross_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('platform_fee_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('expert_earning_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('occurred_at', models.DateTimeField()),
+                ('day', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='earnings_entries', to='bookings.booking')),
+                ('expert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='earnings_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expert', 'day'], name='bookings_ea_expert__31b898_idx'), models.Index(fields=['day'], name='bookings_ea_day_727455_idx')],
+                'constraints': [models.UniqueConstraint(fields=('booking', 'kind'), name='unique_earnings_entry')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExpertEarningsDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('completed_sessions', models.PositiveIntegerField(default=0)),
+                ('cancelled_sessions', models.PositiveIntegerField(default=0)),
+                ('gross_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('platform_fee_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('expert_earning_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('cancelled_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='earnings_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['expert', 'day'],
+                'constraints': [models.UniqueConstraint(fields=('expert', 'day'), name='unique_expert_earnings_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExpertEarningsMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('completed_sessions', models.PositiveIntegerField(default=0)),
+                ('cancelled_sessions', models.PositiveIntegerField(default=0)),
+                ('gross_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('platform_fee_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('expert_earning_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('cancelled_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='earnings_months', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['expert', 'month'],
+                'constraints': [models.UniqueConstraint(fields=('expert', 'month'), name='unique_expert_earnings_month')],
+            },
+        ),
+    ]
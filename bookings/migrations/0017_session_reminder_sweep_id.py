@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0016_calendar_feed_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sessionreminder',
+            name='sweep_id',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+    ]
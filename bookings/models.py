@@ -1,3 +1,4 @@
+import secrets
 import uuid
 from decimal import Decimal
 from django.conf import settings
@@ -6,6 +7,8 @@ from django.utils import timezone
 from django.db.models import Q
 from django.core.exceptions import ValidationError
 
+from bookings.services.conflicts import MAX_SESSION, MAX_SESSION_MINUTES
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -58,6 +61,14 @@ class ExpertSlot(models.Model):
 
     requires_approval = models.BooleanField(default=True)
     is_recurring = models.BooleanField(default=False)
+    # Set on slots generated by bookings.services.slot_materializer
+    pattern = models.ForeignKey(
+        "SlotRecurringPattern",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="slots",
+    )
     status = models.CharField(
         max_length=16,
         choices=(
@@ -75,6 +86,11 @@ class ExpertSlot(models.Model):
             models.Index(fields=["start_datetime"]),
             models.Index(fields=["expert", "status"]),
             models.Index(fields=["uuid"]),  # For faster UUID lookups
+            # Cross-expert slot search (services/slot_search.py)
+            models.Index(
+                fields=["status", "start_datetime", "slot_mode"],
+                name="slot_search_idx",
+            ),
         ]
         ordering = ["start_datetime"]
         # FIX: Add constraint to prevent overlapping slots for same expert
@@ -83,6 +99,11 @@ class ExpertSlot(models.Model):
                 check=Q(end_datetime__gt=models.F("start_datetime")),
                 name="slot_end_after_start",
             ),
+            # One slot per pattern occurrence — makes materialization idempotent
+            models.UniqueConstraint(
+                fields=["pattern", "start_datetime"],
+                name="unique_pattern_occurrence",
+            ),
         ]
 
     def __str__(self):
@@ -95,6 +116,9 @@ class ExpertSlot(models.Model):
         if self.end_datetime <= self.start_datetime:
             raise ValidationError("End datetime must be after start datetime.")
 
+        if self.end_datetime - self.start_datetime > MAX_SESSION:
+            raise ValidationError(f"A slot can be at most {MAX_SESSION_MINUTES // 60} hours long.")
+
         if self.start_datetime < timezone.now():
             raise ValidationError("Cannot create slots in the past.")
 
@@ -189,6 +213,25 @@ class SlotRecurringPattern(models.Model):
     end_time = models.TimeField()
     start_date = models.DateField(default=timezone.now)
     end_date = models.DateField(null=True, blank=True)
+
+    # Copied onto every generated slot (same rules as ExpertSlotCreateSerializer)
+    chat_price = models.DecimalField(
+        max_digits=10, decimal_places=2, default=Decimal("0.00")
+    )
+    video_call_price = models.DecimalField(
+        max_digits=10, decimal_places=2, default=Decimal("0.00")
+    )
+    slot_mode = models.CharField(
+        max_length=16,
+        choices=ExpertSlot.SLOT_MODE_CHOICES,
+        default=ExpertSlot.MODE_ONE_TO_ONE,
+    )
+    capacity = models.PositiveIntegerField(default=1)
+    batch_price = models.DecimalField(
+        max_digits=10, decimal_places=2, default=Decimal("0.00")
+    )
+    requires_approval = models.BooleanField(default=True)
+
     is_active = models.BooleanField(default=True)  # Added to enable/disable patterns
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -224,6 +267,86 @@ class SlotRecurringPattern(models.Model):
         if self.end_date and self.end_date < self.start_date:
             raise ValidationError("End date must be after start date.")
 
+        if self.slot_mode == ExpertSlot.MODE_BATCH:
+            if not (2 <= self.capacity <= ExpertSlot.MAX_BATCH_CAPACITY):
+                raise ValidationError(
+                    f"Batch capacity must be between 2 and {ExpertSlot.MAX_BATCH_CAPACITY}."
+                )
+            if self.batch_price <= 0:
+                raise ValidationError("Batch patterns require a batch_price greater than 0.")
+        elif self.chat_price <= 0 and self.video_call_price <= 0:
+            raise ValidationError(
+                "At least one of chat_price or video_call_price must be greater than 0."
+            )
+
+
+class SlotMaterializationState(models.Model):
+    """
+    Per-expert progress of the recurring-slot materializer.
+    Slots exist for every active pattern up to `materialized_until`;
+    `patterns_signature` changes whenever the expert's patterns do, which
+    forces the whole horizon to be re-expanded on the next run.
+    """
+
+    expert = models.OneToOneField(
+        "users.User",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="slot_materialization",
+    )
+    materialized_until = models.DateField(null=True, blank=True)
+    patterns_signature = models.CharField(max_length=64, blank=True, default="")
+    slots_created = models.PositiveIntegerField(default=0)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.expert} | until {self.materialized_until}"
+
+
+class ExpertDaySummary(models.Model):
+    """
+    Per-expert, per-day availability summary behind the calendar endpoint.
+    One row per local day that has at least one open slot; kept up to date
+    by bookings/services/calendar.py on slot and booking changes.
+    """
+
+    expert = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="day_summaries",
+    )
+    day = models.DateField()
+    open_slots = models.PositiveIntegerField(default=0)
+    seats_left = models.PositiveIntegerField(default=0)  # BATCH slots only
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    has_chat = models.BooleanField(default=False)
+    has_video_call = models.BooleanField(default=False)
+    has_batch = models.BooleanField(default=False)
+    first_open_at = models.DateTimeField()  # once this passes, the row is re-checked on read
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["expert", "day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["expert", "day"],
+                name="unique_expert_day_summary",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.expert} | {self.day} | {self.open_slots} open"
+
+    @property
+    def modes(self):
+        return [
+            mode for mode, on in (
+                (Booking.SESSION_TYPE_CHAT, self.has_chat),
+                (Booking.SESSION_TYPE_VIDEO_CALL, self.has_video_call),
+                (ExpertSlot.MODE_BATCH, self.has_batch),
+            ) if on
+        ]
+
 
 class Booking(models.Model):
     """
@@ -347,7 +470,11 @@ class Booking(models.Model):
             models.Index(fields=["start_datetime"]),
             models.Index(fields=["uuid"]),
             models.Index(fields=["status", "created_at"]),  # For cleanup queries
+            models.Index(fields=["status", "end_datetime"]),  # booking_sweeper: finished sessions
             models.Index(fields=["slot", "status"]),  # For slot availability checks
+            models.Index(fields=["user", "start_datetime"]),  # user-side overlap checks (services/conflicts.py)
+            models.Index(fields=["expert", "start_datetime"]),  # expert booking list (keyset order)
+            models.Index(fields=["status", "start_datetime"]),  # session reminders
         ]
         constraints = [
             # Only ONE active booking per ONE-TO-ONE slot regardless of
@@ -478,6 +605,44 @@ class Booking(models.Model):
         return False
 
 
+class BatchSeat(models.Model):
+    """
+    One row per seat of a BATCH slot (seat_no 1..capacity).
+
+    Buyers of a popular batch slot each lock a different free seat row
+    (SKIP LOCKED) instead of queueing on the slot row. A seat is free when
+    it has no booking, or its hold has run out (`held_until` in the past);
+    `held_until` is NULL once the booking is paid. See
+    bookings/services/seat_holds.py.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    slot = models.ForeignKey(
+        ExpertSlot, on_delete=models.CASCADE, related_name="seats"
+    )
+    seat_no = models.PositiveSmallIntegerField()
+    booking = models.OneToOneField(
+        Booking,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="seat",
+    )
+    held_until = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["slot", "seat_no"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["slot", "seat_no"], name="unique_seat_per_slot"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.slot_id} seat {self.seat_no} → {self.booking_id or 'free'}"
+
+
 # ==========================================================================
 # INVESTOR SLOTS
 # ==========================================================================
@@ -530,6 +695,9 @@ class InvestorSlot(models.Model):
         if self.end_datetime <= self.start_datetime:
             raise ValidationError("End datetime must be after start datetime.")
 
+        if self.end_datetime - self.start_datetime > MAX_SESSION:
+            raise ValidationError(f"A slot can be at most {MAX_SESSION_MINUTES // 60} hours long.")
+
         if self.start_datetime < timezone.now():
             raise ValidationError("Cannot create slots in the past.")
 
@@ -607,6 +775,8 @@ class InvestorBooking(models.Model):
         indexes = [
             models.Index(fields=["user", "created_at"]),
             models.Index(fields=["investor", "status"]),
+            models.Index(fields=["user", "status"]),  # booking list status filter
+            models.Index(fields=["status", "start_datetime"]),  # session reminders
         ]
 
         constraints = [
@@ -630,3 +800,193 @@ class InvestorBooking(models.Model):
 
         if self.user == self.investor:
             raise ValidationError("User cannot book their own slot.")
+
+
+# ==========================================================================
+# SESSION REMINDERS
+# ==========================================================================
+class SessionReminder(models.Model):
+    """
+    Sent-marker for pre-session reminders (bookings/services/reminders.py):
+    one row per (session, lead window) once its reminder went out.
+    """
+
+    KIND_BOOKING = "BOOKING"
+    KIND_BATCH_SLOT = "BATCH_SLOT"  # the expert's reminder for a whole batch session
+    KIND_INVESTOR_BOOKING = "INVESTOR_BOOKING"
+    KIND_CHOICES = (
+        (KIND_BOOKING, "Booking"),
+        (KIND_BATCH_SLOT, "Batch slot"),
+        (KIND_INVESTOR_BOOKING, "Investor booking"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    lead_minutes = models.PositiveIntegerField()
+    session_start = models.DateTimeField()
+    sweep_id = models.UUIDField(null=True, editable=False)  # the run that inserted it
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "lead_minutes", "object_id"],
+                name="unique_session_reminder",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["session_start"]),  # pruning
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} | {self.lead_minutes}m before {self.session_start}"
+
+
+# ==========================================================================
+# EARNINGS LEDGER
+# ==========================================================================
+class EarningsEntry(models.Model):
+    """
+    Append-only earnings ledger (bookings/services/earnings.py): one row
+    per booking that reached COMPLETED (the expert's earning) or CANCELLED
+    (the amount paid for a session that never happened). Amounts are
+    copied from the booking's fee snapshot; rows are never updated.
+    """
+
+    KIND_EARNING = "EARNING"
+    KIND_CANCELLATION = "CANCELLATION"
+    KIND_CHOICES = (
+        (KIND_EARNING, "Earning"),
+        (KIND_CANCELLATION, "Cancellation"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    expert = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="earnings_entries",
+    )
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name="earnings_entries",
+    )
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    gross_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    platform_fee_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    expert_earning_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    occurred_at = models.DateTimeField()  # completed_at / cancelled_at
+    day = models.DateField()  # local date of occurred_at: the rollup row it counts in
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["booking", "kind"],
+                name="unique_earnings_entry",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["expert", "day"]),  # rollup rebuild / reconciliation
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} | booking {self.booking_id} | {self.expert_earning_amount}"
+
+
+class ExpertEarningsDay(models.Model):
+    """
+    Per-expert, per-day totals of EarningsEntry, maintained incrementally
+    in the same transaction as the entries and checked by
+    reconcile_earnings().
+    """
+
+    expert = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="earnings_days",
+    )
+    day = models.DateField()
+    completed_sessions = models.PositiveIntegerField(default=0)
+    cancelled_sessions = models.PositiveIntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    platform_fee_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    expert_earning_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    cancelled_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["expert", "day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["expert", "day"],
+                name="unique_expert_earnings_day",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.expert} | {self.day} | {self.expert_earning_amount}"
+
+
+class ExpertEarningsMonth(models.Model):
+    """Per-expert, per-month totals (month = its first day); as ExpertEarningsDay."""
+
+    expert = models.ForeignKey(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="earnings_months",
+    )
+    month = models.DateField()
+    completed_sessions = models.PositiveIntegerField(default=0)
+    cancelled_sessions = models.PositiveIntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    platform_fee_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    expert_earning_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    cancelled_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["expert", "month"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["expert", "month"],
+                name="unique_expert_earnings_month",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.expert} | {self.month:%Y-%m} | {self.expert_earning_amount}"
+
+
+# ==========================================================================
+# CALENDAR FEEDS
+# ==========================================================================
+def _feed_token():
+    return secrets.token_urlsafe(24)
+
+
+class CalendarFeedToken(models.Model):
+    """
+    Secret of a user's iCalendar feed URL (bookings/services/ical_feed.py).
+    Calendar clients can't send a JWT, so the token in the URL is the
+    credential; rotating it revokes every subscribed client.
+    """
+
+    user = models.OneToOneField(
+        "users.User",
+        on_delete=models.CASCADE,
+        related_name="calendar_feed_token",
+    )
+    token = models.CharField(max_length=64, unique=True, default=_feed_token)
+    created_at = models.DateTimeField(auto_now_add=True)
+    rotated_at = models.DateTimeField(null=True, blank=True)
+
+    def rotate(self):
+        self.token = _feed_token()
+        self.rotated_at = timezone.now()
+        self.save(update_fields=["token", "rotated_at"])
+
+    def __str__(self):
+        return f"{self.user} | calendar feed"
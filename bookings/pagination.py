@@ -1,4 +1,12 @@
-from rest_framework.pagination import CursorPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class SlotCursorPagination(CursorPagination):
@@ -6,4 +14,96 @@ class SlotCursorPagination(CursorPagination):
     page_size = 10
     ordering = "start_datetime"
     page_size_query_param = "page_size"
-    max_page_size = 50
\ No newline at end of file
+    max_page_size = 50
+
+
+class SlotKeysetPagination(BasePagination):
+    """
+    Keyset pagination on (start_datetime, id) for slot search: the next page
+    is `WHERE (start_datetime, id) > cursor`, a seek on the search index
+    instead of an OFFSET that rescans every earlier row.
+    """
+    page_size = 20
+    max_page_size = 50
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def _descending(self, request):
+        return False
+
+    def _page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            start, pk = urlsafe_b64decode(encoded.encode()).decode().split("|")
+            start = parse_datetime(start)
+            if start is None:
+                raise ValueError
+            return start, int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _encode_cursor(self, obj):
+        raw = f"{obj.start_datetime.isoformat()}|{obj.pk}"
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self._page_size(request)
+        cursor = self._decode_cursor(request)
+        descending = self._descending(request)
+        if cursor is not None:
+            start, pk = cursor
+            if descending:
+                queryset = queryset.filter(
+                    Q(start_datetime__lt=start) | Q(start_datetime=start, pk__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(start_datetime__gt=start) | Q(start_datetime=start, pk__gt=pk)
+                )
+
+        ordering = ("-start_datetime", "-pk") if descending else ("start_datetime", "pk")
+        results = list(queryset.order_by(*ordering)[: size + 1])
+        self.has_next = len(results) > size
+        results = results[:size]
+        self.next_cursor = self._encode_cursor(results[-1]) if self.has_next else None
+        return results
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", None),
+            ("results", data),
+        ]))
+
+
+class BookingKeysetPagination(SlotKeysetPagination):
+    """
+    The same (start_datetime, id) keyset for booking lists: newest first,
+    `?order=asc` for upcoming first.
+    """
+    page_size = 20
+    max_page_size = 100
+    order_query_param = "order"
+
+    def _descending(self, request):
+        order = request.query_params.get(self.order_query_param, "desc").lower()
+        if order not in ("asc", "desc"):
+            raise ValidationError(f"{self.order_query_param} must be asc or desc.")
+        return order == "desc"
@@ -1,7 +1,13 @@
 from rest_framework import serializers
+from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils import timezone
 from .models import ExpertSlot, Booking, InvestorSlot, InvestorBooking
+from bookings.services.availability import expert_slot_availability, investor_slot_available
+from bookings.services.conflicts import (
+    MAX_SESSION, MAX_SESSION_MINUTES, expert_conflicts, expert_conflicts_many, user_conflicts,
+)
+from bookings.services.seat_holds import SlotFull, claim_seat
 from subscriptions.services.access import is_user_premium
 
 class ExpertSlotSerializer(serializers.ModelSerializer):
@@ -37,17 +43,54 @@ class ExpertSlotSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
+    # All four read the active_count annotation (see services/availability.py)
     def get_is_chat_available(self, obj):
-        return obj.is_chat_available()
+        return expert_slot_availability(obj)["chat"]
 
     def get_is_video_call_available(self, obj):
-        return obj.is_video_call_available()
+        return expert_slot_availability(obj)["video_call"]
 
     def get_is_batch_available(self, obj):
-        return obj.is_batch_available()
+        return expert_slot_availability(obj)["batch"]
 
     def get_seats_left(self, obj):
-        return obj.batch_seats_left()
+        return expert_slot_availability(obj)["seats_left"]
+
+
+class ExpertSlotSearchSerializer(ExpertSlotSerializer):
+    """Search results span experts — carry the expert's public uuid too."""
+    expert_uuid = serializers.UUIDField(source="expert.uuid", read_only=True)
+
+    class Meta(ExpertSlotSerializer.Meta):
+        fields = ExpertSlotSerializer.Meta.fields + ["expert_uuid"]
+        read_only_fields = fields
+
+
+class ExpertSlotBulkCreateSerializer(serializers.ListSerializer):
+    """
+    Many slots in one request: one overlap query for the whole list
+    (conflicts.expert_conflicts_many), one INSERT.
+    """
+
+    def validate(self, attrs):
+        expert = self.context["request"].user
+        clashes = expert_conflicts_many(
+            expert.id, [(a["start_datetime"], a["end_datetime"]) for a in attrs],
+        )
+        overlapping = [str(i) for i, clash in enumerate(clashes) if clash]
+        if overlapping:
+            raise serializers.ValidationError(
+                f"Slots at positions {', '.join(overlapping)} overlap with an existing "
+                "slot or an earlier slot in this request."
+            )
+        return attrs
+
+    def create(self, validated_data):
+        from bookings.services.calendar import schedule_refresh
+
+        slots = ExpertSlot.objects.bulk_create([ExpertSlot(**item) for item in validated_data])
+        schedule_refresh((slot.expert_id, slot.start_datetime) for slot in slots)
+        return slots
 
 
 class ExpertSlotCreateSerializer(serializers.ModelSerializer):
@@ -64,6 +107,7 @@ class ExpertSlotCreateSerializer(serializers.ModelSerializer):
             "batch_price",
             "requires_approval",
         ]
+        list_serializer_class = ExpertSlotBulkCreateSerializer
 
     def validate_start_datetime(self, value):
         if value <= timezone.now():
@@ -76,6 +120,10 @@ class ExpertSlotCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {"end_datetime": "End time must be after start time."}
             )
+        if end - start > MAX_SESSION:
+            raise serializers.ValidationError(
+                {"end_datetime": f"A slot can be at most {MAX_SESSION_MINUTES // 60} hours long."}
+            )
 
         slot_mode = attrs.get("slot_mode", ExpertSlot.MODE_ONE_TO_ONE)
 
@@ -106,13 +154,11 @@ class ExpertSlotCreateSerializer(serializers.ModelSerializer):
                     "At least one of chat_price or video_call_price must be greater than 0."
                 )
 
+        if isinstance(self.parent, serializers.ListSerializer):
+            return attrs  # bulk create: one batch check in ExpertSlotBulkCreateSerializer
+
         expert = self.context["request"].user
-        if ExpertSlot.objects.filter(
-            expert=expert,
-            status="ACTIVE",
-            start_datetime__lt=end,
-            end_datetime__gt=start,
-        ).exists():
+        if expert_conflicts(expert.id, start, end).exists():
             raise serializers.ValidationError(
                 "This slot overlaps with an existing slot."
             )
@@ -144,6 +190,10 @@ class ExpertSlotUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {"end_datetime": "End time must be after start time."}
             )
+        if end - start > MAX_SESSION:
+            raise serializers.ValidationError(
+                {"end_datetime": f"A slot can be at most {MAX_SESSION_MINUTES // 60} hours long."}
+            )
         if not instance.is_batch:
             chat_price = attrs.get("chat_price", instance.chat_price)
             video_call_price = attrs.get("video_call_price", instance.video_call_price)
@@ -160,16 +210,7 @@ class ExpertSlotUpdateSerializer(serializers.ModelSerializer):
             )
         start = validated_data.get("start_datetime", instance.start_datetime)
         end = validated_data.get("end_datetime", instance.end_datetime)
-        if (
-            ExpertSlot.objects.filter(
-                expert=instance.expert,
-                status="ACTIVE",
-                start_datetime__lt=end,
-                end_datetime__gt=start,
-            )
-            .exclude(id=instance.id)
-            .exists()
-        ):
+        if expert_conflicts(instance.expert_id, start, end, exclude_slot_id=instance.id).exists():
             raise serializers.ValidationError(
                 "Updated times overlap with an existing slot."
             )
@@ -282,6 +323,10 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "You already have a booking for this slot."
             )
+        if user_conflicts(user.id, slot.start_datetime, slot.end_datetime).exists():
+            raise serializers.ValidationError(
+                "You already have another session at this time."
+            )
         attrs["slot"] = slot
         return attrs
 
@@ -289,30 +334,36 @@ class BookingCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context["request"].user
         session_type = validated_data["session_type"]
-
-        # Lock the slot row so the capacity/availability check and the insert
-        # happen atomically. For one-to-one the DB unique constraint is the
-        # ultimate guard; for batch this lock is the guard (no such constraint).
-        slot = ExpertSlot.objects.select_for_update().get(
-            uuid=validated_data["slot"].uuid
-        )
-
-        # Re-check duplicate under lock.
-        if Booking.objects.filter(
+        slot = validated_data["slot"]
+
+        # Lock the buyer's own row first (lock order: user → slot / seat),
+        # so one user's concurrent requests run one after the other and the
+        # duplicate / overlap checks from validate() can be re-run safely
+        # (unique_user_booking_per_slot is conditional and MySQL can't
+        # enforce it; overlaps with other experts' slots have no constraint).
+        get_user_model().objects.select_for_update().filter(pk=user.pk).first()
+        if Booking.objects.select_for_update().filter(
             user=user, slot=slot, status__in=Booking.ACTIVE_STATUSES
         ).exists():
             raise serializers.ValidationError(
                 "You already have a booking for this slot."
             )
-
-        active_count = slot.active_booking_count()
+        if user_conflicts(user.id, slot.start_datetime, slot.end_datetime).select_for_update().exists():
+            raise serializers.ValidationError(
+                "You already have another session at this time."
+            )
 
         if slot.is_batch:
-            if active_count >= slot.capacity:
-                raise serializers.ValidationError("This batch session is full.")
+            # No slot lock: capacity is guarded by the seat rows, so buyers
+            # of the same batch slot don't queue behind each other
+            # (services/seat_holds.py).
             price = slot.batch_price
         else:
-            if active_count >= 1:
+            # Lock the slot row so the availability check and the insert
+            # happen atomically; the DB unique constraint is the ultimate guard.
+            slot = ExpertSlot.objects.select_for_update().get(uuid=slot.uuid)
+
+            if slot.active_booking_count() >= 1:
                 raise serializers.ValidationError("Slot is already booked.")
             price = (
                 slot.chat_price
@@ -339,7 +390,15 @@ class BookingCreateSerializer(serializers.ModelSerializer):
             status=booking_status,
         )
         booking.compute_fee_snapshot()
+
         booking.save()
+        if not slot.is_batch:
+            return booking
+
+        try:
+            claim_seat(slot, booking)
+        except SlotFull:
+            raise serializers.ValidationError("This batch session is full.")
         return booking
 
 
@@ -428,7 +487,7 @@ class InvestorSlotSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
     def get_is_available(self, obj):
-        return obj.is_available()
+        return investor_slot_available(obj)
 
 
 class InvestorSlotCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,62 @@
+"""
+bookings/services/availability.py
+
+Slot availability for the list serializers.
+
+The ExpertSlot model methods (is_chat_available, is_video_call_available,
+is_batch_available, batch_seats_left) each run their own bookings query, so
+serializing a list cost up to 4 extra queries per slot even though
+ExpertSlotListView had already annotated active_count. These evaluators
+read the `active_count` annotation when the queryset has it, and only
+query (once per instance — the count is kept on the object) for a single
+slot fetched without it.
+
+The model methods stay as they are: booking creation wants a fresh count
+under its own lock, not one computed when the list was rendered.
+"""
+from django.utils import timezone
+
+
+def _active_count(slot, statuses) -> int:
+    count = getattr(slot, "active_count", None)
+    if count is None:
+        count = slot.bookings.filter(status__in=statuses).count()
+        slot.active_count = count  # the other fields of this slot reuse it
+    return count
+
+
+def _is_base_available(slot, now) -> bool:
+    return slot.status == "ACTIVE" and slot.start_datetime > now
+
+
+def expert_slot_availability(slot) -> dict:
+    """chat / video_call / batch availability and seats_left for an ExpertSlot."""
+    from bookings.models import Booking
+
+    active = _active_count(slot, Booking.ACTIVE_STATUSES)
+    base   = _is_base_available(slot, timezone.now())
+
+    if slot.is_batch:
+        seats_left = max(slot.capacity - active, 0)
+        return {
+            "chat":       False,
+            "video_call": False,
+            "batch":      base and slot.batch_price > 0 and seats_left > 0,
+            "seats_left": seats_left,
+        }
+
+    free = base and active == 0
+    return {
+        "chat":       free and slot.chat_price > 0,
+        "video_call": free and slot.video_call_price > 0,
+        "batch":      False,
+        "seats_left": 0,
+    }
+
+
+def investor_slot_available(slot) -> bool:
+    from bookings.models import InvestorBooking
+
+    if not _is_base_available(slot, timezone.now()):
+        return False  # no count needed
+    return _active_count(slot, InvestorBooking.ACTIVE_STATUSES) == 0
@@ -0,0 +1,69 @@
+"""
+bookings/services/booking_lists.py
+
+Booking lists ("my bookings", "my sessions as expert / investor"): one
+page at a time instead of every booking a participant has ever had.
+
+filter_bookings() narrows the participant's bookings — an equality on
+(user | expert | investor) first, so the (participant, status) and
+(participant, start_datetime) indexes carry it:
+
+  * statuses:     status IN (...);
+  * start window: start_after <= start_datetime < start_before;
+  * session type: CHAT / VIDEO_CALL (one-to-one) or BATCH (is_batch),
+    for expert bookings only.
+
+status_counts() answers the status tabs with ONE grouped query over the
+same scope without the status filter. BookingKeysetPagination pages the
+result on (start_datetime, id).
+"""
+from django.db.models import Count
+
+SESSION_TYPE_BATCH = "BATCH"
+
+
+class ListFilterError(ValueError):
+    pass
+
+
+def filter_bookings(
+    qs, *, statuses=None, start_after=None, start_before=None, session_type=None,
+):
+    """(scope, page queryset): `scope` has every filter but the status one."""
+    model = qs.model
+    valid = {value for value, _ in model.STATUS_CHOICES}
+    if statuses:
+        unknown = sorted(set(statuses) - valid)
+        if unknown:
+            raise ListFilterError(f"Unknown status: {', '.join(unknown)}.")
+    if start_after and start_before and start_before <= start_after:
+        raise ListFilterError("start_before must be after start_after.")
+
+    if start_after is not None:
+        qs = qs.filter(start_datetime__gte=start_after)
+    if start_before is not None:
+        qs = qs.filter(start_datetime__lt=start_before)
+
+    if session_type:
+        if not hasattr(model, "SESSION_TYPE_CHOICES"):
+            raise ListFilterError("session_type is not supported for these bookings.")
+        types = {value for value, _ in model.SESSION_TYPE_CHOICES} | {SESSION_TYPE_BATCH}
+        if session_type not in types:
+            raise ListFilterError(f"session_type must be one of {', '.join(sorted(types))}.")
+        if session_type == SESSION_TYPE_BATCH:
+            qs = qs.filter(is_batch=True)
+        else:
+            qs = qs.filter(is_batch=False, session_type=session_type)
+
+    scope = qs
+    if statuses:
+        qs = qs.filter(status__in=statuses)
+    return scope, qs
+
+
+def status_counts(scope) -> dict:
+    """{status: count} for every status of the model, in one GROUP BY query."""
+    counts = {value: 0 for value, _ in scope.model.STATUS_CHOICES}
+    rows = scope.order_by().values("status").annotate(n=Count("id")).values_list("status", "n")
+    counts.update(rows)
+    return counts
@@ -0,0 +1,195 @@
+"""
+bookings/services/booking_sweeper.py
+
+Moves stale bookings to their terminal status. Nothing called
+Booking.mark_as_expired / mark_as_completed, so abandoned PENDING and
+AWAITING_PAYMENT bookings held their slot forever and every availability
+query kept counting them as active.
+
+sweep_bookings() (APScheduler, every 60s):
+
+  * EXPIRED — PENDING waiting for the expert longer than
+    BOOKING_APPROVAL_TTL_HOURS; PENDING (no approval needed) or
+    AWAITING_PAYMENT not paid within BOOKING_PAYMENT_TTL_MINUTES (counted
+    from approval). A booking with a payment started in the last
+    BOOKING_PAYMENT_GRACE_MINUTES is left alone — the user may be on the
+    gateway page — and so is one with a SUCCESS payment or a SUCCESS
+    callback still queued: the callback worker can back off for minutes,
+    and the money is already taken.
+  * COMPLETED — CONFIRMED sessions whose end_datetime has passed.
+
+Each pass walks its index in keyset pages — (status, created_at) for
+expiry, (status, end_datetime) for completion — and moves a page with one
+UPDATE ... WHERE status IN (...) on the rows it could lock
+(SKIP LOCKED, so a payment confirmation holding a row wins and the row is
+simply re-checked next run). Then, per page: one query for the
+notifications, one batch of notifications, one cache invalidation for
+batch memberships, batch seats freed and the expert calendar days
+refreshed; completed sessions get their earnings ledger entries. The
+slot is free as soon as the booking leaves ACTIVE_STATUSES — availability
+is counted from bookings.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE   = 200
+MAX_PER_PASS = 5000  # per transition per run; the rest waits for the next run
+
+
+def _keyset_pages(qs, key):
+    """Yield lists of ids from qs, ordered by (key, id), BATCH_SIZE at a time."""
+    last = None
+    while True:
+        page = qs
+        if last is not None:
+            page = page.filter(Q(**{f"{key}__gt": last[0]}) | Q(**{key: last[0], "id__gt": last[1]}))
+        rows = list(page.order_by(key, "id").values_list(key, "id")[:BATCH_SIZE])
+        if not rows:
+            return
+        yield [pk for _, pk in rows]
+        if len(rows) < BATCH_SIZE:
+            return
+        last = rows[-1]
+
+
+def _transition(qs, *, key, to_status, stamp_field, now, after, limit=MAX_PER_PASS) -> int:
+    """
+    Move the rows of qs to to_status page by page. qs carries the whole
+    condition (status, age, ...) and is re-applied to the UPDATE, so a row
+    that changed in between is left as it is.
+    """
+    moved = 0
+    for page in _keyset_pages(qs, key):
+        with transaction.atomic():
+            ids = list(
+                qs.filter(id__in=page)
+                .select_for_update(skip_locked=True, of=("self",))
+                .values_list("id", flat=True)
+            )
+            if ids:
+                qs.filter(id__in=ids).update(
+                    status=to_status,
+                    updated_at=now,
+                    **{stamp_field: now},
+                )
+        if ids:
+            after(ids)
+            moved += len(ids)
+        if moved >= limit:
+            break
+    return moved
+
+
+def _after_expired(ids):
+    from bookings.models import Booking
+    from bookings.services.calendar import schedule_refresh
+    from bookings.services.seat_holds import free_seats
+    from calls.services.chat_state import invalidate_batch_membership
+    from notifications.services.events import notify_bookings_expired
+
+    bookings = list(Booking.objects.filter(id__in=ids).select_related("user"))
+    invalidate_batch_membership((b.slot_id, b.user_id) for b in bookings if b.is_batch)
+    free_seats([b.id for b in bookings if b.is_batch])
+    schedule_refresh((b.expert_id, b.start_datetime) for b in bookings)
+    notify_bookings_expired(bookings)
+
+
+def _after_completed(ids):
+    from bookings.models import Booking
+    from bookings.services.earnings import record_earnings
+    from calls.services.chat_state import invalidate_batch_membership
+    from notifications.services.events import notify_bookings_completed
+
+    record_earnings(ids)
+    bookings = list(Booking.objects.filter(id__in=ids).select_related("user", "expert"))
+    invalidate_batch_membership((b.slot_id, b.user_id) for b in bookings if b.is_batch)
+    notify_bookings_completed(bookings)
+
+
+def payment_in_flight(now):
+    """
+    Exists(): this Booking has a payment started within the grace window,
+    a SUCCESS payment, or a SUCCESS callback not yet applied.
+    """
+    from payments.models import Payment, PaymentCallback
+
+    success_queued = Exists(PaymentCallback.objects.filter(
+        payment=OuterRef("pk"),
+        status=Payment.STATUS_SUCCESS,
+        state__in=(PaymentCallback.STATE_PENDING, PaymentCallback.STATE_PROCESSING),
+    ))
+    return Exists(Payment.objects.filter(
+        purpose=Payment.PURPOSE_BOOKING,
+        reference_id=OuterRef("uuid"),
+    ).filter(
+        Q(
+            status=Payment.STATUS_INITIATED,
+            created_at__gte=now - timedelta(minutes=settings.BOOKING_PAYMENT_GRACE_MINUTES),
+        )
+        | Q(status=Payment.STATUS_SUCCESS)
+        | Q(success_queued)
+    ))
+
+
+def expire_stale_bookings(now=None) -> int:
+    from bookings.models import Booking
+
+    now = now or timezone.now()
+    approval_cutoff = now - timedelta(hours=settings.BOOKING_APPROVAL_TTL_HOURS)
+    payment_cutoff  = now - timedelta(minutes=settings.BOOKING_PAYMENT_TTL_MINUTES)
+
+    def _stale(status, cutoff):
+        # status = X AND created_at < cutoff → range scan on (status, created_at)
+        return Booking.objects.filter(status=status, created_at__lt=cutoff).filter(~payment_in_flight(now))
+
+    passes = [
+        # waiting for the expert
+        _stale(Booking.STATUS_PENDING, approval_cutoff).filter(requires_expert_approval=True),
+        # no approval step: straight to payment
+        _stale(Booking.STATUS_PENDING, payment_cutoff).filter(requires_expert_approval=False),
+        # approved, not paid — the payment window starts at approval
+        _stale(Booking.STATUS_AWAITING_PAYMENT, payment_cutoff).filter(
+            Q(expert_approved_at__isnull=True) | Q(expert_approved_at__lt=payment_cutoff)
+        ),
+    ]
+    return sum(
+        _transition(
+            qs, key="created_at", to_status=Booking.STATUS_EXPIRED,
+            stamp_field="expired_at", now=now, after=_after_expired,
+        )
+        for qs in passes
+    )
+
+
+def complete_finished_bookings(now=None) -> int:
+    from bookings.models import Booking
+
+    now = now or timezone.now()
+    qs = Booking.objects.filter(status=Booking.STATUS_CONFIRMED, end_datetime__lt=now)
+    return _transition(
+        qs, key="end_datetime", to_status=Booking.STATUS_COMPLETED,
+        stamp_field="completed_at", now=now, after=_after_completed,
+    )
+
+
+def sweep_bookings() -> dict:
+    """Periodic job: expire stale holds, complete finished sessions."""
+    close_old_connections()
+    try:
+        now = timezone.now()
+        result = {
+            "expired":   expire_stale_bookings(now),
+            "completed": complete_finished_bookings(now),
+        }
+        if result["expired"] or result["completed"]:
+            logger.info("Booking sweep: %s", result)
+        return result
+    finally:
+        close_old_connections()
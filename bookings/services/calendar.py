@@ -0,0 +1,206 @@
+"""
+bookings/services/calendar.py
+
+Per-day availability summaries for an expert's calendar.
+
+Clients used to pull the whole ExpertSlotListView and bucket slots into
+days themselves, so a month view cost every slot plus its availability.
+ExpertDaySummary keeps one row per (expert, local day) with at least one
+open slot: open count, batch seats left, lowest price, modes offered.
+A month view is one indexed range read on (expert, day).
+
+Rows are recomputed per day, never patched with deltas: refresh_days()
+re-reads that day's slots (one query, active_count annotated the way
+ExpertSlotListView does it) and upserts or deletes the row. Triggers:
+
+  * bookings/signals.py — ExpertSlot / Booking save and delete, after
+    the transaction commits (both the old and the new day of a moved slot).
+  * Bulk paths that skip signals (admin actions, slot materializer,
+    booking sweeper) call schedule_refresh() themselves.
+  * Time: a row whose first_open_at has passed may hold a slot that is no
+    longer bookable — calendar_days() re-checks those rows (in practice
+    only today's) before answering.
+
+rebuild_calendar() backfills from scratch (manage.py rebuild_expert_calendar);
+prune_past_days() (APScheduler, hourly) drops the rows of days gone by.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from bookings.services.availability import expert_slot_availability
+
+logger = logging.getLogger(__name__)
+
+
+def _day_start(day, tz):
+    return datetime.combine(day, time.min, tzinfo=tz)
+
+
+def _as_day(value, tz):
+    return timezone.localtime(value, tz).date() if isinstance(value, datetime) else value
+
+
+def _summarize(slots, tz) -> dict:
+    """{day: summary fields} for the open slots among `slots`."""
+    days = {}
+    for slot in slots:
+        avail = expert_slot_availability(slot)
+        prices = [
+            price for on, price in (
+                (avail["chat"], slot.chat_price),
+                (avail["video_call"], slot.video_call_price),
+                (avail["batch"], slot.batch_price),
+            ) if on
+        ]
+        if not prices:
+            continue
+        day = timezone.localtime(slot.start_datetime, tz).date()
+        row = days.setdefault(day, {
+            "open_slots":     0,
+            "seats_left":     0,
+            "min_price":      None,
+            "has_chat":       False,
+            "has_video_call": False,
+            "has_batch":      False,
+            "first_open_at":  slot.start_datetime,
+        })
+        row["open_slots"]     += 1
+        row["seats_left"]     += avail["seats_left"] if avail["batch"] else 0
+        row["min_price"]       = min(prices if row["min_price"] is None else [row["min_price"], *prices])
+        row["has_chat"]       |= avail["chat"]
+        row["has_video_call"] |= avail["video_call"]
+        row["has_batch"]      |= avail["batch"]
+        row["first_open_at"]   = min(row["first_open_at"], slot.start_datetime)
+    return days
+
+
+def refresh_days(expert_id, days) -> int:
+    """Recompute the summaries of `days` (dates or datetimes) for one expert."""
+    from bookings.models import Booking, ExpertDaySummary, ExpertSlot
+
+    tz   = timezone.get_current_timezone()
+    days = {_as_day(d, tz) for d in days if d is not None}
+    if not days:
+        return 0
+
+    slots = (
+        ExpertSlot.objects
+        .filter(
+            expert_id=expert_id,
+            status="ACTIVE",
+            start_datetime__gt=timezone.now(),
+            start_datetime__gte=_day_start(min(days), tz),
+            start_datetime__lt=_day_start(max(days) + timedelta(days=1), tz),
+        )
+        .annotate(
+            active_count=Count(
+                "bookings",
+                filter=Q(bookings__status__in=Booking.ACTIVE_STATUSES),
+            )
+        )
+        .order_by("start_datetime")
+    )
+    summaries = {day: row for day, row in _summarize(slots, tz).items() if day in days}
+
+    with transaction.atomic():
+        ExpertDaySummary.objects.filter(
+            expert_id=expert_id,
+            day__in=days - summaries.keys(),
+        ).delete()
+        if summaries:
+            fields = list(next(iter(summaries.values())))
+            ExpertDaySummary.objects.bulk_create(
+                [
+                    ExpertDaySummary(expert_id=expert_id, day=day, **row)
+                    for day, row in summaries.items()
+                ],
+                update_conflicts=True,
+                # MySQL upserts on any unique key and rejects an explicit target
+                unique_fields=(
+                    ["expert", "day"]
+                    if connection.features.supports_update_conflicts_with_target else None
+                ),
+                update_fields=fields + ["updated_at"],
+            )
+    return len(summaries)
+
+
+def schedule_refresh(pairs):
+    """
+    Refresh the given (expert_id, day-or-datetime) pairs once the current
+    transaction commits (right away outside one). Never raises into the
+    caller — a failed refresh is repaired by the next change or a rebuild.
+    """
+    by_expert = defaultdict(set)
+    for expert_id, day in pairs:
+        if expert_id and day is not None:
+            by_expert[expert_id].add(day)
+    if not by_expert:
+        return
+
+    def _run():
+        for expert_id, days in by_expert.items():
+            try:
+                refresh_days(expert_id, days)
+            except Exception as e:
+                logger.error("Calendar refresh failed [expert=%s]: %s", expert_id, e)
+
+    transaction.on_commit(_run)
+
+
+def calendar_days(expert_uuid, first, last) -> list:
+    """ExpertDaySummary rows of one expert (by user uuid) for [first, last], by day."""
+    from bookings.models import ExpertDaySummary
+
+    qs = ExpertDaySummary.objects.filter(
+        expert__uuid=expert_uuid, day__gte=first, day__lte=last,
+    ).order_by("day")
+    rows = list(qs)
+
+    stale = [row.day for row in rows if row.first_open_at <= timezone.now()]
+    if stale:
+        refresh_days(rows[0].expert_id, stale)
+        rows = list(qs.all())
+    return rows
+
+
+def rebuild_calendar(expert_id=None) -> dict:
+    """Recompute every upcoming day, for one expert or all of them."""
+    from bookings.models import ExpertDaySummary, ExpertSlot
+
+    now   = timezone.now()
+    today = timezone.localdate(now)
+    slots = ExpertSlot.objects.filter(status="ACTIVE", start_datetime__gt=now)
+    if expert_id:
+        slots = slots.filter(expert_id=expert_id)
+
+    days = defaultdict(set)
+    for slot_expert, start in slots.values_list("expert_id", "start_datetime").iterator():
+        days[slot_expert].add(timezone.localdate(start))
+
+    # rows left over from days that have nothing open any more
+    leftovers = ExpertDaySummary.objects.filter(day__gte=today)
+    if expert_id:
+        leftovers = leftovers.filter(expert_id=expert_id)
+    for row_expert, day in leftovers.values_list("expert_id", "day"):
+        days[row_expert].add(day)
+    prune_past_days()
+
+    totals = {"experts": 0, "days": 0}
+    for row_expert, expert_days in days.items():
+        totals["days"] += refresh_days(row_expert, expert_days)
+        totals["experts"] += 1
+    return totals
+
+
+def prune_past_days() -> int:
+    """Periodic job: rows before today are never read again."""
+    from bookings.models import ExpertDaySummary
+
+    deleted, _ = ExpertDaySummary.objects.filter(day__lt=timezone.localdate()).delete()
+    return deleted
@@ -1,7 +1,10 @@
+import logging
+
 from django.db import transaction
 from django.utils import timezone
 
-from bookings.models import Booking
+from bookings.models import BatchSeat, Booking, ExpertSlot
+from bookings.services.seat_holds import SlotFull, claim_seat, confirm_seat
 from payments.models import Payment
 from chat.services.create_room import get_or_create_chat_room
 from notifications.services.events import notify_booking_confirmed
@@ -10,6 +13,33 @@ from calls.services.call_room_service import (
     get_or_create_batch_call_room,
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _reinstate(booking) -> bool:
+    """
+    A paid booking was EXPIRED before its payment was applied (e.g. a
+    success callback that failed until an admin retried it). Take its
+    slot / seat back if nobody else has it. Call with the booking locked.
+    """
+    slot = ExpertSlot.objects.select_for_update().get(id=booking.slot_id)
+    if slot.status != "ACTIVE" or booking.end_datetime <= timezone.now():
+        return False
+
+    others = Booking.objects.filter(slot=slot, status__in=Booking.ACTIVE_STATUSES).exclude(id=booking.id)
+    if not booking.is_batch:
+        return not others.exists()
+
+    if others.filter(user_id=booking.user_id).exists():
+        return False  # rebooked the same session meanwhile; this payment is the duplicate
+    if BatchSeat.objects.filter(booking=booking).exists():
+        return True
+    try:
+        claim_seat(slot, booking)
+    except SlotFull:
+        return False
+    return True
+
 
 def confirm_booking_after_payment(*, payment: Payment):
     if payment.status != Payment.STATUS_SUCCESS:
@@ -20,7 +50,19 @@ def confirm_booking_after_payment(*, payment: Payment):
     with transaction.atomic():
         booking = Booking.objects.select_for_update().get(uuid=payment.reference_id)
 
-        if booking.status not in (
+        if booking.status == Booking.STATUS_EXPIRED:
+            if not _reinstate(booking):
+                logger.error(
+                    "Payment %s succeeded for expired booking %s whose slot is gone — refund required",
+                    payment.uuid, booking.uuid,
+                )
+                Payment.objects.filter(pk=payment.pk).update(refund_required_at=timezone.now())
+                return
+            logger.warning("Expired booking %s re-confirmed after late payment %s", booking.uuid, payment.uuid)
+            from bookings.services.calendar import schedule_refresh
+            schedule_refresh([(booking.expert_id, booking.start_datetime)])
+            booking.expired_at = None
+        elif booking.status not in (
             Booking.STATUS_PENDING,
             Booking.STATUS_AWAITING_PAYMENT,
         ):
@@ -34,6 +76,7 @@ def confirm_booking_after_payment(*, payment: Payment):
             booking.expert_approved_at = timezone.now()
 
         if booking.is_batch:
+            confirm_seat(booking)
             # Group video call: one shared CallRoom per slot (idempotent).
             get_or_create_batch_call_room(slot=booking.slot)
         elif booking.session_type == Booking.SESSION_TYPE_CHAT:
@@ -51,9 +94,11 @@ def confirm_booking_after_payment(*, payment: Payment):
                 "paid_at",
                 "confirmed_at",
                 "expert_approved_at",
+                "expired_at",
                 "chat_room_id",
                 "updated_at",
             ]
         )
 
-    notify_booking_confirmed(booking)
+    # after commit: a rolled-back (and retried) callback must not notify twice
+    transaction.on_commit(lambda: notify_booking_confirmed(booking))
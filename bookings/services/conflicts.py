@@ -0,0 +1,113 @@
+"""
+bookings/services/conflicts.py
+
+Interval conflicts for slots and bookings: "does [start, end) overlap
+anything this expert offers / this user has booked?"
+
+The plain overlap test `start < end' AND end > start'` can only use an
+index on its first column, so `(expert, start_datetime)` was range-scanned
+from the expert's very first slot. No session is longer than
+MAX_SESSION_MINUTES, so anything overlapping [start, end) also starts in
+(start - MAX_SESSION, end): each check is one bounded range scan —
+
+  * expert side: ExpertSlot (expert, start_datetime), ACTIVE slots;
+  * user side:   Booking (user, start_datetime), active bookings — a user
+    can't hold two sessions at once, even with different experts.
+
+Batch mode (bulk slot creation, the recurring-slot materializer):
+expert_conflicts_many() checks N new intervals with ONE range fetch that
+covers all of them, then bisects an IntervalSet in memory — also catching
+new intervals that overlap each other.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+MAX_SESSION_MINUTES = 24 * 60
+MAX_SESSION = timedelta(minutes=MAX_SESSION_MINUTES)
+
+
+class IntervalSet:
+    """[start, end) intervals sorted by start; overlap tests by bisection."""
+
+    def __init__(self, intervals=()):
+        intervals = sorted(intervals)
+        self.starts  = [s for s, _ in intervals]
+        self.ends    = [e for _, e in intervals]
+        self.longest = max((e - s for s, e in intervals), default=timedelta(0))
+
+    def overlaps(self, start, end) -> bool:
+        # Only intervals starting in (start - longest, end) can reach into [start, end)
+        lo = bisect_right(self.starts, start - self.longest)
+        hi = bisect_left(self.starts, end)
+        return any(self.ends[i] > start for i in range(lo, hi))
+
+    def add(self, start, end):
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.longest = max(self.longest, end - start)
+
+
+def _window(start, end):
+    return {
+        "start_datetime__gt": start - MAX_SESSION,
+        "start_datetime__lt": end,
+        "end_datetime__gt":   start,
+    }
+
+
+def expert_conflicts(expert_id, start, end, *, exclude_slot_id=None):
+    """ACTIVE slots of the expert overlapping [start, end)."""
+    from bookings.models import ExpertSlot
+
+    qs = ExpertSlot.objects.filter(expert_id=expert_id, status="ACTIVE", **_window(start, end))
+    if exclude_slot_id is not None:
+        qs = qs.exclude(id=exclude_slot_id)
+    return qs
+
+
+def user_conflicts(user_id, start, end, *, exclude_booking_id=None):
+    """Active bookings of the user (as participant) overlapping [start, end)."""
+    from bookings.models import Booking
+
+    qs = Booking.objects.filter(
+        user_id=user_id,
+        status__in=Booking.ACTIVE_STATUSES,
+        **_window(start, end),
+    )
+    if exclude_booking_id is not None:
+        qs = qs.exclude(id=exclude_booking_id)
+    return qs
+
+
+def expert_conflicts_many(expert_id, intervals, *, busy=None) -> list:
+    """
+    Batch mode: for each (start, end) in `intervals`, True if it overlaps an
+    ACTIVE slot of the expert or an earlier interval of the same list.
+    One query for the whole list. Pass `busy` (an IntervalSet) to add to a
+    set the caller already loaded.
+    """
+    from bookings.models import ExpertSlot
+
+    intervals = list(intervals)
+    if not intervals:
+        return []
+    if busy is None:
+        busy = IntervalSet(
+            ExpertSlot.objects
+            .filter(
+                expert_id=expert_id,
+                status="ACTIVE",
+                start_datetime__gt=min(s for s, _ in intervals) - MAX_SESSION,
+                start_datetime__lt=max(e for _, e in intervals),
+            )
+            .values_list("start_datetime", "end_datetime")
+        )
+
+    result = []
+    for start, end in intervals:
+        clash = busy.overlaps(start, end)
+        if not clash:
+            busy.add(start, end)
+        result.append(clash)
+    return result
@@ -0,0 +1,291 @@
+"""
+bookings/services/earnings.py
+
+Expert earnings: an append-only ledger plus per-day and per-month rollups,
+so an earnings screen reads a few rollup rows instead of summing every
+booking the expert has ever had.
+
+record_earnings(booking_ids) — on COMPLETED / CANCELLED (Booking
+post_save signal; the sweeper and the admin bulk actions call it by hand
+after their queryset.update()). In one transaction:
+
+  * lock the bookings, skip those that already have their entry;
+  * one INSERT of EarningsEntry rows — EARNING for a completed session,
+    CANCELLATION (the amount paid, if any) for a cancelled one;
+  * per touched (expert, day) and (expert, month): create the rollup row
+    if missing, then one `UPDATE ... SET x = x + delta`. Rows are
+    touched in sorted order, so concurrent writers don't deadlock.
+
+The (booking, kind) unique key keeps the ledger exactly-once.
+
+reconcile_earnings() (daily job, `manage.py reconcile_earnings` for any
+range or the initial backfill) checks both steps against their source:
+terminal bookings of the window without a ledger entry are recorded, and
+rollup rows that differ from a fresh aggregate of the ledger are
+rewritten under a row lock.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import close_old_connections, transaction
+from django.db.models import Count, DecimalField, Exists, F, OuterRef, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = (
+    "completed_sessions",
+    "cancelled_sessions",
+    "gross_amount",
+    "platform_fee_amount",
+    "expert_earning_amount",
+    "cancelled_amount",
+)
+RECORD_BATCH_SIZE = 500
+# A booking is completed / cancelled at the latest shortly after its
+# session ends (booking_sweeper), so the bookings that can have reached a
+# terminal status since a date all end after (date - this slack): the
+# reconciliation reads them on the (status, end_datetime) index.
+TERMINAL_SLACK = timedelta(days=7)
+
+ZERO = Decimal("0.00")
+
+
+def _month(day):
+    return day.replace(day=1)
+
+
+def _entry(booking, now):
+    from bookings.models import Booking, EarningsEntry
+
+    if booking.status == Booking.STATUS_COMPLETED:
+        occurred = booking.completed_at or booking.end_datetime
+        return EarningsEntry(
+            expert_id=booking.expert_id,
+            booking_id=booking.id,
+            kind=EarningsEntry.KIND_EARNING,
+            gross_amount=booking.price,
+            platform_fee_amount=booking.platform_fee_amount,
+            expert_earning_amount=booking.expert_earning_amount,
+            occurred_at=occurred,
+            day=timezone.localdate(occurred),
+        )
+    if booking.status == Booking.STATUS_CANCELLED:
+        occurred = booking.cancelled_at or now
+        return EarningsEntry(
+            expert_id=booking.expert_id,
+            booking_id=booking.id,
+            kind=EarningsEntry.KIND_CANCELLATION,
+            gross_amount=booking.price if booking.paid_at else ZERO,
+            platform_fee_amount=ZERO,
+            expert_earning_amount=ZERO,
+            occurred_at=occurred,
+            day=timezone.localdate(occurred),
+        )
+    return None
+
+
+def _deltas(entry) -> dict:
+    from bookings.models import EarningsEntry
+
+    if entry.kind == EarningsEntry.KIND_EARNING:
+        return {
+            "completed_sessions":    1,
+            "gross_amount":          entry.gross_amount,
+            "platform_fee_amount":   entry.platform_fee_amount,
+            "expert_earning_amount": entry.expert_earning_amount,
+        }
+    return {"cancelled_sessions": 1, "cancelled_amount": entry.gross_amount}
+
+
+def _increment(model, key_field, deltas_by_key, now):
+    """deltas_by_key: {(expert_id, key): {field: delta}} → rollup rows += delta."""
+    keys = sorted(deltas_by_key)
+    model.objects.bulk_create(
+        [model(expert_id=expert_id, **{key_field: key}) for expert_id, key in keys],
+        ignore_conflicts=True,
+    )
+    for expert_id, key in keys:
+        deltas = deltas_by_key[(expert_id, key)]
+        model.objects.filter(expert_id=expert_id, **{key_field: key}).update(
+            updated_at=now,
+            **{field: F(field) + delta for field, delta in deltas.items()},
+        )
+
+
+def record_earnings(booking_ids) -> int:
+    """Write the ledger entries (and rollups) of these bookings; returns entries written."""
+    from bookings.models import (
+        Booking,
+        EarningsEntry,
+        ExpertEarningsDay,
+        ExpertEarningsMonth,
+    )
+
+    booking_ids = sorted(set(booking_ids))
+    if not booking_ids:
+        return 0
+    now = timezone.now()
+    with transaction.atomic():
+        bookings = list(
+            Booking.objects
+            .filter(
+                id__in=booking_ids,
+                status__in=[Booking.STATUS_COMPLETED, Booking.STATUS_CANCELLED],
+            )
+            .select_for_update(of=("self",))
+            .order_by("id")
+        )
+        # read after the lock: an overlapping writer's entries are visible
+        done = set(
+            EarningsEntry.objects
+            .filter(booking_id__in=[b.id for b in bookings])
+            .values_list("booking_id", "kind")
+        )
+        entries = [
+            entry for entry in (_entry(b, now) for b in bookings)
+            if entry is not None and (entry.booking_id, entry.kind) not in done
+        ]
+        if not entries:
+            return 0
+        EarningsEntry.objects.bulk_create(entries)
+
+        days = defaultdict(lambda: defaultdict(int))
+        months = defaultdict(lambda: defaultdict(int))
+        for entry in entries:
+            for field, delta in _deltas(entry).items():
+                days[(entry.expert_id, entry.day)][field] += delta
+                months[(entry.expert_id, _month(entry.day))][field] += delta
+        _increment(ExpertEarningsDay, "day", days, now)
+        _increment(ExpertEarningsMonth, "month", months, now)
+    return len(entries)
+
+
+def _ledger_totals(entries, key) -> dict:
+    """{(expert_id, key value): {field: total}}: one GROUP BY over ledger rows."""
+    from bookings.models import EarningsEntry
+
+    money = DecimalField(max_digits=14, decimal_places=2)
+
+    def _sum(field, kind):
+        return Coalesce(Sum(field, filter=Q(kind=kind)), Value(ZERO), output_field=money)
+
+    rows = (
+        entries.order_by()
+        .values("expert_id", rollup_key=key)
+        .annotate(  # total_<rollup field>: the ledger's own columns share the names
+            total_completed_sessions=Count("id", filter=Q(kind=EarningsEntry.KIND_EARNING)),
+            total_cancelled_sessions=Count("id", filter=Q(kind=EarningsEntry.KIND_CANCELLATION)),
+            total_gross_amount=_sum("gross_amount", EarningsEntry.KIND_EARNING),
+            total_platform_fee_amount=_sum("platform_fee_amount", EarningsEntry.KIND_EARNING),
+            total_expert_earning_amount=_sum("expert_earning_amount", EarningsEntry.KIND_EARNING),
+            total_cancelled_amount=_sum("gross_amount", EarningsEntry.KIND_CANCELLATION),
+        )
+    )
+    return {
+        (row["expert_id"], row["rollup_key"]): {field: row[f"total_{field}"] for field in ROLLUP_FIELDS}
+        for row in rows
+    }
+
+
+def _reconcile_rollup(model, key_field, key, first, *, fix) -> int:
+    """
+    Compare the rollup rows from `first` on with the ledger; rewrite the
+    ones that differ. Returns the number of mismatched rows.
+    """
+    from bookings.models import EarningsEntry
+
+    empty = {field: (0 if field.endswith("_sessions") else ZERO) for field in ROLLUP_FIELDS}
+    ledger = EarningsEntry.objects.filter(day__gte=first)
+    expected = _ledger_totals(ledger, key)
+    actual = {
+        (row["expert_id"], row[key_field]): {field: row[field] for field in ROLLUP_FIELDS}
+        for row in model.objects.filter(**{f"{key_field}__gte": first})
+        .values("expert_id", key_field, *ROLLUP_FIELDS)
+    }
+
+    mismatched = 0
+    for expert_id, value in sorted(set(expected) | set(actual)):
+        if expected.get((expert_id, value), empty) == actual.get((expert_id, value), empty):
+            continue
+        mismatched += 1
+        logger.warning(
+            "Earnings rollup mismatch [%s expert=%s %s=%s]: rollup %s, ledger %s",
+            model.__name__, expert_id, key_field, value,
+            actual.get((expert_id, value)), expected.get((expert_id, value)),
+        )
+        if not fix:
+            continue
+        lookup = {"expert_id": expert_id, key_field: value}
+        with transaction.atomic():
+            # lock the row, then aggregate: record_earnings increments the
+            # same row, so it lands wholly before or wholly after this
+            model.objects.get_or_create(**lookup)
+            model.objects.select_for_update().get(**lookup)
+            totals = _ledger_totals(ledger.filter(expert_id=expert_id), key).get((expert_id, value), empty)
+            model.objects.filter(**lookup).update(updated_at=timezone.now(), **totals)
+    return mismatched
+
+
+def _missing_entries(since):
+    """Ids of bookings completed / cancelled since `since` that have no ledger entry."""
+    from bookings.models import Booking, EarningsEntry
+
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(since, datetime.min.time(), tzinfo=tz)
+    ids = []
+    for status, kind, stamp in (
+        (Booking.STATUS_COMPLETED, EarningsEntry.KIND_EARNING, "completed_at"),
+        (Booking.STATUS_CANCELLED, EarningsEntry.KIND_CANCELLATION, "cancelled_at"),
+    ):
+        ids += (
+            Booking.objects
+            .filter(status=status, end_datetime__gte=start - TERMINAL_SLACK)
+            .filter(Q(**{f"{stamp}__gte": start}) | Q(**{f"{stamp}__isnull": True}))
+            .filter(~Exists(EarningsEntry.objects.filter(booking=OuterRef("pk"), kind=kind)))
+            .values_list("id", flat=True)
+        )
+    return ids
+
+
+def reconcile_earnings(days=2, *, fix=True) -> dict:
+    """
+    Verify the ledger and rollups of the last `days` days (and their
+    months) against their sources; repair them unless fix=False.
+    """
+    from bookings.models import ExpertEarningsDay, ExpertEarningsMonth
+
+    since = timezone.localdate() - timedelta(days=days)
+    missing = _missing_entries(since)
+    if missing:
+        logger.warning("Earnings ledger: %s terminal booking(s) without an entry", len(missing))
+    recorded = 0
+    if fix:
+        for i in range(0, len(missing), RECORD_BATCH_SIZE):
+            recorded += record_earnings(missing[i:i + RECORD_BATCH_SIZE])
+
+    return {
+        "missing_entries": len(missing),
+        "recorded": recorded,
+        "days_mismatched": _reconcile_rollup(
+            ExpertEarningsDay, "day", F("day"), since, fix=fix,
+        ),
+        "months_mismatched": _reconcile_rollup(
+            ExpertEarningsMonth, "month", TruncMonth("day"), _month(since), fix=fix,
+        ),
+    }
+
+
+def reconcile_recent_earnings() -> dict:
+    """Periodic job: reconcile yesterday and today."""
+    close_old_connections()
+    try:
+        result = reconcile_earnings(days=1)
+        if any(result.values()):
+            logger.info("Earnings reconciliation: %s", result)
+        return result
+    finally:
+        close_old_connections()
@@ -0,0 +1,210 @@
+"""
+bookings/services/ical_feed.py
+
+Per-user iCalendar feed (`.ics`) of the sessions the user takes part in,
+for calendar clients that subscribe to a URL and poll it every few
+minutes.
+
+Sources, each within (now - FEED_PAST_DAYS, now + FEED_FUTURE_DAYS) and
+read on an index that starts with the participant:
+
+  * bookings as participant      — Booking (user, start_datetime);
+  * one-to-one bookings as expert — Booking (expert, start_datetime);
+  * batch slots as expert (one event per slot, with a booking in it)
+                                  — ExpertSlot (expert, start_datetime);
+  * investor bookings, both sides.
+
+iter_feed() is a generator: each source is walked in keyset pages of
+PAGE_SIZE on (start_datetime, id) and every event is yielded as soon as it
+is formatted, so a StreamingHttpResponse never holds the whole feed.
+
+feed_etag() is one aggregate per source (count, sum of ids, latest
+updated_at) plus the feed window: it changes whenever an event appears,
+disappears or is edited, and a client polling an unchanged feed gets a
+304 without any event being read.
+"""
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Exists, Max, OuterRef, Q, Sum
+from django.utils import timezone
+
+FEED_PAST_DAYS = 30
+FEED_FUTURE_DAYS = 365
+PAGE_SIZE = 200
+PRODID = "-//rplatform//Sessions//EN"
+
+_SESSION_LABELS = {"CHAT": "Chat", "VIDEO_CALL": "Video call"}
+
+
+def _name(user):
+    return user.get_full_name() or user.username
+
+
+def _escape(text):
+    return (
+        str(text).replace("\\", "\\\\").replace(";", "\\;")
+        .replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """RFC 5545 line folding: at most 75 octets per line, continuation lines start with a space."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, limit = [], 75
+    while raw:
+        cut = min(limit, len(raw))
+        while cut < len(raw) and (raw[cut] & 0xC0) == 0x80:  # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(raw[:cut].decode("utf-8"))
+        raw, limit = raw[cut:], 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc(dt):
+    return dt.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event(uid, start, end, summary, stamp, *, description="", sequence=0):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_utc(stamp)}",
+        f"DTSTART:{_utc(start)}",
+        f"DTEND:{_utc(end)}",
+        f"SUMMARY:{_escape(summary)}",
+        f"SEQUENCE:{sequence}",
+        "STATUS:CONFIRMED",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def _booking_as_user(b):
+    label = "Batch session" if b.is_batch else _SESSION_LABELS.get(b.session_type, "Session")
+    return _event(
+        f"booking-{b.uuid}", b.start_datetime, b.end_datetime,
+        f"{label} with {_name(b.expert)}", b.updated_at,
+        description=f"{b.duration_minutes} minutes", sequence=b.reschedule_count,
+    )
+
+
+def _booking_as_expert(b):
+    label = _SESSION_LABELS.get(b.session_type, "Session")
+    return _event(
+        f"booking-{b.uuid}", b.start_datetime, b.end_datetime,
+        f"{label} with {_name(b.user)}", b.updated_at,
+        description=f"{b.duration_minutes} minutes", sequence=b.reschedule_count,
+    )
+
+
+def _batch_slot(slot):
+    return _event(
+        f"batch-slot-{slot.uuid}", slot.start_datetime, slot.end_datetime,
+        "Batch session", slot.updated_at,
+        description=f"{slot.duration_minutes} minutes, up to {slot.capacity} participants",
+    )
+
+
+def _investor_booking_as_user(b):
+    return _event(
+        f"investor-booking-{b.uuid}", b.start_datetime, b.end_datetime,
+        f"Investor consultation with {_name(b.investor)}", b.updated_at,
+        description=f"{b.duration_minutes} minutes", sequence=b.reschedule_count,
+    )
+
+
+def _investor_booking_as_investor(b):
+    return _event(
+        f"investor-booking-{b.uuid}", b.start_datetime, b.end_datetime,
+        f"Investor consultation with {_name(b.user)}", b.updated_at,
+        description=f"{b.duration_minutes} minutes", sequence=b.reschedule_count,
+    )
+
+
+def _sources(user, now):
+    """(queryset, event formatter) per source, already limited to the feed window."""
+    from bookings.models import Booking, ExpertSlot, InvestorBooking
+
+    window = {
+        "start_datetime__gte": now - timedelta(days=FEED_PAST_DAYS),
+        "start_datetime__lt":  now + timedelta(days=FEED_FUTURE_DAYS),
+    }
+    held = [Booking.STATUS_CONFIRMED, Booking.STATUS_COMPLETED]
+    investor_held = [InvestorBooking.STATUS_CONFIRMED, InvestorBooking.STATUS_COMPLETED]
+    return [
+        (
+            Booking.objects.filter(user=user, status__in=held, **window).select_related("expert"),
+            _booking_as_user,
+        ),
+        (
+            Booking.objects.filter(expert=user, is_batch=False, status__in=held, **window)
+            .select_related("user"),
+            _booking_as_expert,
+        ),
+        (
+            ExpertSlot.objects.filter(expert=user, slot_mode=ExpertSlot.MODE_BATCH, **window)
+            .filter(Exists(Booking.objects.filter(slot=OuterRef("pk"), status__in=held))),
+            _batch_slot,
+        ),
+        (
+            InvestorBooking.objects.filter(user=user, status__in=investor_held, **window)
+            .select_related("investor"),
+            _investor_booking_as_user,
+        ),
+        (
+            InvestorBooking.objects.filter(investor=user, status__in=investor_held, **window)
+            .select_related("user"),
+            _investor_booking_as_investor,
+        ),
+    ]
+
+
+def feed_etag(user, now=None) -> str:
+    """Fingerprint of everything iter_feed() would return: one aggregate per source."""
+    now = now or timezone.now()
+    parts = [timezone.localdate(now).isoformat()]  # the window moves once a day
+    for qs, _ in _sources(user, now):
+        row = qs.order_by().aggregate(n=Count("id"), ids=Sum("id"), changed=Max("updated_at"))
+        parts.append(f"{row['n']}:{row['ids']}:{row['changed'] and row['changed'].isoformat()}")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def _keyset(qs):
+    """Rows of qs by (start_datetime, id), PAGE_SIZE per query."""
+    last = None
+    while True:
+        page = qs
+        if last is not None:
+            page = page.filter(
+                Q(start_datetime__gt=last.start_datetime)
+                | Q(start_datetime=last.start_datetime, id__gt=last.id)
+            )
+        rows = list(page.order_by("start_datetime", "id")[:PAGE_SIZE])
+        yield from rows
+        if len(rows) < PAGE_SIZE:
+            return
+        last = rows[-1]
+
+
+def iter_feed(user, now=None):
+    """Yield the VCALENDAR text of the user's sessions, one event at a time."""
+    now = now or timezone.now()
+    yield "".join(_fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape('Sessions')}",
+        "X-PUBLISHED-TTL:PT15M",
+        "REFRESH-INTERVAL;VALUE=DURATION:PT15M",
+    ))
+    for qs, fmt in _sources(user, now):
+        for row in _keyset(qs):
+            yield fmt(row)
+    yield "END:VCALENDAR\r\n"
@@ -0,0 +1,185 @@
+"""
+bookings/services/reminders.py
+
+Pre-session reminders, from one periodic sweeper — not one APScheduler
+job per booking (the job-store bloat schedule_auto_cut used to have).
+
+send_due_reminders() (APScheduler, every 60s), for every lead in
+SESSION_REMINDER_LEADS_MINUTES (e.g. 24h and 15m) and every source:
+
+  * CONFIRMED bookings          → user, and the expert for one-to-one;
+  * ACTIVE batch slots with a CONFIRMED booking → the expert, once;
+  * CONFIRMED investor bookings → user and investor;
+
+selects the sessions starting in (now + next shorter lead, now + lead] —
+a range read on the (status, start_datetime) index — that have no
+SessionReminder row for that lead yet (anti-join on its unique key).
+A session booked 10 minutes ahead only gets the 15m reminder, never a
+late "in 24 hours" one; one booked 2 hours ahead gets the 24h-window
+reminder, titled with the time actually left ("in 2 hours").
+
+Per page of REMINDER_BATCH_SIZE: one INSERT of the markers stamped with
+the run's sweep_id (the next page query skips them), one SELECT of the
+markers that carry this run's stamp, and messages only for those
+sessions — a marker an overlapping sweep inserted first keeps its stamp,
+so that sweep alone sends it. Messages go out in chunks of SEND_CHUNK by
+SESSION_REMINDER_CONCURRENCY threads through send_notifications (one
+pooled HTTP session and one INSERT per chunk). Markers go in before
+sending: a reminder is sent at most once.
+"""
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+REMINDER_BATCH_SIZE = 500
+MAX_BATCHES_PER_SWEEP = 40  # 20k sessions per lead and source per run
+SEND_CHUNK = 100
+MARKER_RETENTION_DAYS = 2
+
+
+def _sources():
+    """(kind, queryset of sessions, message builder) per reminder source."""
+    from bookings.models import Booking, ExpertSlot, InvestorBooking, SessionReminder
+    from notifications.services.events import (
+        batch_slot_reminder_messages,
+        booking_reminder_messages,
+        investor_booking_reminder_messages,
+    )
+
+    confirmed = Booking.objects.filter(slot=OuterRef("pk"), status=Booking.STATUS_CONFIRMED)
+    return [
+        (
+            SessionReminder.KIND_BOOKING,
+            Booking.objects.filter(status=Booking.STATUS_CONFIRMED).select_related("user", "expert"),
+            booking_reminder_messages,
+        ),
+        (
+            SessionReminder.KIND_BATCH_SLOT,
+            ExpertSlot.objects.filter(status="ACTIVE", slot_mode=ExpertSlot.MODE_BATCH)
+            .filter(Exists(confirmed))
+            .select_related("expert"),
+            batch_slot_reminder_messages,
+        ),
+        (
+            SessionReminder.KIND_INVESTOR_BOOKING,
+            InvestorBooking.objects.filter(status=InvestorBooking.STATUS_CONFIRMED)
+            .select_related("user", "investor"),
+            investor_booking_reminder_messages,
+        ),
+    ]
+
+
+def _windows(now):
+    """(lead, lower, upper): a session gets the `lead` reminder if lower < start <= upper."""
+    leads = sorted({int(m) for m in settings.SESSION_REMINDER_LEADS_MINUTES if int(m) > 0}, reverse=True)
+    return [
+        (lead, now + timedelta(minutes=shorter), now + timedelta(minutes=lead))
+        for lead, shorter in zip(leads, leads[1:] + [0])
+    ]
+
+
+def _send_chunk(messages) -> int:
+    from notifications.services.client import send_notifications
+
+    close_old_connections()
+    try:
+        return send_notifications(messages)
+    finally:
+        close_old_connections()
+
+
+def _sweep(kind, qs, build, lead, lower, upper, pool, sweep_id) -> dict:
+    from bookings.models import SessionReminder
+
+    due = (
+        qs.filter(start_datetime__gt=lower, start_datetime__lte=upper)
+        .filter(~Exists(SessionReminder.objects.filter(
+            kind=kind, lead_minutes=lead, object_id=OuterRef("pk"),
+        )))
+        .order_by("start_datetime", "pk")
+    )
+
+    result = {"sessions": 0, "messages": 0, "sent": 0}
+    for _ in range(MAX_BATCHES_PER_SWEEP):
+        page = list(due[:REMINDER_BATCH_SIZE])
+        if not page:
+            break
+        SessionReminder.objects.bulk_create(
+            [
+                SessionReminder(
+                    kind=kind, object_id=s.pk, lead_minutes=lead,
+                    session_start=s.start_datetime, sweep_id=sweep_id,
+                )
+                for s in page
+            ],
+            ignore_conflicts=True,  # an overlapping sweep already took them
+        )
+        ours = set(
+            SessionReminder.objects
+            .filter(kind=kind, lead_minutes=lead, object_id__in=[s.pk for s in page], sweep_id=sweep_id)
+            .values_list("object_id", flat=True)
+        )
+        claimed = [s for s in page if s.pk in ours]
+        messages = [m for session in claimed for m in build(session, lead)]
+        futures = [
+            pool.submit(_send_chunk, messages[i:i + SEND_CHUNK])
+            for i in range(0, len(messages), SEND_CHUNK)
+        ]
+        for future in futures:
+            try:
+                result["sent"] += future.result()
+            except Exception as e:
+                logger.error("Reminder batch failed [%s %sm]: %s", kind, lead, e)
+        result["sessions"] += len(claimed)
+        result["messages"] += len(messages)
+        if len(page) < REMINDER_BATCH_SIZE:
+            break
+    return result
+
+
+def send_due_reminders() -> dict:
+    """Periodic job: send every reminder that is due. Returns counters."""
+    close_old_connections()
+    started = time.monotonic()
+    now = timezone.now()
+    sweep_id = uuid.uuid4()
+    totals = {"sessions": 0, "messages": 0, "sent": 0}
+    try:
+        with ThreadPoolExecutor(
+            max_workers=settings.SESSION_REMINDER_CONCURRENCY,
+            thread_name_prefix="reminders",
+        ) as pool:
+            for lead, lower, upper in _windows(now):
+                for kind, qs, build in _sources():
+                    try:
+                        result = _sweep(kind, qs, build, lead, lower, upper, pool, sweep_id)
+                    except Exception as e:
+                        logger.error("Reminder sweep failed [%s %sm]: %s", kind, lead, e)
+                        continue
+                    for key in totals:
+                        totals[key] += result[key]
+        if totals["sessions"]:
+            logger.info(
+                "Session reminders: %s in %.1fs", totals, time.monotonic() - started,
+            )
+        return totals
+    finally:
+        close_old_connections()
+
+
+def prune_reminder_markers() -> int:
+    """Periodic job: markers of sessions that have started are never read again."""
+    from bookings.models import SessionReminder
+
+    cutoff = timezone.now() - timedelta(days=MARKER_RETENTION_DAYS)
+    deleted, _ = SessionReminder.objects.filter(session_start__lt=cutoff).delete()
+    return deleted
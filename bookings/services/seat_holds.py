@@ -0,0 +1,251 @@
+"""
+bookings/services/seat_holds.py
+
+Seat holds for BATCH slots.
+
+BookingCreateSerializer used to take select_for_update on the ExpertSlot
+row for every batch booking, so all buyers of a popular 10-seat session
+queued on one row lock, and an unpaid booking held its seat until the
+booking sweeper expired it. Now each seat is a BatchSeat row:
+
+  * claim_seat() locks the first free seat with SKIP LOCKED — concurrent
+    buyers take different seats in parallel; nobody waits on the slot.
+  * A new booking holds its seat for BATCH_SEAT_HOLD_MINUTES. After that
+    the next buyer may reclaim it: the holder booking is EXPIRED in the
+    same transaction (only if it is still unpaid, not locked by a payment
+    confirmation, and has no payment in flight or success waiting to be
+    applied — see booking_sweeper.payment_in_flight).
+  * Payment success → confirm_seat() (hold becomes permanent).
+    Payment failure → release_hold() (seat reclaimable right away).
+    Booking expired / cancelled → free_seats().
+  * reconcile_batch_seats() (APScheduler, every 5 min) checks seats of
+    upcoming batch slots against Booking rows: frees seats of inactive
+    bookings, seats active bookings that have none, follows capacity.
+
+Lock order is seat → booking, and the booking lock here is SKIP LOCKED,
+so a confirmation (booking → seat) never deadlocks against a claim.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_BATCH_SIZE = 100
+
+
+class SlotFull(Exception):
+    pass
+
+
+def _hold_until(now):
+    return now + timedelta(minutes=settings.BATCH_SEAT_HOLD_MINUTES)
+
+
+def _ensure_seats(slot) -> bool:
+    """
+    Seat rows are created on the slot's first claim (once, under the slot
+    lock), seating the slot's existing active bookings. True if created.
+    """
+    from bookings.models import BatchSeat, ExpertSlot
+
+    if BatchSeat.objects.filter(slot=slot).exists():
+        return False
+    with transaction.atomic():
+        ExpertSlot.objects.select_for_update().filter(id=slot.id).first()
+        if BatchSeat.objects.filter(slot=slot).exists():
+            return False
+        reconcile_slot(slot)
+    return True
+
+
+def _reclaim(seat, now) -> bool:
+    """Take back a seat whose hold ran out. False if the holder still owns it."""
+    from bookings.models import Booking
+    from bookings.services.booking_sweeper import payment_in_flight
+
+    holder = (
+        Booking.objects
+        .select_for_update(skip_locked=True, of=("self",))
+        .filter(id=seat.booking_id)
+        .filter(~payment_in_flight(now))
+        .select_related("user")
+        .first()
+    )
+    if holder is None:
+        return False  # being paid right now, paid and awaiting its callback, or on the gateway page
+
+    if holder.status in (Booking.STATUS_PENDING, Booking.STATUS_AWAITING_PAYMENT):
+        Booking.objects.filter(id=holder.id).update(
+            status=Booking.STATUS_EXPIRED, expired_at=now, updated_at=now,
+        )
+        from notifications.services.events import notify_booking_expired
+        transaction.on_commit(lambda: notify_booking_expired(holder))
+        return True
+
+    if holder.status in Booking.ACTIVE_STATUSES:  # paid — the hold just wasn't cleared
+        seat.held_until = None
+        seat.save(update_fields=["held_until", "updated_at"])
+        return False
+    return True  # already terminal
+
+
+def claim_seat(slot, booking):
+    """
+    Hold a seat of `slot` for the just-inserted `booking`. Call inside the
+    booking's transaction. Raises SlotFull.
+    """
+    from bookings.models import BatchSeat
+
+    if _ensure_seats(slot):
+        seat = BatchSeat.objects.filter(booking=booking).first()
+        if seat is not None:
+            return seat  # seated by the initial reconcile, with the other active bookings
+
+    now = timezone.now()
+    tried = []
+    while True:
+        seat = (
+            BatchSeat.objects
+            .select_for_update(skip_locked=True)
+            .filter(slot=slot)
+            .filter(Q(booking__isnull=True) | Q(held_until__lt=now))
+            .exclude(id__in=tried)
+            .order_by("seat_no")
+            .first()
+        )
+        if seat is None:
+            raise SlotFull()
+        if seat.booking_id is None or _reclaim(seat, now):
+            break
+        tried.append(seat.id)
+
+    seat.booking = booking
+    seat.held_until = _hold_until(now)
+    seat.save(update_fields=["booking", "held_until", "updated_at"])
+    return seat
+
+
+def confirm_seat(booking):
+    """Payment succeeded: the seat is the booking's for good."""
+    from bookings.models import BatchSeat
+
+    BatchSeat.objects.filter(booking=booking).update(held_until=None, updated_at=timezone.now())
+
+
+def release_hold(booking):
+    """Payment failed: end the hold now. The booking keeps the seat until someone reclaims it."""
+    from bookings.models import BatchSeat
+
+    now = timezone.now()
+    BatchSeat.objects.filter(booking=booking, held_until__gt=now).update(held_until=now, updated_at=now)
+
+
+def free_seats(booking_ids):
+    """Bookings left ACTIVE_STATUSES (expired / cancelled): give their seats back."""
+    from bookings.models import BatchSeat
+
+    booking_ids = list(booking_ids)
+    if not booking_ids:
+        return 0
+    return BatchSeat.objects.filter(booking_id__in=booking_ids).update(
+        booking=None, held_until=None, updated_at=timezone.now(),
+    )
+
+
+# ──────────────────────────────────────────────────────
+# RECONCILIATION
+# ──────────────────────────────────────────────────────
+
+def reconcile_slot(slot, now=None) -> dict:
+    """Make one batch slot's seats agree with its Booking rows."""
+    from bookings.models import BatchSeat, Booking
+
+    now = now or timezone.now()
+    paid = [Booking.STATUS_PAID, Booking.STATUS_CONFIRMED]
+    result = {"freed": 0, "seated": 0, "overbooked": 0}
+
+    with transaction.atomic():
+        BatchSeat.objects.bulk_create(
+            [BatchSeat(slot=slot, seat_no=n) for n in range(1, slot.capacity + 1)],
+            ignore_conflicts=True,
+        )
+        seats = BatchSeat.objects.filter(slot=slot)
+
+        result["freed"] = (
+            seats.filter(booking__isnull=False)
+            .exclude(booking__status__in=Booking.ACTIVE_STATUSES)
+            .update(booking=None, held_until=None, updated_at=now)
+        )
+        seats.filter(held_until__isnull=False, booking__status__in=paid).update(
+            held_until=None, updated_at=now,
+        )
+
+        orphans = list(
+            Booking.objects
+            .filter(slot=slot, status__in=Booking.ACTIVE_STATUSES, seat__isnull=True)
+            .order_by("created_at")
+            .values_list("id", "status")
+        )
+        for booking_id, status in orphans:
+            seat = (
+                seats.select_for_update(skip_locked=True)
+                .filter(booking__isnull=True)
+                .order_by("seat_no")
+                .first()
+            )
+            if seat is None:
+                result["overbooked"] = len(orphans) - result["seated"]
+                logger.warning(
+                    "Batch slot %s overbooked: %d active bookings without a seat",
+                    slot.id, result["overbooked"],
+                )
+                break
+            seat.booking_id = booking_id
+            seat.held_until = None if status in paid else _hold_until(now)
+            seat.save(update_fields=["booking", "held_until", "updated_at"])
+            result["seated"] += 1
+
+        # capacity lowered: drop the free seats above it
+        seats.filter(seat_no__gt=slot.capacity, booking__isnull=True).delete()
+    return result
+
+
+def reconcile_batch_seats() -> dict:
+    """Periodic job: reconcile every upcoming batch slot, in id-keyset pages."""
+    from bookings.models import ExpertSlot
+
+    now = timezone.now()
+    totals = {"slots": 0, "freed": 0, "seated": 0, "overbooked": 0}
+    last_id = 0
+    while True:
+        page = list(
+            ExpertSlot.objects
+            .filter(
+                slot_mode=ExpertSlot.MODE_BATCH,
+                status="ACTIVE",
+                start_datetime__gt=now,
+                id__gt=last_id,
+            )
+            .order_by("id")[:RECONCILE_BATCH_SIZE]
+        )
+        if not page:
+            break
+        for slot in page:
+            try:
+                result = reconcile_slot(slot, now)
+            except Exception as e:
+                logger.error("Seat reconciliation failed [slot=%s]: %s", slot.id, e)
+                continue
+            totals["slots"] += 1
+            for key in ("freed", "seated", "overbooked"):
+                totals[key] += result[key]
+        last_id = page[-1].id
+
+    if totals["freed"] or totals["seated"] or totals["overbooked"]:
+        logger.info("Batch seat reconciliation: %s", totals)
+    return totals
@@ -0,0 +1,259 @@
+"""
+bookings/services/slot_materializer.py
+
+Expands SlotRecurringPattern rows into concrete ExpertSlots over a rolling
+horizon (SLOT_MATERIALIZE_HORIZON_DAYS), so experts don't have to create
+every weekly slot by hand through ExpertSlotCreateSerializer.
+
+Per expert, one run is:
+
+  * one fetch of the expert's patterns, and one range fetch of the
+    ExpertSlots that could collide with the new occurrences;
+  * overlap checks in memory (conflicts.IntervalSet) — a new occurrence
+    is skipped if it overlaps an ACTIVE slot, manual or generated;
+  * one bulk_create for everything that's left.
+
+Idempotent: ExpertSlot.pattern + unique (pattern, start_datetime). An
+occurrence that already exists in any status is never created again, so
+a generated slot the expert DISABLED stays gone.
+
+Incremental: SlotMaterializationState remembers how far each expert is
+materialized and a signature of their patterns. materialize_due_patterns()
+(APScheduler, every 15 min) only touches experts whose horizon moved on or
+whose patterns changed; an unchanged expert just gets the new day(s) at
+the end of the horizon. A pattern change re-expands from today and
+deletes the never-booked future slots the old pattern produced.
+
+Patterns are wall-clock times in settings.TIME_ZONE.
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from bookings.services.conflicts import MAX_SESSION, IntervalSet
+
+logger = logging.getLogger(__name__)
+
+EXPERT_BATCH_SIZE = 200
+BULK_CREATE_BATCH = 500
+
+
+def _signature(count, latest) -> str:
+    """Changes whenever a pattern is added, edited or deleted."""
+    return f"{count}:{latest.timestamp():.6f}" if latest else "0"
+
+
+def _occurrences(patterns, first, last, now, tz):
+    """(pattern, start, end) for every future occurrence in [first, last], by start."""
+    by_weekday = defaultdict(list)
+    for pattern in patterns:
+        by_weekday[pattern.weekday].append(pattern)
+
+    found = []
+    day = first
+    while day <= last:
+        for pattern in by_weekday.get(day.weekday(), ()):
+            if day < pattern.start_date or (pattern.end_date and day > pattern.end_date):
+                continue
+            start = datetime.combine(day, pattern.start_time, tzinfo=tz)
+            if start <= now:
+                continue
+            found.append((pattern, start, datetime.combine(day, pattern.end_time, tzinfo=tz)))
+        day += timedelta(days=1)
+    found.sort(key=lambda o: (o[1], o[0].id))
+    return found
+
+
+def _build_slot(pattern, start, end):
+    from bookings.models import ExpertSlot
+
+    slot = ExpertSlot(
+        expert_id=pattern.expert_id,
+        pattern=pattern,
+        start_datetime=start,
+        end_datetime=end,
+        duration_minutes=int((end - start).total_seconds() // 60),
+        slot_mode=pattern.slot_mode,
+        is_recurring=True,
+        status="ACTIVE",
+    )
+    # Same normalisation as ExpertSlotCreateSerializer.validate
+    if pattern.slot_mode == ExpertSlot.MODE_BATCH:
+        slot.capacity          = pattern.capacity
+        slot.batch_price       = pattern.batch_price
+        slot.requires_approval = False
+    else:
+        slot.chat_price        = pattern.chat_price
+        slot.video_call_price  = pattern.video_call_price
+        slot.requires_approval = pattern.requires_approval
+    return slot
+
+
+def _retire_stale(expert_id, occurrences, now, last, tz) -> int:
+    """
+    Delete future generated slots that no pattern produces any more (pattern
+    edited or deactivated). Only slots nobody has ever booked — Booking.slot
+    is PROTECT, and a booked slot is the expert's to cancel.
+    """
+    from bookings.models import ExpertSlot
+
+    expected = {(pattern.id, start) for pattern, start, _ in occurrences}
+    horizon_end = datetime.combine(last + timedelta(days=1), datetime.min.time(), tzinfo=tz)
+    stale = [
+        slot_id
+        for slot_id, pattern_id, start in ExpertSlot.objects
+        .filter(
+            expert_id=expert_id,
+            pattern__isnull=False,
+            status="ACTIVE",
+            start_datetime__gt=now,
+            start_datetime__lt=horizon_end,
+            bookings__isnull=True,
+        )
+        .values_list("id", "pattern_id", "start_datetime")
+        if (pattern_id, start) not in expected
+    ]
+    if not stale:
+        return 0
+    ExpertSlot.objects.filter(id__in=stale, bookings__isnull=True).delete()
+    return len(stale)
+
+
+def materialize_expert(expert_id, *, horizon_days=None, full=False) -> dict:
+    """
+    Create the missing slots of one expert's patterns up to the horizon.
+    full=True re-expands from today even if nothing changed.
+    """
+    from bookings.models import ExpertSlot, SlotMaterializationState, SlotRecurringPattern
+    from bookings.services.calendar import schedule_refresh
+
+    horizon_days = horizon_days or settings.SLOT_MATERIALIZE_HORIZON_DAYS
+    now   = timezone.now()
+    tz    = timezone.get_current_timezone()
+    today = timezone.localdate(now)
+    last  = today + timedelta(days=horizon_days)
+
+    patterns  = list(SlotRecurringPattern.objects.filter(expert_id=expert_id))
+    signature = _signature(len(patterns), max((p.updated_at for p in patterns), default=None))
+    state, _  = SlotMaterializationState.objects.get_or_create(expert_id=expert_id)
+
+    rescan = full or state.patterns_signature != signature or not state.materialized_until
+    first  = today if rescan else max(today, state.materialized_until + timedelta(days=1))
+
+    active      = [p for p in patterns if p.is_active and p.end_time > p.start_time]
+    occurrences = _occurrences(active, first, last, now, tz) if first <= last else []
+
+    retired = _retire_stale(expert_id, occurrences, now, last, tz) if rescan else 0
+
+    new, skipped = [], 0
+    if occurrences:
+        existing = list(
+            ExpertSlot.objects
+            .filter(
+                expert_id=expert_id,
+                start_datetime__gt=occurrences[0][1] - MAX_SESSION,
+                start_datetime__lt=max(end for _, _, end in occurrences),
+                end_datetime__gt=occurrences[0][1],
+            )
+            .values_list("pattern_id", "start_datetime", "end_datetime", "status")
+        )
+        taken = {(pattern_id, start) for pattern_id, start, _, _ in existing if pattern_id}
+        busy  = IntervalSet([(start, end) for _, start, end, status in existing if status == "ACTIVE"])
+
+        for pattern, start, end in occurrences:
+            if (pattern.id, start) in taken:
+                continue
+            if busy.overlaps(start, end):
+                skipped += 1
+                continue
+            busy.add(start, end)
+            new.append(_build_slot(pattern, start, end))
+
+    with transaction.atomic():
+        if new:
+            # ignore_conflicts: a concurrent run (command + scheduler) may have won the race
+            ExpertSlot.objects.bulk_create(new, batch_size=BULK_CREATE_BATCH, ignore_conflicts=True)
+            schedule_refresh((expert_id, slot.start_datetime) for slot in new)
+        SlotMaterializationState.objects.filter(expert_id=expert_id).update(
+            materialized_until=last,
+            patterns_signature=signature,
+            slots_created=F("slots_created") + len(new),
+            last_run_at=now,
+        )
+
+    if new or skipped or retired:
+        logger.info(
+            "Slots materialized: expert=%s %s..%s created=%d overlapping=%d retired=%d",
+            expert_id, first, last, len(new), skipped, retired,
+        )
+    return {
+        "created":         len(new),
+        "skipped_overlap": skipped,
+        "retired":         retired,
+        "from":            first,
+        "until":           last,
+    }
+
+
+def due_experts(*, horizon_days=None, limit=EXPERT_BATCH_SIZE) -> list:
+    """Experts with active patterns whose horizon moved on or whose patterns changed."""
+    from bookings.models import SlotMaterializationState, SlotRecurringPattern
+
+    horizon_days = horizon_days or settings.SLOT_MATERIALIZE_HORIZON_DAYS
+    last = timezone.localdate() + timedelta(days=horizon_days)
+
+    groups = list(
+        SlotRecurringPattern.objects
+        .values("expert_id")
+        .annotate(
+            total=Count("id"),
+            active=Count("id", filter=Q(is_active=True)),
+            latest=Max("updated_at"),
+        )
+        .filter(active__gt=0)
+    )
+    states = {
+        expert_id: (until, signature)
+        for expert_id, until, signature in SlotMaterializationState.objects
+        .filter(expert_id__in=[g["expert_id"] for g in groups])
+        .values_list("expert_id", "materialized_until", "patterns_signature")
+    }
+
+    due = []
+    for g in groups:
+        expert_id = g["expert_id"]
+        until, signature = states.get(expert_id, (None, ""))
+        if (
+            until is None
+            or until < last
+            or signature != _signature(g["total"], g["latest"])
+        ):
+            due.append(expert_id)
+            if limit and len(due) >= limit:
+                break
+    return due
+
+
+def materialize_due_patterns(limit: int = EXPERT_BATCH_SIZE) -> dict:
+    """Periodic job: materialize every expert that is due. Returns totals."""
+    totals = {"experts": 0, "created": 0, "skipped_overlap": 0, "retired": 0, "errors": 0}
+    for expert_id in due_experts(limit=limit):
+        try:
+            result = materialize_expert(expert_id)
+        except Exception as e:
+            logger.error("Slot materialization failed [expert=%s]: %s", expert_id, e)
+            totals["errors"] += 1
+            continue
+        totals["experts"] += 1
+        totals["created"] += result["created"]
+        totals["skipped_overlap"] += result["skipped_overlap"]
+        totals["retired"] += result["retired"]
+
+    if totals["experts"] or totals["errors"]:
+        logger.info("Slot materialization sweep: %s", totals)
+    return totals
@@ -0,0 +1,134 @@
+"""
+bookings/services/slot_search.py
+
+Cross-expert slot search: "any expert free tomorrow evening under ₹500
+for video" in one request instead of one ExpertSlotListView call per expert.
+
+search_slots() builds one query:
+
+  * status = 'ACTIVE' AND start_datetime in the window, slot_mode pinned
+    when the session type implies it — a range scan on the
+    (status, start_datetime, slot_mode) index, already in the keyset order;
+  * price range on the column of the requested session type (any of the
+    three without one);
+  * availability as correlated subqueries on the booking (slot, status)
+    index: NOT EXISTS for one-to-one slots, active count < capacity for
+    batch. No GROUP BY, so the scan stops as soon as a page is full;
+  * expertise: join to ExpertProfile on its unique user_id only when
+    asked for.
+
+Ordered by (start_datetime, id) for SlotSearchPagination. `manage.py
+explain_slot_search` prints the plan (optionally against seeded rows)
+and fails if the slot table is full-scanned; SlotSearchPlanTests in
+bookings/tests.py runs the same check on every test run.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+SEARCH_INDEX_NAME = "slot_search_idx"
+MAX_WINDOW_DAYS = 31
+
+MODE_CHAT = "CHAT"
+MODE_VIDEO_CALL = "VIDEO_CALL"
+MODE_BATCH = "BATCH"
+MODES = (MODE_CHAT, MODE_VIDEO_CALL, MODE_BATCH)
+
+
+class SearchError(ValueError):
+    pass
+
+
+def _price_q(field, min_price, max_price):
+    q = Q(**{f"{field}__gt": 0})
+    if min_price is not None:
+        q &= Q(**{f"{field}__gte": min_price})
+    if max_price is not None:
+        q &= Q(**{f"{field}__lte": max_price})
+    return q
+
+
+def search_slots(
+    *, start_after=None, start_before=None, mode=None,
+    min_price=None, max_price=None, expertise=None,
+):
+    """Open ExpertSlots of any expert matching the filters, by (start_datetime, id)."""
+    from bookings.models import Booking, ExpertSlot
+
+    now = timezone.now()
+    start_after = max(start_after or now, now)
+    start_before = start_before or start_after + timedelta(days=MAX_WINDOW_DAYS)
+    if start_before <= start_after:
+        raise SearchError("start_before must be after start_after.")
+    if start_before - start_after > timedelta(days=MAX_WINDOW_DAYS):
+        raise SearchError(f"The time window can be at most {MAX_WINDOW_DAYS} days.")
+    if mode is not None and mode not in MODES:
+        raise SearchError(f"mode must be one of {', '.join(MODES)}.")
+    for price in (min_price, max_price):
+        if price is not None and price < Decimal("0"):
+            raise SearchError("Prices must not be negative.")
+
+    chat_q  = _price_q("chat_price", min_price, max_price)
+    video_q = _price_q("video_call_price", min_price, max_price)
+    if mode == MODE_CHAT:
+        one_to_one_price = chat_q
+    elif mode == MODE_VIDEO_CALL:
+        one_to_one_price = video_q
+    else:
+        one_to_one_price = chat_q | video_q
+
+    active = Booking.objects.filter(slot=OuterRef("pk"), status__in=Booking.ACTIVE_STATUSES)
+    one_to_one = (
+        Q(slot_mode=ExpertSlot.MODE_ONE_TO_ONE)
+        & ~Exists(active)
+        & one_to_one_price
+    )
+    batch = (
+        Q(slot_mode=ExpertSlot.MODE_BATCH)
+        & Q(active_count__lt=F("capacity"))
+        & _price_q("batch_price", min_price, max_price)
+    )
+    if mode == MODE_BATCH:
+        wanted = batch
+    elif mode is not None:
+        wanted = one_to_one
+    else:
+        wanted = one_to_one | batch
+
+    qs = (
+        ExpertSlot.objects
+        .filter(
+            status="ACTIVE",
+            start_datetime__gte=start_after,
+            start_datetime__lt=start_before,
+        )
+        .annotate(
+            # read by services/availability.py when serializing
+            active_count=Coalesce(
+                Subquery(
+                    active.order_by().values("slot")
+                    .annotate(n=Count("id")).values("n")[:1],
+                    output_field=IntegerField(),
+                ),
+                Value(0),
+            )
+        )
+    )
+    if mode == MODE_BATCH:
+        qs = qs.filter(slot_mode=ExpertSlot.MODE_BATCH)
+    elif mode is not None:
+        qs = qs.filter(slot_mode=ExpertSlot.MODE_ONE_TO_ONE)
+    if expertise:
+        qs = qs.filter(
+            Q(expert__expert_profile__primary_expertise__icontains=expertise)
+            | Q(expert__expert_profile__other_expertise__icontains=expertise)
+        )
+
+    return (
+        qs.filter(wanted)
+        .select_related("expert")
+        .order_by("start_datetime", "id")
+    )
@@ -0,0 +1,54 @@
+"""
+Slot / booking changes → expert calendar day summaries and earnings.
+
+Each saved or deleted ExpertSlot or Booking schedules a refresh of the
+expert's day(s) it touches, run after the transaction commits. A booking
+saved as COMPLETED / CANCELLED gets its earnings ledger entry, also after
+commit. Bulk queryset.update() / bulk_create() bypass this — call
+bookings.services.calendar.schedule_refresh() and
+bookings.services.earnings.record_earnings().
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bookings.models import Booking, ExpertSlot
+from bookings.services.calendar import schedule_refresh
+from bookings.services.earnings import record_earnings
+
+
+@receiver(pre_save, sender=ExpertSlot)
+def remember_slot_start(sender, instance, **kwargs):
+    # a moved slot leaves its old day too
+    if instance.pk and not kwargs.get("raw"):
+        instance._calendar_old_start = (
+            ExpertSlot.objects.filter(pk=instance.pk)
+            .values_list("start_datetime", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=ExpertSlot)
+@receiver(post_delete, sender=ExpertSlot)
+def refresh_slot_days(sender, instance, **kwargs):
+    schedule_refresh([
+        (instance.expert_id, instance.start_datetime),
+        (instance.expert_id, getattr(instance, "_calendar_old_start", None)),
+    ])
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def refresh_booking_day(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "status" not in update_fields:
+        return  # availability only follows the status
+    schedule_refresh([(instance.expert_id, instance.start_datetime)])
+
+
+@receiver(post_save, sender=Booking)
+def record_booking_earnings(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and "status" not in update_fields):
+        return
+    if instance.status in (Booking.STATUS_COMPLETED, Booking.STATUS_CANCELLED):
+        booking_id = instance.id
+        transaction.on_commit(lambda: record_earnings([booking_id]))
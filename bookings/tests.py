@@ -1,3 +1,335 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+
+from payments.models import Payment, PaymentCallback
+from .models import Booking, ExpertSlot
+
+
+class BookingTestCase(TestCase):
+    """Users, slots and bookings for the service tests; notifications are not sent."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.expert = User.objects.create_user(username="expert", email="expert@example.com", password="x")
+        cls.user = User.objects.create_user(username="buyer", email="buyer@example.com", password="x")
+        cls.other = User.objects.create_user(username="buyer2", email="buyer2@example.com", password="x")
+        cls.start = timezone.now() + timedelta(days=2)
+
+    def setUp(self):
+        patcher = mock.patch("notifications.services.events._async")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_slot(self, *, hours=0, capacity=None, expert=None):
+        start = self.start + timedelta(hours=hours)
+        fields = dict(
+            expert=expert or self.expert,
+            start_datetime=start,
+            end_datetime=start + timedelta(minutes=30),
+            duration_minutes=30,
+            chat_price=Decimal("100.00"),
+            video_call_price=Decimal("100.00"),
+        )
+        if capacity:
+            fields.update(slot_mode=ExpertSlot.MODE_BATCH, capacity=capacity, batch_price=Decimal("50.00"))
+        return ExpertSlot.objects.create(**fields)
+
+    def make_booking(self, slot, user=None, *, status=Booking.STATUS_AWAITING_PAYMENT, age=None):
+        booking = Booking.objects.create(
+            user=user or self.user, expert=slot.expert, slot=slot, is_batch=slot.is_batch,
+            start_datetime=slot.start_datetime, end_datetime=slot.end_datetime,
+            duration_minutes=slot.duration_minutes, price=Decimal("100.00"),
+            status=status, requires_expert_approval=False,
+        )
+        if age is not None:
+            Booking.objects.filter(id=booking.id).update(created_at=timezone.now() - age)
+        return booking
+
+    def make_payment(self, booking, *, status=Payment.STATUS_INITIATED, age=None):
+        payment = Payment.objects.create(
+            user=booking.user, purpose=Payment.PURPOSE_BOOKING, reference_id=booking.uuid,
+            amount=booking.price, status=status, gateway=Payment.GATEWAY_PAYU,
+        )
+        if age is not None:
+            Payment.objects.filter(id=payment.id).update(created_at=timezone.now() - age)
+        return payment
+
+
+class LatePaymentTests(BookingTestCase):
+    """A paid booking must not be lost to expiry while its callback is queued."""
+
+    stale = timedelta(hours=2)  # past BOOKING_PAYMENT_TTL_MINUTES and the payment grace window
+
+    def test_sweeper_skips_bookings_with_a_queued_success(self):
+        from bookings.services.booking_sweeper import expire_stale_bookings
+
+        queued = self.make_booking(self.make_slot(), age=self.stale)
+        payment = self.make_payment(queued, age=self.stale)
+        PaymentCallback.objects.create(
+            payment=payment, txnid="txn-1", status=Payment.STATUS_SUCCESS,
+            source=PaymentCallback.SOURCE_WEBHOOK, payload={},
+        )
+        paid = self.make_booking(self.make_slot(hours=1), age=self.stale)
+        self.make_payment(paid, status=Payment.STATUS_SUCCESS, age=self.stale)
+        abandoned = self.make_booking(self.make_slot(hours=2), age=self.stale)
+
+        self.assertEqual(expire_stale_bookings(), 1)
+        statuses = dict(Booking.objects.values_list("id", "status"))
+        self.assertEqual(statuses[queued.id], Booking.STATUS_AWAITING_PAYMENT)
+        self.assertEqual(statuses[paid.id], Booking.STATUS_AWAITING_PAYMENT)
+        self.assertEqual(statuses[abandoned.id], Booking.STATUS_EXPIRED)
+
+    def test_expired_paid_booking_is_reconfirmed_if_the_slot_is_free(self):
+        from bookings.services.confirm_booking import confirm_booking_after_payment
+
+        booking = self.make_booking(self.make_slot(), status=Booking.STATUS_EXPIRED)
+        payment = self.make_payment(booking, status=Payment.STATUS_SUCCESS)
+
+        confirm_booking_after_payment(payment=payment)
+
+        booking.refresh_from_db()
+        payment.refresh_from_db()
+        self.assertEqual(booking.status, Booking.STATUS_CONFIRMED)
+        self.assertIsNone(payment.refund_required_at)
+
+    def test_expired_paid_booking_is_flagged_for_refund_if_the_slot_is_taken(self):
+        from bookings.services.confirm_booking import confirm_booking_after_payment
+
+        slot = self.make_slot()
+        booking = self.make_booking(slot, status=Booking.STATUS_EXPIRED)
+        self.make_booking(slot, self.other)
+        payment = self.make_payment(booking, status=Payment.STATUS_SUCCESS)
+
+        confirm_booking_after_payment(payment=payment)
+
+        booking.refresh_from_db()
+        payment.refresh_from_db()
+        self.assertEqual(booking.status, Booking.STATUS_EXPIRED)
+        self.assertIsNotNone(payment.refund_required_at)
+
+
+class SeatHoldTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.slot = self.make_slot(capacity=2)
+
+    def claim(self, user):
+        from bookings.services.seat_holds import claim_seat
+
+        booking = self.make_booking(self.slot, user, status=Booking.STATUS_PENDING)
+        return booking, claim_seat(self.slot, booking)
+
+    def lapse(self, seat):
+        seat.held_until = timezone.now() - timedelta(minutes=1)
+        seat.save(update_fields=["held_until"])
+
+    def test_full_slot_raises_slot_full(self):
+        from bookings.services.seat_holds import SlotFull
+
+        self.claim(self.user)
+        self.claim(self.other)
+        with self.assertRaises(SlotFull):
+            self.claim(self.expert)
+
+    def test_lapsed_hold_is_reclaimed_and_its_holder_expired(self):
+        holder, seat = self.claim(self.user)
+        self.claim(self.other)
+        self.lapse(seat)
+
+        booking, reclaimed = self.claim(self.expert)
+
+        self.assertEqual((reclaimed.id, reclaimed.booking_id), (seat.id, booking.id))
+        holder.refresh_from_db()
+        self.assertEqual(holder.status, Booking.STATUS_EXPIRED)
+
+    def test_paid_holder_is_not_reclaimed(self):
+        from bookings.services.seat_holds import SlotFull
+
+        holder, seat = self.claim(self.user)
+        self.claim(self.other)
+        self.make_payment(holder, status=Payment.STATUS_SUCCESS)
+        self.lapse(seat)
+
+        with self.assertRaises(SlotFull):
+            self.claim(self.expert)
+        holder.refresh_from_db()
+        self.assertEqual(holder.status, Booking.STATUS_PENDING)
+
+    def test_reconcile_seats_orphans_and_frees_inactive_seats(self):
+        from bookings.models import BatchSeat
+        from bookings.services.seat_holds import reconcile_slot
+
+        cancelled, _ = self.claim(self.user)
+        Booking.objects.filter(id=cancelled.id).update(status=Booking.STATUS_CANCELLED)
+        orphan = self.make_booking(self.slot, self.other, status=Booking.STATUS_CONFIRMED)
+
+        result = reconcile_slot(self.slot)
+
+        self.assertEqual((result["freed"], result["seated"], result["overbooked"]), (1, 1, 0))
+        self.assertFalse(BatchSeat.objects.filter(booking=cancelled).exists())
+        seat = BatchSeat.objects.get(booking=orphan)
+        self.assertIsNone(seat.held_until)
+
+    def test_declined_booking_gives_its_seat_back(self):
+        from bookings.models import BatchSeat
+        from rest_framework.test import APIClient
+
+        booking, seat = self.claim(self.user)
+        client = APIClient()
+        client.force_authenticate(self.expert)
+        response = client.post(f"/api/v1/bookings/{booking.uuid}/approve/", {"approve": False}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        seat.refresh_from_db()
+        self.assertIsNone(seat.booking_id)
+        self.assertFalse(BatchSeat.objects.filter(booking=booking).exists())
+
+
+class SlotSearchPlanTests(BookingTestCase):
+    """
+    The cross-expert search must range-scan slot_search_idx, never read the
+    whole slot table. `manage.py explain_slot_search --seed 1000000` runs
+    the same check at production size.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        slots = []
+        for n in range(2000):
+            # a year of history and a year ahead, a fifth of them batch, some disabled
+            start = now + timedelta(hours=(n * 37) % (24 * 730) - 24 * 365, minutes=30 * (n % 2))
+            batch = n % 5 == 0
+            slots.append(ExpertSlot(
+                expert=cls.expert if n % 2 else cls.other,
+                start_datetime=start,
+                end_datetime=start + timedelta(minutes=30),
+                duration_minutes=30,
+                slot_mode=ExpertSlot.MODE_BATCH if batch else ExpertSlot.MODE_ONE_TO_ONE,
+                capacity=10 if batch else 1,
+                batch_price=Decimal("50.00") if batch else 0,
+                chat_price=0 if batch else Decimal("100.00"),
+                video_call_price=0 if batch else Decimal("150.00"),
+                requires_approval=False,
+                status="DISABLED" if n % 7 == 0 else "ACTIVE",
+            ))
+        ExpertSlot.objects.bulk_create(slots)
+        with connection.cursor() as cursor:  # planner statistics for the seeded rows
+            table = ExpertSlot._meta.db_table
+            cursor.execute(f"ANALYZE TABLE {table}" if connection.vendor == "mysql" else f"ANALYZE {table}")
+
+    def _plans(self):
+        from bookings.management.commands.explain_slot_search import _full_scan
+        from bookings.services.slot_search import MODES, search_slots
+
+        tomorrow = timezone.localtime().replace(hour=18, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        for mode in (None, *MODES):
+            qs = search_slots(
+                start_after=tomorrow, start_before=tomorrow + timedelta(hours=24),
+                mode=mode, max_price=Decimal("500"),
+            )[:21]
+            yield (mode, *_full_scan(qs))
+
+    def test_search_never_full_scans_the_slot_table(self):
+        for mode, plan, full_scan in self._plans():
+            with self.subTest(mode=mode):
+                self.assertFalse(full_scan, plan)
+
+    # SQLite keeps no per-value statistics, so it can't tell that status =
+    # 'ACTIVE' narrows the range and takes the equivalent (start_datetime)
+    # index; the index choice is asserted on the production engine.
+    @skipUnless(connection.vendor == "mysql", "index choice is checked on MySQL")
+    def test_search_uses_the_slot_search_index(self):
+        from bookings.services.slot_search import SEARCH_INDEX_NAME
+
+        for mode, plan, _full in self._plans():
+            with self.subTest(mode=mode):
+                self.assertIn(f'"key": "{SEARCH_INDEX_NAME}"', plan)
+
+
+class ConflictCheckTests(BookingTestCase):
+    def _serializer(self, slot):
+        from rest_framework.test import APIRequestFactory
+        from .serializers import BookingCreateSerializer
+
+        request = APIRequestFactory().post("/api/v1/bookings/")
+        request.user = self.user
+        return BookingCreateSerializer(
+            data={"slot_id": str(slot.uuid), "session_type": Booking.SESSION_TYPE_VIDEO_CALL},
+            context={"request": request},
+        )
+
+    def test_user_cannot_book_overlapping_sessions_with_different_experts(self):
+        from rest_framework.exceptions import ValidationError
+
+        first = self.make_slot()
+        overlapping = self.make_slot(expert=self.other)
+        ExpertSlot.objects.filter(id=overlapping.id).update(
+            start_datetime=first.start_datetime + timedelta(minutes=15),
+            end_datetime=first.end_datetime + timedelta(minutes=15),
+        )
+        overlapping.refresh_from_db()
+
+        # both requests pass validate() before either is saved
+        a, b = self._serializer(first), self._serializer(overlapping)
+        self.assertTrue(a.is_valid(), a.errors)
+        self.assertTrue(b.is_valid(), b.errors)
+        a.save()
+        with self.assertRaisesMessage(ValidationError, "another session at this time"):
+            b.save()
+        self.assertEqual(Booking.objects.filter(user=self.user).count(), 1)
+
+        # and the early check in validate() answers the next request
+        c = self._serializer(overlapping)
+        self.assertFalse(c.is_valid())
+
+    def test_back_to_back_sessions_do_not_conflict(self):
+        first = self.make_slot()
+        self.make_booking(first)
+        later = self.make_slot(expert=self.other)
+        ExpertSlot.objects.filter(id=later.id).update(
+            start_datetime=first.end_datetime, end_datetime=first.end_datetime + timedelta(minutes=30),
+        )
+        serializer = self._serializer(ExpertSlot.objects.get(id=later.id))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_batch_mode_catches_existing_and_in_list_overlaps(self):
+        from bookings.services.conflicts import expert_conflicts_many
+
+        existing = self.make_slot()
+        start, half = existing.start_datetime, timedelta(minutes=30)
+        intervals = [
+            (start + half / 2, start + half * 1.5),  # overlaps the existing slot
+            (start + half * 2, start + half * 3),    # free
+            (start + half * 2.5, start + half * 3.5),  # overlaps the previous one
+            (start + half * 3, start + half * 4),    # free: starts where the free one ends
+        ]
+        self.assertEqual(expert_conflicts_many(self.expert.id, intervals), [True, False, True, False])
+
+    def test_bulk_create_rejects_overlaps_all_or_nothing(self):
+        from rest_framework.test import APIClient
 
-# Create your tests here.
+        client = APIClient()
+        client.force_authenticate(self.expert)
+        start = self.start + timedelta(days=1)
+        payload = [
+            {
+                "start_datetime": (start + timedelta(minutes=m)).isoformat(),
+                "end_datetime": (start + timedelta(minutes=m + 30)).isoformat(),
+                "duration_minutes": 30, "chat_price": "100.00", "video_call_price": "100.00",
+            }
+            for m in (0, 60, 75)
+        ]
+        before = ExpertSlot.objects.count()
+        response = client.post("/api/v1/bookings/experts/slots/bulk/", payload, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("positions 2 overlap", str(response.json()))
+        self.assertEqual(ExpertSlot.objects.count(), before)
@@ -1,9 +1,15 @@
 from django.urls import path
 from .views import (
     ExpertSlotListView,
+    ExpertCalendarView,
+    ExpertSlotSearchView,
     ExpertSlotCreateView,
+    ExpertSlotBulkCreateView,
     ExpertSlotUpdateView,
     ExpertSlotDeleteView,
+    ExpertEarningsView,
+    CalendarFeedTokenView,
+    calendar_feed,
     BookingListCreateView,
     BookingDetailView,
     BookingApprovalView,
@@ -22,11 +28,31 @@ urlpatterns = [
         ExpertSlotListView.as_view(),
         name="expert-slots",
     ),
+    path(
+        "experts/<uuid:expert_id>/calendar/",
+        ExpertCalendarView.as_view(),
+        name="expert-calendar",
+    ),
+    path(
+        "slots/search/",
+        ExpertSlotSearchView.as_view(),
+        name="slot-search",
+    ),
     path(
         "experts/slots/",
         ExpertSlotCreateView.as_view(),
         name="slot-create",
     ),
+    path(
+        "experts/slots/bulk/",
+        ExpertSlotBulkCreateView.as_view(),
+        name="slot-bulk-create",
+    ),
+    path(
+        "experts/earnings/",
+        ExpertEarningsView.as_view(),
+        name="expert-earnings",
+    ),
     path(
         "experts/slots/<uuid:id>/",
         ExpertSlotUpdateView.as_view(),
@@ -55,6 +81,19 @@ urlpatterns = [
         BookingApprovalView.as_view(),
         name="booking-approve",
     ),
+    # =======================
+    # CALENDAR FEED
+    # =======================
+    path(
+        "calendar-feed/",
+        CalendarFeedTokenView.as_view(),
+        name="calendar-feed-token",
+    ),
+    path(
+        "calendar/<str:token>.ics",
+        calendar_feed,
+        name="calendar-feed",
+    ),
     # INVESTOR SLOTS
     path(
         "investors/<uuid:investor_id>/slots/",
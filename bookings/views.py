@@ -1,5 +1,6 @@
 from django.utils import timezone
 from django.db import transaction, models
+from django.views.decorators.http import condition
 
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
@@ -11,9 +12,11 @@ from .models import (
     Booking,
     InvestorSlot,
     InvestorBooking,
+    CalendarFeedToken,
 )
 from .serializers import (
     ExpertSlotSerializer,
+    ExpertSlotSearchSerializer,
     ExpertSlotCreateSerializer,
     ExpertSlotUpdateSerializer,
     BookingCreateSerializer,
@@ -25,12 +28,48 @@ from .serializers import (
     InvestorBookingCreateSerializer,
 )
 from bookings.services.investor_booking_confirm import create_investor_booking
+from bookings.services.seat_holds import free_seats
 from notifications.services.events import (
     notify_booking_created,
     notify_booking_approved,
     notify_booking_declined,
 )
-from .pagination import SlotCursorPagination
+from .pagination import BookingKeysetPagination, SlotCursorPagination, SlotKeysetPagination
+
+
+def _query_datetime(params, name):
+    """ISO 8601 datetime query parameter (naive = local time), or None."""
+    from django.utils.dateparse import parse_datetime
+
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        value = parse_datetime(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError(f"{name} must be an ISO 8601 datetime.")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _query_date(params, name):
+    """YYYY-MM-DD date query parameter, or None."""
+    from django.utils.dateparse import parse_date
+
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        value = parse_date(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError(f"{name} must be a date (YYYY-MM-DD).")
+    return value
+
 
 # ===========================================================
 # SLOT VIEWS
@@ -70,6 +109,7 @@ class ExpertSlotListView(generics.ListAPIView):
                 status="ACTIVE",
                 start_datetime__gt=timezone.now(),
             )
+            .select_related("expert")
             .annotate(
                 active_count=Count(
                     "bookings",
@@ -81,6 +121,48 @@ class ExpertSlotListView(generics.ListAPIView):
         )
 
 
+class ExpertSlotSearchView(generics.ListAPIView):
+    """
+    GET /api/v1/bookings/slots/search/?start_after=&start_before=&mode=
+        &min_price=&max_price=&expertise=&cursor=
+    Open slots of any expert in a time window (at most 31 days), filtered
+    by session mode (CHAT / VIDEO_CALL / BATCH), price and expertise.
+    """
+
+    serializer_class = ExpertSlotSearchSerializer
+    pagination_class = SlotKeysetPagination
+
+    def get_queryset(self):
+        from decimal import Decimal, InvalidOperation
+        from bookings.services.slot_search import SearchError, search_slots
+
+        params = self.request.query_params
+
+        def _price(name):
+            raw = params.get(name)
+            if not raw:
+                return None
+            try:
+                value = Decimal(raw)
+            except InvalidOperation:
+                value = None
+            if value is None or not value.is_finite():
+                raise ValidationError(f"{name} must be a number.")
+            return value
+
+        try:
+            return search_slots(
+                start_after=_query_datetime(params, "start_after"),
+                start_before=_query_datetime(params, "start_before"),
+                mode=(params.get("mode") or "").upper() or None,
+                min_price=_price("min_price"),
+                max_price=_price("max_price"),
+                expertise=(params.get("expertise") or "").strip() or None,
+            )
+        except SearchError as e:
+            raise ValidationError(str(e))
+
+
 class ExpertSlotCreateView(generics.CreateAPIView):
     """
     Expert creates a new slot.
@@ -93,6 +175,26 @@ class ExpertSlotCreateView(generics.CreateAPIView):
         serializer.save(expert=self.request.user)
 
 
+class ExpertSlotBulkCreateView(generics.CreateAPIView):
+    """
+    Expert creates up to MAX_SLOTS slots in one request (a JSON list).
+    All-or-nothing; overlaps are checked with one query for the whole list.
+    """
+
+    serializer_class = ExpertSlotCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    MAX_SLOTS = 50
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(many=True, max_length=self.MAX_SLOTS, allow_empty=False)
+        return super().get_serializer(*args, **kwargs)
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save(expert=self.request.user)
+
+
 class ExpertSlotUpdateView(generics.UpdateAPIView):
     """
     Expert updates own slot.
@@ -135,14 +237,89 @@ class ExpertSlotDeleteView(generics.DestroyAPIView):
         instance.delete()
 
 
+class ExpertCalendarView(APIView):
+    """
+    GET /api/v1/bookings/experts/<uuid>/calendar/?from=YYYY-MM-DD&to=YYYY-MM-DD
+    Per-day availability summary (open slots, seats left, lowest price,
+    modes) from ExpertDaySummary. Defaults to the next 31 days; at most 62.
+    """
+
+    MAX_DAYS = 62
+
+    def get(self, request, expert_id):
+        from datetime import timedelta
+        from bookings.services.calendar import calendar_days
+
+        params = request.query_params
+        today = timezone.localdate()
+        first = max(_query_date(params, "from") or today, today)
+        last = _query_date(params, "to") or first + timedelta(days=30)
+        if last < first:
+            raise ValidationError("to must not be before from.")
+        if (last - first).days >= self.MAX_DAYS:
+            raise ValidationError(f"At most {self.MAX_DAYS} days per request.")
+
+        days = [
+            {
+                "date":       row.day,
+                "open_slots": row.open_slots,
+                "seats_left": row.seats_left,
+                "min_price":  row.min_price,
+                "modes":      row.modes,
+            }
+            for row in calendar_days(expert_id, first, last)
+        ]
+        return Response({"from": first, "to": last, "days": days})
+
+
 # ============================================================
 # BOOKING VIEWS
 # ============================================================
 
 
-class BookingListCreateView(generics.ListCreateAPIView):
+class BookingListMixin:
+    """
+    GET ...?status=CONFIRMED,PAID&start_after=&start_before=&session_type=
+        &order=asc|desc&cursor=&page_size=
+    Keyset-paged booking list of the requesting participant. The first
+    page also carries `counts`: bookings per status in the same scope
+    (every filter but status), from one grouped query.
+    """
+
+    pagination_class = BookingKeysetPagination
+
+    def filter_queryset(self, queryset):
+        from bookings.services.booking_lists import ListFilterError, filter_bookings
+
+        params = self.request.query_params
+        statuses = [
+            value.strip().upper()
+            for value in (params.get("status") or "").split(",")
+            if value.strip()
+        ]
+        try:
+            self.list_scope, queryset = filter_bookings(
+                queryset,
+                statuses=statuses,
+                start_after=_query_datetime(params, "start_after"),
+                start_before=_query_datetime(params, "start_before"),
+                session_type=(params.get("session_type") or "").strip().upper() or None,
+            )
+        except ListFilterError as e:
+            raise ValidationError(str(e))
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        from bookings.services.booking_lists import status_counts
+
+        response = super().list(request, *args, **kwargs)
+        if not request.query_params.get(self.paginator.cursor_query_param):
+            response.data["counts"] = status_counts(self.list_scope)
+        return response
+
+
+class BookingListCreateView(BookingListMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = None
 
     def get_serializer_class(self):
         return (
@@ -155,10 +332,12 @@ class BookingListCreateView(generics.ListCreateAPIView):
         user = self.request.user
         as_expert = self.request.query_params.get("as_expert")
 
+        # read by BookingSerializer for every row (slot__call_room: batch rows)
+        related = ("user", "expert", "slot", "call_room", "slot__call_room")
         if as_expert == "true":
-            return Booking.objects.filter(expert=user).select_related("call_room")
+            return Booking.objects.filter(expert=user).select_related(*related)
 
-        return Booking.objects.filter(user=user).select_related("call_room")
+        return Booking.objects.filter(user=user).select_related(*related)
 
     def create(self, request, *args, **kwargs):
         """
@@ -268,6 +447,8 @@ class BookingApprovalView(APIView):
                 "updated_at",
             ]
         )
+        if booking.is_batch:
+            free_seats([booking.id])
         notify_booking_declined(booking)
         return Response(
             {"message": "Booking declined."},
@@ -275,6 +456,130 @@ class BookingApprovalView(APIView):
         )
 
 
+# ============================================================
+# EARNINGS VIEWS
+# ============================================================
+
+
+class ExpertEarningsView(APIView):
+    """
+    GET /api/v1/bookings/experts/earnings/?group=day|month&from=YYYY-MM-DD&to=YYYY-MM-DD
+    The requesting expert's earnings per day (default: the last 30 days,
+    at most 366) or per month (default: the last 12, at most 60), with
+    totals over the range. Read from the rollup tables only.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_DAYS = 366
+    MAX_MONTHS = 60
+
+    def get(self, request):
+        from datetime import date, timedelta
+        from .models import ExpertEarningsDay, ExpertEarningsMonth
+        from bookings.services.earnings import ROLLUP_FIELDS
+
+        params = request.query_params
+        group = (params.get("group") or "day").lower()
+        today = timezone.localdate()
+        if group == "day":
+            last = _query_date(params, "to") or today
+            first = _query_date(params, "from") or last - timedelta(days=29)
+            if (last - first).days >= self.MAX_DAYS:
+                raise ValidationError(f"At most {self.MAX_DAYS} days per request.")
+            model, key = ExpertEarningsDay, "day"
+        elif group == "month":
+            last = (_query_date(params, "to") or today).replace(day=1)
+            first = _query_date(params, "from")
+            if first is None:
+                index = last.year * 12 + last.month - 1 - 11  # 12 months up to `last`
+                first = date(index // 12, index % 12 + 1, 1)
+            first = first.replace(day=1)
+            if (last.year - first.year) * 12 + last.month - first.month >= self.MAX_MONTHS:
+                raise ValidationError(f"At most {self.MAX_MONTHS} months per request.")
+            model, key = ExpertEarningsMonth, "month"
+        else:
+            raise ValidationError("group must be day or month.")
+        if last < first:
+            raise ValidationError("to must not be before from.")
+
+        rows = list(
+            model.objects
+            .filter(expert=request.user, **{f"{key}__gte": first, f"{key}__lte": last})
+            .order_by(key)
+            .values(key, *ROLLUP_FIELDS)
+        )
+        totals = {field: sum(row[field] for row in rows) for field in ROLLUP_FIELDS}
+        return Response({
+            "group":   group,
+            "from":    first,
+            "to":      last,
+            "totals":  totals,
+            "results": [{"date": row.pop(key), **row} for row in rows],
+        })
+
+
+# ============================================================
+# CALENDAR FEED VIEWS
+# ============================================================
+
+
+class CalendarFeedTokenView(APIView):
+    """
+    GET  /api/v1/bookings/calendar-feed/ → the user's .ics feed URL (created on first use)
+    POST /api/v1/bookings/calendar-feed/ → rotate the token: old subscriptions stop working
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _response(self, request, feed):
+        from django.urls import reverse
+
+        url = request.build_absolute_uri(reverse("calendar-feed", args=[feed.token]))
+        return Response({"url": url, "created_at": feed.created_at, "rotated_at": feed.rotated_at})
+
+    def get(self, request):
+        feed, _ = CalendarFeedToken.objects.get_or_create(user=request.user)
+        return self._response(request, feed)
+
+    def post(self, request):
+        feed, created = CalendarFeedToken.objects.get_or_create(user=request.user)
+        if not created:
+            feed.rotate()
+        return self._response(request, feed)
+
+
+def _feed_user(token):
+    from django.http import Http404
+
+    feed = CalendarFeedToken.objects.select_related("user").filter(token=token).first()
+    if feed is None or not feed.user.is_active:
+        raise Http404
+    return feed.user
+
+
+def _feed_etag(request, token):
+    from bookings.services.ical_feed import feed_etag
+
+    return feed_etag(_feed_user(token))
+
+
+@condition(etag_func=_feed_etag)
+def calendar_feed(request, token):
+    """
+    GET /api/v1/bookings/calendar/<token>.ics
+    The token is the credential (calendar clients can't send a JWT). A
+    matching If-None-Match gets a 304 from the ETag alone; otherwise the
+    feed is streamed event by event.
+    """
+    from django.http import StreamingHttpResponse
+    from bookings.services.ical_feed import iter_feed
+
+    response = StreamingHttpResponse(iter_feed(_feed_user(token)), content_type="text/calendar; charset=utf-8")
+    response["Content-Disposition"] = 'inline; filename="sessions.ics"'
+    response["Cache-Control"] = "private, max-age=300"
+    return response
+
+
 # ==================================================================
 # Investor views - separate from expert/user bookings, as they have different flows and permissions
 # ==================================================================
@@ -287,13 +592,26 @@ class InvestorSlotListView(generics.ListAPIView):
 
     def get_queryset(self):
 
+        from django.db.models import Count, Q
+
         investor_uuid = self.kwargs["investor_id"]
 
-        return InvestorSlot.objects.filter(
-            investor__uuid=investor_uuid,
-            status="ACTIVE",
-            start_datetime__gt=timezone.now(),
-        ).order_by("start_datetime")
+        # active_count feeds InvestorSlotSerializer.is_available without a query per slot
+        return (
+            InvestorSlot.objects.filter(
+                investor__uuid=investor_uuid,
+                status="ACTIVE",
+                start_datetime__gt=timezone.now(),
+            )
+            .select_related("investor")
+            .annotate(
+                active_count=Count(
+                    "bookings",
+                    filter=Q(bookings__status__in=InvestorBooking.ACTIVE_STATUSES),
+                )
+            )
+            .order_by("start_datetime")
+        )
 
 
 class InvestorSlotCreateView(generics.CreateAPIView):
@@ -335,7 +653,7 @@ class InvestorBookingCreateView(APIView):
         return Response(response.data, status=status.HTTP_201_CREATED)
 
 
-class InvestorBookingListView(generics.ListAPIView):
+class InvestorBookingListView(BookingListMixin, generics.ListAPIView):
 
     serializer_class = InvestorBookingSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -345,7 +663,8 @@ class InvestorBookingListView(generics.ListAPIView):
         user = self.request.user
         as_investor = self.request.query_params.get("as_investor")
 
+        related = ("user", "investor", "call_room")
         if as_investor == "true":
-            return InvestorBooking.objects.filter(investor=user).select_related("call_room")
+            return InvestorBooking.objects.filter(investor=user).select_related(*related)
 
-        return InvestorBooking.objects.filter(user=user).select_related("call_room")
+        return InvestorBooking.objects.filter(user=user).select_related(*related)
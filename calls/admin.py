@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import CallRoom, CallParticipant, CallRecording, CallMessage, CallNote
+from .models import CallRoom, CallParticipant, CallRecording, CallMessage, CallNote, LiveKitWebhookEvent
 
 
 class CallParticipantInline(admin.TabularInline):
@@ -88,3 +88,23 @@ class CallMessageAdmin(admin.ModelAdmin):
     def has_file(self, obj):
         return bool(obj.file)
     has_file.boolean = True
+
+
+@admin.register(LiveKitWebhookEvent)
+class LiveKitWebhookEventAdmin(admin.ModelAdmin):
+    list_display    = ["id", "event", "event_id", "status", "attempts", "received_at", "processed_at"]
+    list_filter     = ["status", "event"]
+    search_fields   = ["event_id", "payload"]
+    readonly_fields = ["event_id", "event", "payload", "attempts", "locked_at",
+                       "last_error", "received_at", "processed_at"]
+    actions         = ["retry_now"]
+
+    @admin.action(description="Retry now")
+    def retry_now(self, request, queryset):
+        from django.utils import timezone
+        n = queryset.exclude(status=LiveKitWebhookEvent.STATUS_PROCESSING).update(
+            status=LiveKitWebhookEvent.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{n} events re-queued (picked up within 30s).")
@@ -11,15 +11,18 @@ class CallsConfig(AppConfig):
 
     def ready(self):
         import sys
+        import calls.signals  # noqa: F401  (booking → chat membership cache)
+
         # Skip during management commands that don't need the scheduler
-        skip_commands = {"migrate", "makemigrations", "test", "collectstatic", "shell"}
+        # (run_scheduler builds its own, job-running scheduler)
+        skip_commands = {"migrate", "makemigrations", "test", "collectstatic", "shell", "run_scheduler"}
         if any(cmd in sys.argv for cmd in skip_commands):
             return
 
         try:
-            from calls.services.auto_cut import get_scheduler
+            from calls.services.scheduler import get_scheduler
             scheduler = get_scheduler()
             if scheduler.running:
-                logger.info("APScheduler running — auto-cut jobs active.")
+                logger.info("APScheduler ready — auto-cut jobs can be scheduled.")
         except Exception as e:
             logger.error("APScheduler init failed: %s", e)
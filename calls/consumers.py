@@ -163,7 +163,7 @@ class CallChatConsumer(AsyncWebsocketConsumer):
         Returns True if this user may join the chat, else False.
         """
         from calls.models import CallRoom
-        from bookings.models import Booking
+        from calls.services.chat_state import get_blocked_ids, is_batch_member
 
         try:
             room = CallRoom.objects.get(id=self.room_id)
@@ -179,11 +179,7 @@ class CallChatConsumer(AsyncWebsocketConsumer):
             if room.advisor_id == uid:
                 ok = True
             else:
-                ok = Booking.objects.filter(
-                    slot_id=room.slot_id,
-                    user_id=uid,
-                    status=Booking.STATUS_CONFIRMED,
-                ).exists()
+                ok = is_batch_member(room.slot_id, uid)  # cached per (slot, user)
         else:  # one-to-one room
             ok = room.user_id == uid or room.advisor_id == uid
 
@@ -191,22 +187,15 @@ class CallChatConsumer(AsyncWebsocketConsumer):
             return False
 
         self.is_host = room.advisor_id == uid
-        self.blocked_ids = set(room.chat_blocked_user_ids or [])
+        self.blocked_ids = get_blocked_ids(room.id)
         self.is_blocked = uid in self.blocked_ids
         return True
 
     @sync_to_async
     def _set_block(self, target_id, blocked):
-        from calls.models import CallRoom
-        room = CallRoom.objects.get(id=self.room_id)
-        ids = set(room.chat_blocked_user_ids or [])
-        if blocked:
-            ids.add(target_id)
-        else:
-            ids.discard(target_id)
-        room.chat_blocked_user_ids = list(ids)
-        room.save(update_fields=["chat_blocked_user_ids", "updated_at"])
-        return list(ids)
+        # Atomic SADD/SREM in Redis; persisted to the room row periodically.
+        from calls.services.chat_state import set_blocked
+        return sorted(set_blocked(self.room_id, target_id, blocked))
 
     @sync_to_async
     def _save_message(self, text):
@@ -5,7 +5,23 @@ from calls.tasks import cleanup_expired_recordings
 class Command(BaseCommand):
     help = "Delete call recordings from Cloudinary that are past their 7-day retention period"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Only count expired recordings; delete nothing")
+        parser.add_argument("--limit", type=int, default=None,
+                            help="Process at most this many recordings in this run")
+
     def handle(self, *args, **options):
         self.stdout.write("Starting Cloudinary recording cleanup...")
-        count = cleanup_expired_recordings()
-        self.stdout.write(self.style.SUCCESS(f"Done. {count} recordings deleted from Cloudinary."))
+        stats = cleanup_expired_recordings(limit=options["limit"], dry_run=options["dry_run"])
+
+        if stats["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Dry run. {stats['scanned']} expired recordings would be deleted."
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {stats['deleted']} recordings deleted from Cloudinary "
+            f"({stats['failed']} failed, left for next run) in {stats['seconds']}s "
+            f"— {stats['per_second'] or 0}/s."
+        ))
@@ -0,0 +1,145 @@
+"""
+Local stand-in for the Cloudinary upload API — for testing the recording
+upload worker offline.
+
+  python manage.py fake_cloudinary --port 8765 --dir /tmp/fake_cloudinary
+  CLOUDINARY_UPLOAD_PREFIX=http://localhost:8765   (in .env, restart django)
+
+Implements just what calls uses: chunked `upload` (Content-Range /
+X-Unique-Upload-Id, as sent by upload_large), `destroy`, and the Admin API
+bulk `delete_resources` (recording cleanup). Signatures are
+not checked. --fail-rate makes a share of chunk requests return 500 to
+exercise the retry/backoff path.
+"""
+import json
+import os
+import random
+import re
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+_PATH_RE  = re.compile(r"^/v1_1/(?P<cloud>[^/]+)/(?P<resource_type>[^/]+)/(?P<action>[^/?]+)")
+_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+def _parse_multipart(content_type, body):
+    msg = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    fields = {}
+    for part in msg.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True)
+        fields[name] = payload if part.get_filename() else payload.decode()
+    return fields
+
+
+def _make_handler(storage_dir, fail_rate, stdout):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, fmt, *args):
+            stdout.write("fake_cloudinary: " + fmt % args)
+
+        def _reply(self, code, data):
+            body = json.dumps(data).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            m = _PATH_RE.match(self.path)
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not m:
+                return self._reply(404, {"error": {"message": "Unknown path"}})
+
+            if fail_rate and random.random() < fail_rate:
+                return self._reply(500, {"error": {"message": "Injected failure"}})
+
+            fields = _parse_multipart(self.headers.get("Content-Type", ""), body)
+            public_id = fields.get("public_id") or fields.get("X-Unique-Upload-Id", "asset")
+            path = os.path.join(storage_dir, public_id.replace("/", "__"))
+
+            if m["action"] == "destroy":
+                existed = os.path.exists(path)
+                if existed:
+                    os.remove(path)
+                return self._reply(200, {"result": "ok" if existed else "not found"})
+
+            if m["action"] != "upload":
+                return self._reply(400, {"error": {"message": f"Unsupported action {m['action']}"}})
+
+            data = fields.get("file", b"")
+            rng = _RANGE_RE.match(self.headers.get("Content-Range", ""))
+            start, total = (int(rng[1]), int(rng[3])) if rng else (0, len(data))
+
+            with open(path, "r+b" if start and os.path.exists(path) else "wb") as f:
+                f.seek(start)
+                f.write(data)
+
+            result = {
+                "public_id":     public_id,
+                "resource_type": m["resource_type"],
+                "type":          fields.get("type", "upload"),
+                "bytes":         total,
+                "done":          start + len(data) >= total,
+            }
+            if result["done"]:
+                host = self.headers.get("Host", "localhost")
+                result["secure_url"] = f"http://{host}/{m['cloud']}/{m['resource_type']}/{public_id}.mp4"
+                result["duration"] = 0
+            return self._reply(200, result)
+
+        def do_DELETE(self):
+            # Admin API delete_resources: DELETE /v1_1/<cloud>/resources/<type>/<delivery>
+            m = _PATH_RE.match(self.path)
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not m or m["resource_type"] != "resources":
+                return self._reply(404, {"error": {"message": "Unknown path"}})
+
+            if fail_rate and random.random() < fail_rate:
+                return self._reply(500, {"error": {"message": "Injected failure"}})
+
+            deleted = {}
+            for public_id in json.loads(body or b"{}").get("public_ids", []):
+                path = os.path.join(storage_dir, public_id.replace("/", "__"))
+                existed = os.path.exists(path)
+                if existed:
+                    os.remove(path)
+                deleted[public_id] = "deleted" if existed else "not_found"
+            return self._reply(200, {"deleted": deleted, "partial": False})
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = "Run a local HTTP stand-in for the Cloudinary upload/delete API (offline testing)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--dir", default="/tmp/fake_cloudinary", help="Where uploaded files are written")
+        parser.add_argument("--fail-rate", type=float, default=0.0,
+                            help="Share of requests answered with HTTP 500 (0..1)")
+
+    def handle(self, *args, **options):
+        os.makedirs(options["dir"], exist_ok=True)
+        server = ThreadingHTTPServer(
+            (options["host"], options["port"]),
+            _make_handler(options["dir"], options["fail_rate"], self.stdout),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake Cloudinary on http://{options['host']}:{options['port']} → {options['dir']}\n"
+            f"Set CLOUDINARY_UPLOAD_PREFIX=http://{options['host']}:{options['port']}"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,88 @@
+"""
+The only process that executes APScheduler jobs (auto-cut, webhook drain,
+upload resume). Web workers just add jobs to DjangoJobStore.
+
+  python manage.py run_scheduler
+
+Safe to run more than one: a MySQL advisory lock elects the leader, the rest
+wait in standby and take over when the leader's DB connection goes away.
+In production this is the `scheduler` service in docker-compose.prod.yml.
+"""
+import logging
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from calls.services.scheduler import (
+    LeaderLock,
+    build_scheduler,
+    install_metrics,
+    record_heartbeat,
+    register_periodic_jobs,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run scheduled jobs (leader-elected — only one instance is active at a time)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll", type=int, default=5,
+                            help="Seconds between leadership attempts while in standby")
+        parser.add_argument("--heartbeat", type=int, default=10,
+                            help="Seconds between lock checks / metrics heartbeats while leader")
+
+    def handle(self, *args, **options):
+        stopping = {"flag": False}
+
+        def _stop(signum, frame):
+            stopping["flag"] = True
+
+        def _sleep(seconds):
+            # 1s steps so SIGTERM (docker stop) is honoured promptly
+            for _ in range(seconds):
+                if stopping["flag"]:
+                    return
+                time.sleep(1)
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        lock = LeaderLock()
+        while not stopping["flag"] and not lock.acquire():
+            logger.info("Scheduler standby — another instance is leader.")
+            _sleep(options["poll"])
+        if stopping["flag"]:
+            return
+
+        since = timezone.now()
+        self.stdout.write(self.style.SUCCESS("Scheduler leader — running jobs."))
+
+        scheduler = build_scheduler()
+        install_metrics(scheduler)
+        scheduler.start()
+        register_periodic_jobs(scheduler)
+
+        lost = False
+        try:
+            while not stopping["flag"]:
+                record_heartbeat(since=since)
+                if not lock.is_held():
+                    lost = True
+                    break
+                # Web workers add jobs straight to the store; poll it so a new
+                # auto-cut due before our next wakeup isn't missed.
+                scheduler.wakeup()
+                _sleep(options["heartbeat"])
+        finally:
+            scheduler.shutdown(wait=True)
+            lock.release()
+
+        if lost:
+            # Another instance may already be leader; exit so the container restarts into standby.
+            logger.error("Scheduler lost leadership — exiting.")
+            raise SystemExit(1)
+        self.stdout.write("Scheduler stopped.")
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Add a MySQL/MariaDB FULLTEXT index on in-call message text so history
+    search can use MATCH ... AGAINST. Same approach as chat/0002; the query
+    lives in chat.services.search.
+    """
+
+    dependencies = [
+        ("calls", "0003_callroom_chat_blocked_user_ids"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "ALTER TABLE calls_callmessage "
+                "ADD FULLTEXT INDEX call_message_text_ft (text);"
+            ),
+            reverse_sql=(
+                "ALTER TABLE calls_callmessage DROP INDEX call_message_text_ft;"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-19 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0005_livekit_webhook_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='next_upload_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='upload_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='upload_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='upload_locked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='upload_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='uploaded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
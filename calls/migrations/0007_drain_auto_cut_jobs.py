@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def drain_auto_cut_jobs(apps, schema_editor):
+    """
+    Auto-cut is now a single sweeper (calls.services.auto_cut.sweep_due_rooms).
+    Drop the old per-room "auto_cut_<room id>" jobs; their rooms keep
+    auto_cut_scheduled=True, so the sweeper picks them up instead.
+    """
+    DjangoJob = apps.get_model("django_apscheduler", "DjangoJob")
+    DjangoJob.objects.filter(id__startswith="auto_cut_").exclude(id="auto_cut_sweep").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calls", "0006_callrecording_upload_worker"),
+        ("django_apscheduler", "0009_djangojobexecution_unique_job_executions"),
+    ]
+
+    operations = [
+        migrations.RunPython(drain_auto_cut_jobs, migrations.RunPython.noop),
+    ]
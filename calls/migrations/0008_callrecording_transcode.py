@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0007_drain_auto_cut_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrecording',
+            name='original_size_bytes',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='transcode_profile',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='callrecording',
+            name='transcode_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2 on 2026-10-19 04:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def blank_connection_ids_to_null(apps, schema_editor):
+    # connection_id becomes unique (LiveKit participant sid); "" would collide
+    CallParticipant = apps.get_model("calls", "CallParticipant")
+    CallParticipant.objects.filter(connection_id="").update(connection_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0008_callrecording_transcode'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallAttendance',
+            fields=[
+                ('room', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='attendance', serialize=False, to='calls.callroom')),
+                ('participants', models.PositiveIntegerField(default=0)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('reconnects', models.PositiveIntegerField(default=0)),
+                ('participant_seconds', models.BigIntegerField(default=0)),
+                ('advisor_seconds', models.BigIntegerField(default=0)),
+                ('first_joined_at', models.DateTimeField(blank=True, null=True)),
+                ('last_left_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='callparticipant',
+            name='connection_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.RunPython(blank_connection_ids_to_null, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='callparticipant',
+            name='connection_id',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='callparticipant',
+            name='joined_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='AdvisorCallStats',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('rooms', models.PositiveIntegerField(default=0)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('participant_seconds', models.BigIntegerField(default=0)),
+                ('advisor_seconds', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('advisor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='call_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('advisor', 'date'), name='uniq_advisor_call_stats_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-19 04:42
+
+from django.db import migrations, models
+
+
+def mark_existing_rooms_provisioned(apps, schema_editor):
+    # Rooms created before this migration got their LiveKit room inline —
+    # don't let the first provisioning sweep re-create all of them.
+    CallRoom = apps.get_model("calls", "CallRoom")
+    CallRoom.objects.exclude(sfu_room_name="").update(sfu_provisioned_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0009_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callroom',
+            name='sfu_next_provision_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='callroom',
+            name='sfu_provision_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='callroom',
+            name='sfu_provisioned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_rooms_provisioned, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 04:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_remove_booking_unique_active_booking_per_slot_and_more'),
+        ('calls', '0010_callroom_sfu_provisioning'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='callroom',
+            index=models.Index(fields=['user', '-created_at'], name='calls_callr_user_id_04e870_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callroom',
+            index=models.Index(fields=['advisor', '-created_at'], name='calls_callr_advisor_8828c2_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-19 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0011_callroom_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callroom',
+            name='auto_cut_attempted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
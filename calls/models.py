@@ -42,7 +42,7 @@ class CallRoom(models.Model):
     advisor = models.ForeignKey(User, on_delete=models.CASCADE, related_name="call_rooms_as_advisor")
 
     status        = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_WAITING, db_index=True)
-    sfu_room_name = models.CharField(max_length=255, blank=True)
+    sfu_room_name = models.CharField(max_length=255, blank=True, db_index=True)  # webhook lookups
 
     scheduled_start = models.DateTimeField(null=True, blank=True)
     scheduled_end   = models.DateTimeField(null=True, blank=True)
@@ -51,6 +51,13 @@ class CallRoom(models.Model):
     ended_at   = models.DateTimeField(null=True, blank=True)
 
     auto_cut_scheduled = models.BooleanField(default=False)
+    auto_cut_attempted_at = models.DateTimeField(null=True, blank=True)  # lease of the sweep cutting it
+
+    # LiveKit room provisioning (calls.services.room_provisioning) — done
+    # after the booking transaction commits, retried with backoff.
+    sfu_provisioned_at     = models.DateTimeField(null=True, blank=True)  # last successful create_room
+    sfu_provision_attempts = models.PositiveSmallIntegerField(default=0)  # failures since last success
+    sfu_next_provision_at  = models.DateTimeField(null=True, blank=True)  # backoff — not before this
 
     # Group calls: user IDs the host has blocked from the in-call text chat
     # (spam control). Stored as a list of ints.
@@ -66,6 +73,9 @@ class CallRoom(models.Model):
             models.Index(fields=["user", "status"]),
             models.Index(fields=["advisor", "status"]),
             models.Index(fields=["scheduled_end"]),
+            # MyCallRoomsView: one keyset branch per role, newest first
+            models.Index(fields=["user", "-created_at"]),
+            models.Index(fields=["advisor", "-created_at"]),
         ]
 
     def __str__(self):
@@ -94,9 +104,11 @@ class CallParticipant(models.Model):
     room = models.ForeignKey(CallRoom, on_delete=models.CASCADE, related_name="participants")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="call_participations")
 
-    joined_at     = models.DateTimeField(auto_now_add=True)
+    # One row per LiveKit session: a reconnect gets a new participant sid.
+    # Filled from participant_joined / participant_left (calls.services.attendance).
+    joined_at     = models.DateTimeField(default=timezone.now)
     left_at       = models.DateTimeField(null=True, blank=True)
-    connection_id = models.CharField(max_length=100, blank=True)
+    connection_id = models.CharField(max_length=100, null=True, blank=True, unique=True)  # LiveKit participant sid
 
     class Meta:
         ordering = ["-joined_at"]
@@ -109,6 +121,50 @@ class CallParticipant(models.Model):
         return None
 
 
+class CallAttendance(models.Model):
+    """
+    Per-room attendance rollup, bumped with F() as sessions open/close —
+    never recomputed from CallParticipant rows.
+    """
+    room = models.OneToOneField(CallRoom, primary_key=True, on_delete=models.CASCADE, related_name="attendance")
+
+    participants        = models.PositiveIntegerField(default=0)   # distinct users
+    sessions            = models.PositiveIntegerField(default=0)   # joins, incl. reconnects
+    reconnects          = models.PositiveIntegerField(default=0)
+    participant_seconds = models.BigIntegerField(default=0)        # closed sessions, everyone
+    advisor_seconds     = models.BigIntegerField(default=0)        # closed sessions, advisor only
+
+    first_joined_at = models.DateTimeField(null=True, blank=True)
+    last_left_at    = models.DateTimeField(null=True, blank=True)
+    updated_at      = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Attendance {self.room_id}: {self.participants} users, {self.participant_seconds}s"
+
+
+class AdvisorCallStats(models.Model):
+    """Per-advisor, per-day rollup (local TIME_ZONE date of the join / leave)."""
+    id      = models.BigAutoField(primary_key=True)
+    advisor = models.ForeignKey(User, on_delete=models.CASCADE, related_name="call_stats")
+    date    = models.DateField()
+
+    rooms               = models.PositiveIntegerField(default=0)   # rooms with a first join that day
+    sessions            = models.PositiveIntegerField(default=0)
+    participant_seconds = models.BigIntegerField(default=0)
+    advisor_seconds     = models.BigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["advisor", "date"], name="uniq_advisor_call_stats_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.advisor_id} {self.date}: {self.advisor_seconds}s"
+
+
 class CallRecording(models.Model):
     STATUS_RECORDING  = "RECORDING"   # egress chal raha hai, local file ban rahi hai
     STATUS_UPLOADING  = "UPLOADING"   # Cloudinary par upload ho raha hai
@@ -141,7 +197,7 @@ class CallRecording(models.Model):
     cloudinary_secure_url = models.CharField(max_length=1000, blank=True)
 
     # LiveKit egress tracking
-    egress_id = models.CharField(max_length=255, blank=True)
+    egress_id = models.CharField(max_length=255, blank=True, db_index=True)  # webhook lookups
 
     # Local file path (temporary — deleted after Cloudinary upload)
     local_file_path = models.CharField(max_length=500, blank=True)
@@ -149,6 +205,19 @@ class CallRecording(models.Model):
     file_size_bytes  = models.BigIntegerField(null=True, blank=True)
     duration_seconds = models.IntegerField(null=True, blank=True)
 
+    # Upload worker state (calls.services.recording_upload)
+    upload_attempts   = models.PositiveSmallIntegerField(default=0)
+    next_upload_at    = models.DateTimeField(null=True, blank=True)   # backoff — not before this
+    upload_locked_at  = models.DateTimeField(null=True, blank=True)   # set while a worker holds it
+    upload_started_at = models.DateTimeField(null=True, blank=True)   # current/last attempt
+    uploaded_at       = models.DateTimeField(null=True, blank=True)
+    upload_error      = models.TextField(blank=True)
+
+    # Pre-upload ffmpeg stage (calls.services.recording_transcode)
+    transcode_profile   = models.CharField(max_length=16, blank=True)      # set once done or "failed" — never re-run
+    original_size_bytes = models.BigIntegerField(null=True, blank=True)   # egress output, before ffmpeg
+    transcode_seconds   = models.FloatField(null=True, blank=True)
+
     started_at   = models.DateTimeField(auto_now_add=True)
     ended_at     = models.DateTimeField(null=True, blank=True)
     delete_after = models.DateTimeField(db_index=True)
@@ -209,3 +278,47 @@ class CallNote(models.Model):
 
     def __str__(self):
         return f"Note by {self.user.username} in {self.room_id}"
+
+
+class LiveKitWebhookEvent(models.Model):
+    """
+    Inbox for LiveKit webhooks. The view only verifies + stores the event and
+    returns; calls.services.webhook_queue processes it on a bounded worker pool.
+
+    event_id (LiveKit's event.id) is unique, so a redelivered event is stored
+    once and processed once.
+    """
+    STATUS_PENDING    = "PENDING"     # waiting for a worker (or for next_attempt_at)
+    STATUS_PROCESSING = "PROCESSING"  # claimed by a worker
+    STATUS_DONE       = "DONE"
+    STATUS_FAILED     = "FAILED"      # gave up after MAX_ATTEMPTS
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING,    "Pending"),
+        (STATUS_PROCESSING, "Processing"),
+        (STATUS_DONE,       "Done"),
+        (STATUS_FAILED,     "Failed"),
+    )
+
+    RETENTION_DAYS = 7  # DONE rows older than this are purged by the drain job
+
+    id       = models.BigAutoField(primary_key=True)
+    event_id = models.CharField(max_length=100, unique=True)
+    event    = models.CharField(max_length=50)
+    payload  = models.TextField()  # verified raw JSON body, parsed again by the worker
+
+    status          = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts        = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at       = models.DateTimeField(null=True, blank=True)
+    last_error      = models.TextField(blank=True)
+
+    received_at  = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-received_at"]
+        indexes  = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.event} {self.event_id} [{self.status}]"
@@ -0,0 +1,90 @@
+import heapq
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class MergedKeysetPagination(BasePagination):
+    """
+    Keyset pagination over several querysets of the same model, newest first.
+
+    Each branch is filtered past the cursor, ordered by (-created_at, -id) and
+    limited to page_size + 1 — so each one can walk its own index — and the
+    branches are merged in Python. Replaces one OR query that can't use any
+    single index. Rows appearing in several branches are returned once.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def _page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = urlsafe_b64decode(encoded.encode()).decode().split("|")
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError
+            return created_at, uuid.UUID(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _encode_cursor(self, obj):
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+        return urlsafe_b64encode(raw.encode()).decode()
+
+    def paginate_branches(self, branches, request):
+        self.request = request
+        size = self._page_size(request)
+        cursor = self._decode_cursor(request)
+
+        pages = []
+        for qs in branches:
+            if cursor is not None:
+                created_at, pk = cursor
+                qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            pages.append(list(qs.order_by("-created_at", "-pk")[: size + 1]))
+
+        results, seen = [], set()
+        for obj in heapq.merge(*pages, key=lambda o: (o.created_at, o.pk), reverse=True):
+            if obj.pk in seen:
+                continue
+            seen.add(obj.pk)
+            results.append(obj)
+            if len(results) > size:
+                break
+
+        self.has_next = len(results) > size
+        results = results[:size]
+        self.next_cursor = self._encode_cursor(results[-1]) if self.has_next else None
+        return results
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", None),
+            ("results", data),
+        ]))
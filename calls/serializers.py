@@ -40,11 +40,12 @@ class CallRoomSerializer(serializers.ModelSerializer):
     duration_seconds = serializers.IntegerField(read_only=True)
     can_join         = serializers.SerializerMethodField()
     is_batch         = serializers.BooleanField(read_only=True)
+    other_person     = serializers.SerializerMethodField()
 
     class Meta:
         model            = CallRoom
         fields           = [
-            "id", "status", "user", "advisor", "is_batch",
+            "id", "status", "user", "advisor", "other_person", "is_batch",
             "scheduled_start", "scheduled_end",
             "started_at", "ended_at",
             "duration_seconds", "can_join", "created_at",
@@ -54,6 +55,16 @@ class CallRoomSerializer(serializers.ModelSerializer):
     def get_can_join(self, obj):
         return obj.can_join()
 
+    def get_other_person(self, obj):
+        # Uses the already-loaded user/advisor — select_related them in list views.
+        request = self.context.get("request")
+        if not request:
+            return None
+        other = obj.user if obj.advisor_id == request.user.id else obj.advisor
+        if other is None:  # advisor's view of a batch room: no single counterpart
+            return None
+        return CallUserSerializer(other).data
+
 
 class CallNoteSerializer(serializers.ModelSerializer):
     room_id         = serializers.UUIDField(source="room.id", read_only=True)
@@ -0,0 +1,179 @@
+"""
+calls/services/attendance.py
+
+Attendance from LiveKit webhooks (participant_joined / participant_left),
+called by livekit_service.process_livekit_event on the webhook queue.
+
+  * One CallParticipant per LiveKit session, keyed by participant sid
+    (connection_id, unique) — get_or_create, so redelivered or
+    out-of-order events (left before joined) never make a second row.
+  * A session is closed by a conditional UPDATE (left_at IS NULL → at), so
+    its duration is counted exactly once.
+  * Rollups are bumped with F() at open/close time — CallAttendance per
+    room, AdvisorCallStats per advisor per local (TIME_ZONE) day — so the
+    admin API reads a handful of rows instead of scanning sessions.
+  * A user's first-processed session in a room counts as the participant,
+    any other as a reconnect, so webhook order can't double count people.
+  * room_finished closes whatever is still open (lost participant_left).
+
+Identities that aren't user ids (egress recorder, agents) are ignored.
+"""
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _ts(seconds):
+    """LiveKit unix seconds → aware datetime (None for 0 / missing)."""
+    return datetime.fromtimestamp(seconds, tz=dt_timezone.utc) if seconds else None
+
+
+def event_time(event):
+    return _ts(getattr(event, "created_at", 0)) or timezone.now()
+
+
+def _bump(model, lookup, **increments):
+    from django.db import IntegrityError
+
+    increments = {field: F(field) + value for field, value in increments.items() if value}
+    if not increments:
+        return
+    if not model.objects.filter(**lookup).update(**increments):
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup)
+        except IntegrityError:
+            pass  # created concurrently
+        model.objects.filter(**lookup).update(**increments)
+
+
+def _session(call_room, participant, at):
+    """(CallParticipant, created) for this LiveKit session, or (None, False)."""
+    from calls.models import CallParticipant
+
+    if not participant.sid or not participant.identity.isdigit():
+        return None, False
+    return CallParticipant.objects.get_or_create(
+        connection_id=participant.sid,
+        defaults={
+            "room":      call_room,
+            "user_id":   int(participant.identity),
+            "joined_at": _ts(participant.joined_at) or at,
+        },
+    )
+
+
+def _opened(call_room, session):
+    from calls.models import AdvisorCallStats, CallAttendance, CallParticipant
+
+    # The UPDATE row-locks the room's rollup, serialising openings per room;
+    # the locking read then sees every other committed session of this user,
+    # whichever order their webhooks arrived in.
+    _bump(CallAttendance, {"room": call_room}, sessions=1)
+    reconnect = (
+        CallParticipant.objects
+        .select_for_update()
+        .filter(room=call_room, user_id=session.user_id)
+        .exclude(id=session.id)
+        .exists()
+    )
+    _bump(
+        CallAttendance, {"room": call_room},
+        reconnects=int(reconnect),
+        participants=int(not reconnect),
+    )
+    first_in_room = CallAttendance.objects.filter(
+        room=call_room, first_joined_at__isnull=True,
+    ).update(first_joined_at=session.joined_at)
+    if not first_in_room:  # an earlier join processed late
+        CallAttendance.objects.filter(
+            room=call_room, first_joined_at__gt=session.joined_at,
+        ).update(first_joined_at=session.joined_at)
+
+    _bump(
+        AdvisorCallStats,
+        {"advisor_id": call_room.advisor_id, "date": timezone.localdate(session.joined_at)},
+        sessions=1,
+        rooms=first_in_room,
+    )
+
+
+def _close(call_room, session, at):
+    from calls.models import AdvisorCallStats, CallAttendance, CallParticipant
+
+    left_at = max(at, session.joined_at)
+    if not CallParticipant.objects.filter(id=session.id, left_at__isnull=True).update(left_at=left_at):
+        return  # already closed
+
+    seconds    = int((left_at - session.joined_at).total_seconds())
+    is_advisor = session.user_id == call_room.advisor_id
+
+    _bump(
+        CallAttendance, {"room": call_room},
+        participant_seconds=seconds,
+        advisor_seconds=seconds if is_advisor else 0,
+    )
+    CallAttendance.objects.filter(room=call_room).filter(
+        Q(last_left_at__isnull=True) | Q(last_left_at__lt=left_at)
+    ).update(last_left_at=left_at)
+
+    _bump(
+        AdvisorCallStats, {"advisor_id": call_room.advisor_id, "date": timezone.localdate(left_at)},
+        participant_seconds=seconds,
+        advisor_seconds=seconds if is_advisor else 0,
+    )
+
+
+def record_join(call_room, participant, at):
+    with transaction.atomic():
+        session, created = _session(call_room, participant, at)
+        if created:
+            _opened(call_room, session)
+
+
+def record_leave(call_room, participant, at):
+    with transaction.atomic():
+        session, created = _session(call_room, participant, at)
+        if session is None:
+            return
+        if created:  # participant_left got here before participant_joined
+            _opened(call_room, session)
+        _close(call_room, session, at)
+
+
+def close_open_sessions(call_room, at) -> int:
+    """Close sessions whose participant_left never arrived (room is gone)."""
+    closed = 0
+    for session in call_room.participants.filter(left_at__isnull=True):
+        with transaction.atomic():
+            _close(call_room, session, at)
+        closed += 1
+    return closed
+
+
+# ──────────────────────────────────────────────────────
+# READ SIDE (admin API)
+# ──────────────────────────────────────────────────────
+
+def advisor_totals(*, days=30, advisor_id=None):
+    from calls.models import AdvisorCallStats
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    qs = AdvisorCallStats.objects.filter(date__gte=since)
+    if advisor_id:
+        qs = qs.filter(advisor_id=advisor_id)
+    return list(
+        qs.values("advisor_id", "advisor__username")
+        .annotate(
+            rooms=Sum("rooms"),
+            sessions=Sum("sessions"),
+            participant_seconds=Sum("participant_seconds"),
+            advisor_seconds=Sum("advisor_seconds"),
+        )
+        .order_by("-advisor_seconds")
+    )
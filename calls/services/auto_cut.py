@@ -1,28 +1,47 @@
+"""
+calls/services/auto_cut.py
+
+Auto-cut: end calls when their slot is over.
+
+Used to be one DjangoJobStore "date" job per CallRoom (a pickled row per
+confirmed booking). Now it is a single periodic sweeper:
+
+  * schedule_auto_cut() only arms the room (auto_cut_scheduled=True).
+  * sweep_due_rooms() (APScheduler, every 30s) selects armed rooms with
+    scheduled_end <= now that are not ENDED — a range read on the
+    scheduled_end index, bounded below by AUTO_CUT_LOOKBACK_HOURS — in
+    batches of AUTO_CUT_BATCH_SIZE, and cuts them with at most
+    AUTO_CUT_CONCURRENCY rooms talking to LiveKit at once.
+  * Each room is claimed by a conditional UPDATE of auto_cut_attempted_at
+    (a lease of CUT_LEASE_SECONDS), so two overlapping sweeps never cut the
+    same room at once. The room is marked ENDED only once LiveKit confirms
+    the room is gone; if not, the lease runs out and a later sweep retries.
+  * Rooms that fall past the lookback still armed (e.g. after scheduler
+    downtime) are logged as errors, counted in `past_lookback` and disarmed
+    — someone has to end them by hand.
+  * Progress of the last sweep (rooms cut, failures, oldest overdue room) is
+    kept in the cache — see last_sweep().
+"""
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
-logger = logging.getLogger(__name__)
-
-_scheduler = None
-
-
-def get_scheduler():
-    global _scheduler
-    if _scheduler is None:
-        from apscheduler.schedulers.background import BackgroundScheduler
-        from django_apscheduler.jobstores import DjangoJobStore
-
-        _scheduler = BackgroundScheduler(timezone="UTC")
-        _scheduler.add_jobstore(DjangoJobStore(), "default")
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
 
-        if not _scheduler.running:
-            _scheduler.start()
-            logger.info("APScheduler started.")
+logger = logging.getLogger(__name__)
 
-    return _scheduler
+SWEEP_CACHE_KEY = "calls:auto_cut:last_sweep"
+MAX_BATCHES_PER_SWEEP = 20
+CUT_LEASE_SECONDS = 60
 
 
 def schedule_auto_cut(*, call_room):
-    from django.utils import timezone
+    """Arm auto-cut for a room; the sweeper ends it once scheduled_end passes."""
+    from calls.models import CallRoom
 
     if not call_room.scheduled_end:
         return
@@ -30,82 +49,154 @@ def schedule_auto_cut(*, call_room):
     if call_room.scheduled_end <= timezone.now():
         return
 
-    job_id = f"auto_cut_{call_room.id}"
+    CallRoom.objects.filter(id=call_room.id).update(auto_cut_scheduled=True)
+    logger.info("Auto-cut armed: room=%s at=%s", call_room.id, call_room.scheduled_end)
 
-    try:
-        from datetime import timezone as _dt_tz
-        scheduler = get_scheduler()
-        # Always convert to UTC naive for APScheduler (TIME_ZONE=Asia/Kolkata can cause offset issues)
-        run_at = call_room.scheduled_end.astimezone(_dt_tz.utc).replace(tzinfo=None)
-
-        scheduler.add_job(
-            _auto_cut_job,
-            trigger="date",
-            run_date=run_at,
-            id=job_id,
-            name=f"Auto-cut CallRoom {call_room.id}",
-            args=[str(call_room.id)],
-            replace_existing=True,
-            misfire_grace_time=300,  # 5 min grace — handles brief server
-        )
 
-        from calls.models import CallRoom
-        CallRoom.objects.filter(id=call_room.id).update(auto_cut_scheduled=True)
+def cancel_auto_cut(*, room_id: str):
+    from calls.models import CallRoom
+
+    CallRoom.objects.filter(id=room_id).update(auto_cut_scheduled=False)
 
-        logger.info("Auto-cut scheduled: room=%s at=%s", call_room.id, call_room.scheduled_end)
 
-    except Exception as e:
-        logger.error("schedule_auto_cut [%s]: %s", call_room.id, e)
+class CutFailed(Exception):
+    pass
 
 
-def _auto_cut_job(room_id: str):
-    logger.info("AUTO-CUT firing: room=%s", room_id)
+def _cut_room(room_id) -> bool:
+    """
+    End one room. Returns False if it was already ended or another sweep
+    holds it; raises CutFailed if LiveKit didn't confirm (retried later).
+    """
+    from django.db.models import Q
+    from calls.models import CallRoom, CallRecording
+    from calls.services.livekit_service import (
+        delete_livekit_room,
+        disconnect_all_participants,
+        stop_room_recording,
+    )
 
+    close_old_connections()
     try:
-        from calls.models import CallRoom, CallRecording
-        from django.utils import timezone
+        now = timezone.now()
+        claimed = (
+            CallRoom.objects
+            .filter(id=room_id)
+            .exclude(status=CallRoom.STATUS_ENDED)
+            .filter(
+                Q(auto_cut_attempted_at__isnull=True)
+                | Q(auto_cut_attempted_at__lt=now - timedelta(seconds=CUT_LEASE_SECONDS))
+            )
+            .update(auto_cut_attempted_at=now)
+        )
+        if not claimed:
+            return False
 
+        logger.info("AUTO-CUT firing: room=%s", room_id)
         room = CallRoom.objects.get(id=room_id)
 
-        if room.status == CallRoom.STATUS_ENDED:
-            return
-
         # 1. Disconnect all LiveKit participants
         if room.sfu_room_name:
-            try:
-                from calls.services.livekit_service import disconnect_all_participants
-                disconnect_all_participants(room.sfu_room_name)
-            except Exception as e:
-                logger.error("disconnect_all_participants: %s", e)
+            disconnect_all_participants(room.sfu_room_name)
 
         # 2. Stop active recordings
         for rec in CallRecording.objects.filter(room=room, status=CallRecording.STATUS_RECORDING):
-            try:
-                from calls.services.livekit_service import stop_room_recording
-                stop_room_recording(egress_id=rec.egress_id)
-            except Exception as e:
-                logger.error("stop_room_recording: %s", e)
-
-        # 3. Mark ENDED
-        room.status   = CallRoom.STATUS_ENDED
-        room.ended_at = timezone.now()
-        room.save(update_fields=["status", "ended_at", "updated_at"])
-
-        # 4. Delete LiveKit room
-        try:
-            from calls.services.livekit_service import delete_livekit_room
-            delete_livekit_room(room.sfu_room_name)
-        except Exception:
-            pass
-
-        logger.info("Auto-cut complete: room=%s", room_id)
-
-    except Exception as e:
-        logger.error("_auto_cut_job [%s]: %s", room_id, e)
+            stop_room_recording(egress_id=rec.egress_id)
 
+        # 3. Delete LiveKit room — this also drops anyone step 1 missed;
+        #    until it succeeds the room is not ENDED and stays due
+        if room.sfu_room_name and not delete_livekit_room(room.sfu_room_name):
+            raise CutFailed(f"LiveKit room {room.sfu_room_name} not deleted")
 
-def cancel_auto_cut(*, room_id: str):
-    try:
-        get_scheduler().remove_job(f"auto_cut_{room_id}")
-    except Exception:
-        pass
+        ended = timezone.now()
+        CallRoom.objects.filter(id=room_id).exclude(status=CallRoom.STATUS_ENDED).update(
+            status=CallRoom.STATUS_ENDED, ended_at=ended, updated_at=ended,
+        )
+        logger.info("Auto-cut complete: room=%s", room_id)
+        return True
+    finally:
+        close_old_connections()
+
+
+def _disarm_past_lookback(cutoff) -> int:
+    """Armed rooms that ended before the lookback: alert and disarm, once each."""
+    from calls.models import CallRoom
+
+    stale = list(
+        CallRoom.objects
+        .filter(auto_cut_scheduled=True, scheduled_end__lt=cutoff)
+        .exclude(status=CallRoom.STATUS_ENDED)
+        .values_list("id", flat=True)[: settings.AUTO_CUT_BATCH_SIZE]
+    )
+    if not stale:
+        return 0
+    logger.error(
+        "Auto-cut: %d room(s) past the %sh lookback were never cut — end them manually: %s",
+        len(stale), settings.AUTO_CUT_LOOKBACK_HOURS, ", ".join(str(pk) for pk in stale),
+    )
+    CallRoom.objects.filter(id__in=stale).update(auto_cut_scheduled=False)
+    return len(stale)
+
+
+def sweep_due_rooms() -> dict:
+    """Cut every armed room whose slot has ended. Returns progress counters."""
+    from calls.models import CallRoom
+
+    started = time.monotonic()
+    now = timezone.now()
+    cutoff = now - timedelta(hours=settings.AUTO_CUT_LOOKBACK_HOURS)
+    past_lookback = _disarm_past_lookback(cutoff)
+    due = (
+        CallRoom.objects
+        .filter(
+            auto_cut_scheduled=True,
+            scheduled_end__lte=now,
+            scheduled_end__gte=cutoff,
+        )
+        .exclude(status=CallRoom.STATUS_ENDED)
+        .order_by("scheduled_end")
+    )
+
+    cut = failed = batches = 0
+    attempted = []
+    with ThreadPoolExecutor(
+        max_workers=settings.AUTO_CUT_CONCURRENCY,
+        thread_name_prefix="auto-cut",
+    ) as pool:
+        while batches < MAX_BATCHES_PER_SWEEP:
+            # a room whose cut failed stays not-ENDED — leave it for the next sweep
+            ids = list(
+                due.exclude(id__in=attempted)
+                .values_list("id", flat=True)[: settings.AUTO_CUT_BATCH_SIZE]
+            )
+            if not ids:
+                break
+            batches += 1
+            attempted += ids
+
+            futures = {room_id: pool.submit(_cut_room, room_id) for room_id in ids}
+            for room_id, future in futures.items():
+                try:
+                    cut += future.result()
+                except Exception as e:
+                    failed += 1
+                    logger.error("auto-cut [%s]: %s", room_id, e)
+
+    oldest = due.values_list("scheduled_end", flat=True).first()
+    progress = {
+        "ran_at":  now.isoformat(),
+        "cut":     cut,
+        "failed":  failed,
+        "batches": batches,
+        "past_lookback": past_lookback,
+        "seconds": round(time.monotonic() - started, 2),
+        "oldest_due_lag_seconds": int((now - oldest).total_seconds()) if oldest else None,
+    }
+    cache.set(SWEEP_CACHE_KEY, progress, 24 * 3600)
+    if cut or failed or past_lookback:
+        logger.info("Auto-cut sweep: %s", progress)
+    return progress
+
+
+def last_sweep() -> dict | None:
+    return cache.get(SWEEP_CACHE_KEY)
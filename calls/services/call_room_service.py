@@ -1,29 +1,12 @@
-from django.utils import timezone
-
 from calls.models import CallRoom
 from calls.services.auto_cut import schedule_auto_cut
-from calls.services.livekit_service import create_livekit_room
-
-# Extra buffer added on top of slot duration so LiveKit keeps the room
-# open even if participants join a little late or reconnect near the end.
-_BUFFER_SECONDS = 600  # 10 minutes
-
-
-def _slot_empty_timeout(end_datetime) -> int:
-    """
-    Compute empty_timeout (seconds) for LiveKit room creation.
-    = seconds until slot ends + 10-min buffer, minimum 600 s.
-    """
-    if end_datetime:
-        remaining = int((end_datetime - timezone.now()).total_seconds())
-        return max(remaining + _BUFFER_SECONDS, _BUFFER_SECONDS)
-    return 3600  # fallback: 1 hour
+from calls.services.room_provisioning import provision_after_commit
 
 
 def create_call_room_for_booking(*, booking):
     """
     Create CallRoom for an expert Booking.
-    DB record is saved first — LiveKit call is non-critical.
+    Only the DB row here — the LiveKit room is created after commit.
     """
     print("🔥 CALL ROOM FUNCTION HIT", booking.uuid)
     try:
@@ -42,7 +25,7 @@ def create_call_room_for_booking(*, booking):
         sfu_room_name=room_name,
     )
 
-    create_livekit_room(room_name, empty_timeout=_slot_empty_timeout(booking.end_datetime))
+    provision_after_commit(call_room)
     schedule_auto_cut(call_room=call_room)
 
     return call_room
@@ -53,8 +36,9 @@ def get_or_create_batch_call_room(*, slot):
     One shared CallRoom per BATCH ExpertSlot.
 
     Called from confirm_booking when a batch booking is confirmed. Idempotent —
-    the first confirmed booking creates the room (+ LiveKit room sized to the
-    slot capacity + expert), later confirmations reuse it. `slot` being a
+    the first confirmed booking creates the room (LiveKit room sized to the
+    slot capacity + expert is provisioned after commit), later confirmations
+    reuse it. `slot` being a
     OneToOne on CallRoom guarantees a single room per slot at the DB level.
     """
     room_name = f"batch_slot_{slot.uuid}"
@@ -70,12 +54,7 @@ def get_or_create_batch_call_room(*, slot):
     )
 
     if created:
-        # capacity users + the expert
-        create_livekit_room(
-            room_name,
-            empty_timeout=_slot_empty_timeout(slot.end_datetime),
-            max_participants=slot.capacity + 1,
-        )
+        provision_after_commit(call_room)
         schedule_auto_cut(call_room=call_room)
 
     return call_room
@@ -84,7 +63,7 @@ def get_or_create_batch_call_room(*, slot):
 def create_call_room_for_investor_booking(*, investor_booking):
     """
     Create CallRoom for an InvestorBooking.
-    DB record is saved first — LiveKit call is non-critical.
+    Only the DB row here — the LiveKit room is created after commit.
     """
     try:
         return investor_booking.call_room
@@ -102,7 +81,7 @@ def create_call_room_for_investor_booking(*, investor_booking):
         sfu_room_name=room_name,
     )
 
-    create_livekit_room(room_name, empty_timeout=_slot_empty_timeout(investor_booking.end_datetime))
+    provision_after_commit(call_room)
     schedule_auto_cut(call_room=call_room)
 
     return call_room
@@ -0,0 +1,210 @@
+"""
+calls/services/chat_state.py
+
+Hot state for the in-call chat (CallChatConsumer), kept out of MySQL.
+
+Chat blocks
+  Redis set  callchat:blocked:<room_id>  — SADD / SREM are atomic, so two
+  hosts (or two tabs) blocking at once can't overwrite each other, and the
+  CallRoom row isn't rewritten per click. The set is seeded once from
+  CallRoom.chat_blocked_user_ids (WATCH-guarded, so a seed can't undo a
+  concurrent change). Changed rooms are tracked in callchat:blocked:dirty
+  and persist_block_lists() (APScheduler, every 60s) writes them back to
+  the JSON field, which stays the durable copy.
+
+Batch-call membership
+  "has a CONFIRMED booking on this slot" is cached per (slot, user) —
+  a batch room is 1:1 with its slot — so reconnects don't re-run the
+  Booking query. Invalidated by the Booking post_save signal
+  (calls/signals.py); bulk .update() calls skip signals and must call
+  invalidate_batch_membership() themselves (see bookings admin actions).
+
+If Redis is unreachable, blocks fall back to a locked DB read-modify-write,
+after which the room's Redis set and seeded flag are dropped, so the next
+access re-seeds from the DB instead of serving (and later persisting) the
+stale set. If Redis is still down for that delete, the room is remembered
+and dropped before this process next uses its Redis copy.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_KEY      = "callchat:blocked:{room_id}"
+BLOCKED_SEEDED   = "callchat:blocked:{room_id}:seeded"
+BLOCKED_DIRTY    = "callchat:blocked:dirty"
+BLOCKED_TTL      = 7 * 24 * 3600   # durable copy is in MySQL; Redis is just the hot copy
+
+MEMBERSHIP_KEY   = "callchat:member:{slot_id}:{user_id}"
+MEMBERSHIP_TTL   = 10 * 60
+
+_redis = None
+_unsynced_rooms = set()  # DB fallback writes whose Redis copy couldn't be dropped yet
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(
+            settings.CALLS_REDIS_URL,
+            decode_responses=True,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+        )
+    return _redis
+
+
+# ──────────────────────────────────────────────────────
+# CHAT BLOCKS
+# ──────────────────────────────────────────────────────
+
+def _drop_redis_copy(r, room_id):
+    """Forget the room's Redis set; the next _seed() reloads it from the DB."""
+    with r.pipeline() as pipe:
+        pipe.delete(BLOCKED_KEY.format(room_id=room_id), BLOCKED_SEEDED.format(room_id=room_id))
+        pipe.srem(BLOCKED_DIRTY, str(room_id))
+        pipe.execute()
+    _unsynced_rooms.discard(str(room_id))
+
+
+def _seed(r, room_id):
+    """Load the DB copy into Redis once per room (until the keys expire)."""
+    import redis
+    from calls.models import CallRoom
+
+    key, seeded = BLOCKED_KEY.format(room_id=room_id), BLOCKED_SEEDED.format(room_id=room_id)
+    if str(room_id) in _unsynced_rooms:
+        _drop_redis_copy(r, room_id)
+    if r.exists(seeded):
+        return
+
+    ids = (
+        CallRoom.objects.filter(id=room_id)
+        .values_list("chat_blocked_user_ids", flat=True)
+        .first()
+    ) or []
+
+    with r.pipeline() as pipe:
+        try:
+            pipe.watch(seeded)
+            if pipe.exists(seeded):
+                return
+            pipe.multi()
+            if ids:
+                pipe.sadd(key, *ids)
+            pipe.expire(key, BLOCKED_TTL)
+            pipe.set(seeded, 1, ex=BLOCKED_TTL)
+            pipe.execute()
+        except redis.WatchError:
+            pass  # another connection seeded first — its copy is current
+
+
+def get_blocked_ids(room_id) -> set[int]:
+    try:
+        r = _get_redis()
+        _seed(r, room_id)
+        return {int(i) for i in r.smembers(BLOCKED_KEY.format(room_id=room_id))}
+    except Exception as e:
+        logger.warning("get_blocked_ids [%s]: Redis unavailable, using DB: %s", room_id, e)
+        from calls.models import CallRoom
+        ids = CallRoom.objects.filter(id=room_id).values_list("chat_blocked_user_ids", flat=True).first()
+        return set(ids or [])
+
+
+def set_blocked(room_id, user_id: int, blocked: bool) -> set[int]:
+    """Block/unblock atomically. Returns the room's block set after the change."""
+    try:
+        r = _get_redis()
+        _seed(r, room_id)
+        key = BLOCKED_KEY.format(room_id=room_id)
+        with r.pipeline() as pipe:
+            (pipe.sadd if blocked else pipe.srem)(key, user_id)
+            pipe.expire(key, BLOCKED_TTL)
+            pipe.expire(BLOCKED_SEEDED.format(room_id=room_id), BLOCKED_TTL)
+            pipe.sadd(BLOCKED_DIRTY, str(room_id))
+            pipe.smembers(key)
+            members = pipe.execute()[-1]
+        return {int(i) for i in members}
+    except Exception as e:
+        logger.warning("set_blocked [%s]: Redis unavailable, using DB: %s", room_id, e)
+        ids = _set_blocked_db(room_id, user_id, blocked)
+        # the Redis copy no longer matches the DB: served to readers and
+        # persisted over the DB on the next Redis-path change otherwise
+        _unsynced_rooms.add(str(room_id))
+        try:
+            _drop_redis_copy(_get_redis(), room_id)
+        except Exception as e:
+            logger.warning("set_blocked [%s]: stale Redis copy not dropped yet: %s", room_id, e)
+        return ids
+
+
+def _set_blocked_db(room_id, user_id, blocked):
+    from django.db import transaction
+    from calls.models import CallRoom
+
+    with transaction.atomic():
+        room = CallRoom.objects.select_for_update().get(id=room_id)
+        ids = set(room.chat_blocked_user_ids or [])
+        if blocked:
+            ids.add(user_id)
+        else:
+            ids.discard(user_id)
+        room.chat_blocked_user_ids = sorted(ids)
+        room.save(update_fields=["chat_blocked_user_ids", "updated_at"])
+    return ids
+
+
+def persist_block_lists() -> int:
+    """Write changed Redis block sets back to CallRoom.chat_blocked_user_ids."""
+    from calls.models import CallRoom
+
+    r = _get_redis()
+    saved = 0
+    for room_id in r.smembers(BLOCKED_DIRTY):
+        # Clear the flag BEFORE reading: a change racing with us re-flags the
+        # room and is picked up by the next run.
+        r.srem(BLOCKED_DIRTY, room_id)
+        ids = sorted(int(i) for i in r.smembers(BLOCKED_KEY.format(room_id=room_id)))
+        try:
+            saved += CallRoom.objects.filter(id=room_id).update(chat_blocked_user_ids=ids)
+        except Exception as e:
+            r.sadd(BLOCKED_DIRTY, room_id)
+            logger.error("persist_block_lists [%s]: %s", room_id, e)
+    if saved:
+        logger.info("Chat block lists persisted: %d rooms", saved)
+    return saved
+
+
+# ──────────────────────────────────────────────────────
+# BATCH MEMBERSHIP
+# ──────────────────────────────────────────────────────
+
+def is_batch_member(slot_id, user_id) -> bool:
+    """CONFIRMED booking on this batch slot? Cached per (slot, user)."""
+    key = MEMBERSHIP_KEY.format(slot_id=slot_id, user_id=user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    from bookings.models import Booking
+    ok = Booking.objects.filter(
+        slot_id=slot_id,
+        user_id=user_id,
+        status=Booking.STATUS_CONFIRMED,
+    ).exists()
+    cache.set(key, ok, MEMBERSHIP_TTL)
+    return ok
+
+
+def invalidate_batch_membership(pairs):
+    """Drop cached decisions for an iterable of (slot_id, user_id)."""
+    keys = [
+        MEMBERSHIP_KEY.format(slot_id=slot_id, user_id=user_id)
+        for slot_id, user_id in pairs
+        if slot_id is not None
+    ]
+    if keys:
+        cache.delete_many(keys)
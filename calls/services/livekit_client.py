@@ -0,0 +1,130 @@
+"""
+calls/services/livekit_client.py
+
+One long-lived LiveKit API client per process, on a dedicated event loop.
+
+Before: every operation did asyncio.run() (new loop) + LiveKitAPI() (new
+aiohttp session, new TCP/TLS handshake), and from inside a running loop it
+also spun up a throwaway ThreadPoolExecutor. Mute-all / remove / create-room
+all paid full connection setup.
+
+Now a daemon thread runs one event loop forever; the LiveKitAPI and its
+pooled aiohttp session live on that loop and keep connections alive.
+
+  sync code   → run(coro)         blocks the calling thread until done
+  async code  → await arun(coro)  awaits without blocking the caller's loop
+  coroutines  → await api()       the shared LiveKitAPI (on the client loop)
+
+aiohttp sessions are bound to the loop that created them, so coroutines that
+use api() must run on the client loop — always go through run()/arun().
+Forked children (gunicorn --preload) get a fresh loop on first use.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_lock    = threading.Lock()
+_loop    = None
+_thread  = None
+_pid     = None
+_api     = None  # LiveKitAPI      ┐ only touched from the client loop
+_session = None  # aiohttp session ┘
+
+
+def _start_loop():
+    global _loop, _thread, _pid, _api, _session
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(
+        target=loop.run_forever,
+        name="livekit-client-loop",
+        daemon=True,
+    )
+    thread.start()
+    _loop, _thread, _pid, _api, _session = loop, thread, os.getpid(), None, None
+    logger.info("LiveKit client loop started (pid=%s)", _pid)
+
+
+def get_loop():
+    """The client event loop, started on first use (and again after fork)."""
+    if _loop is None or _pid != os.getpid() or not _thread.is_alive():
+        with _lock:
+            if _loop is None or _pid != os.getpid() or not _thread.is_alive():
+                _start_loop()
+    return _loop
+
+
+async def api():
+    """Shared LiveKitAPI. Must be awaited on the client loop."""
+    global _api, _session
+    if _api is None:
+        import aiohttp
+        from livekit import api as lkapi
+
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.LIVEKIT_HTTP_POOL_SIZE,
+                keepalive_timeout=60,
+            ),
+            timeout=aiohttp.ClientTimeout(total=settings.LIVEKIT_API_TIMEOUT),
+        )
+        _api = lkapi.LiveKitAPI(
+            url=settings.LIVEKIT_URL,
+            api_key=settings.LIVEKIT_API_KEY,
+            api_secret=settings.LIVEKIT_API_SECRET,
+            session=_session,
+        )
+    return _api
+
+
+def submit(coro):
+    """Schedule a coroutine on the client loop. Returns a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro, timeout=None):
+    """Run a coroutine on the client loop and wait for it (sync callers)."""
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("livekit_client.run() called on the client loop — await the coroutine instead")
+    return submit(coro).result(timeout=timeout or settings.LIVEKIT_API_TIMEOUT)
+
+
+async def arun(coro, timeout=None):
+    """Run a coroutine on the client loop from any other event loop (async views/consumers)."""
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wait_for(
+        asyncio.wrap_future(submit(coro)),
+        timeout=timeout or settings.LIVEKIT_API_TIMEOUT,
+    )
+
+
+async def _aclose():
+    global _api, _session
+    if _session is not None:
+        await _session.close()   # LiveKitAPI.aclose() leaves custom sessions open
+    _api = _session = None
+
+
+@atexit.register
+def shutdown():
+    """Close the pooled session and stop the loop (process exit)."""
+    if _loop is None or _pid != os.getpid() or not _loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_aclose(), _loop).result(timeout=5)
+    except Exception as e:
+        logger.warning("LiveKit client shutdown: %s", e)
+    _loop.call_soon_threadsafe(_loop.stop)
@@ -4,10 +4,10 @@ calls/services/livekit_service.py
 LiveKit operations + Cloudinary upload for recordings.
 
 Flow:
-  1. Booking confirmed → create_livekit_room() + start_room_recording()
+  1. Booking confirmed → CallRoom row; room_provisioning → create_livekit_room() after commit
   2. LiveKit Egress saves MP4 to local /recordings/<room_id>.mp4
-  3. egress_ended webhook fires → upload_recording_to_cloudinary()
-  4. Local file deleted → Cloudinary URL stored in DB
+  3. egress_ended webhook fires → recording_upload.enqueue_upload()
+  4. Upload worker → Cloudinary (chunked) → local file deleted → URL stored in DB
   5. Admin can access via cloudinary_secure_url (signed, time-limited)
   6. After 7 days → cleanup task deletes from Cloudinary
 
@@ -15,7 +15,6 @@ pip install livekit-api cloudinary
 """
 import asyncio
 import logging
-import os
 from datetime import timedelta
 
 import cloudinary
@@ -26,18 +25,19 @@ from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+# A recording claimed on participant_joined whose egress never started
+# (worker died between commit and the API call) is dropped after this.
+RECORDING_CLAIM_TIMEOUT = timedelta(minutes=5)
+
 
 # ──────────────────────────────────────────────────────
 # HELPERS
 # ──────────────────────────────────────────────────────
 
-def _lk():
-    from livekit import api as lkapi
-    return lkapi.LiveKitAPI(
-        url=settings.LIVEKIT_URL,
-        api_key=settings.LIVEKIT_API_KEY,
-        api_secret=settings.LIVEKIT_API_SECRET,
-    )
+async def _lk():
+    """Shared, pooled LiveKitAPI (see livekit_client) — do not aclose() it."""
+    from calls.services import livekit_client
+    return await livekit_client.api()
 
 
 def _configure_cloudinary():
@@ -47,22 +47,21 @@ def _configure_cloudinary():
         api_secret=settings.CLOUDINARY_API_SECRET,
         secure=True,
     )
+    # Point uploads at a stand-in (manage.py fake_cloudinary) for offline testing
+    if settings.CLOUDINARY_UPLOAD_PREFIX:
+        cloudinary.config(upload_prefix=settings.CLOUDINARY_UPLOAD_PREFIX)
 
 
 def _run(coro):
-    """Run async coroutine safely whether or not an event loop is already running."""
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = None
+    """Run a LiveKit coroutine on the persistent client loop (sync callers)."""
+    from calls.services import livekit_client
+    return livekit_client.run(coro)
+
 
-    if loop and loop.is_running():
-        import concurrent.futures
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-            future = pool.submit(asyncio.run, coro)
-            return future.result(timeout=10)
-    else:
-        return asyncio.run(coro)
+async def _arun(coro):
+    """Same, for async callers (async views / consumers)."""
+    from calls.services import livekit_client
+    return await livekit_client.arun(coro)
 
 
 # ──────────────────────────────────────────────────────
@@ -101,15 +100,12 @@ def generate_participant_token(*, room_name: str, user) -> str:
 
 async def _create_room(room_name: str, empty_timeout: int = 3600, max_participants: int = 2):
     from livekit import api as lkapi
-    lk = _lk()
-    try:
-        return await lk.room.create_room(lkapi.CreateRoomRequest(
-            name=room_name,
-            empty_timeout=empty_timeout,
-            max_participants=max_participants,
-        ))
-    finally:
-        await lk.aclose()
+    lk = await _lk()
+    return await lk.room.create_room(lkapi.CreateRoomRequest(
+        name=room_name,
+        empty_timeout=empty_timeout,
+        max_participants=max_participants,
+    ))
 
 
 def create_livekit_room(room_name: str, empty_timeout: int = 3600, max_participants: int = 2):
@@ -125,36 +121,43 @@ def create_livekit_room(room_name: str, empty_timeout: int = 3600, max_participa
 
 async def _delete_room(room_name: str):
     from livekit import api as lkapi
-    lk = _lk()
-    try:
-        await lk.room.delete_room(lkapi.DeleteRoomRequest(room=room_name))
-    finally:
-        await lk.aclose()
+    lk = await _lk()
+    await lk.room.delete_room(lkapi.DeleteRoomRequest(room=room_name))
+
 
+def delete_livekit_room(room_name: str) -> bool:
+    """True once the room is gone from LiveKit (deleted now, or already absent)."""
+    from livekit.api import TwirpError, TwirpErrorCode
 
-def delete_livekit_room(room_name: str):
     try:
         _run(_delete_room(room_name))
+        return True
+    except TwirpError as e:
+        if e.code == TwirpErrorCode.NOT_FOUND:
+            return True
+        logger.error("delete_livekit_room [%s]: %s", room_name, e)
     except Exception as e:
         logger.error("delete_livekit_room [%s]: %s", room_name, e)
+    return False
 
 
 async def _disconnect_all(room_name: str):
     from livekit import api as lkapi
-    lk = _lk()
-    try:
-        resp = await lk.room.list_participants(
-            lkapi.ListParticipantsRequest(room=room_name)
-        )
-        for p in resp.participants:
-            try:
-                await lk.room.remove_participant(
-                    lkapi.RoomParticipantIdentity(room=room_name, identity=p.identity)
-                )
-            except Exception as e:
-                logger.warning("Could not remove %s: %s", p.identity, e)
-    finally:
-        await lk.aclose()
+    lk = await _lk()
+    resp = await lk.room.list_participants(
+        lkapi.ListParticipantsRequest(room=room_name)
+    )
+
+    async def _remove(identity):
+        try:
+            await lk.room.remove_participant(
+                lkapi.RoomParticipantIdentity(room=room_name, identity=identity)
+            )
+        except Exception as e:
+            logger.warning("Could not remove %s: %s", identity, e)
+
+    # Concurrent over the pooled session — a full batch room is one round-trip, not N
+    await asyncio.gather(*(_remove(p.identity) for p in resp.participants))
 
 
 def disconnect_all_participants(room_name: str):
@@ -169,30 +172,27 @@ async def _mute_participant_mic(room_name: str, identity: str):
     from livekit import api as lkapi
     from livekit.protocol import models as lkm
 
-    lk = _lk()
-    try:
-        participant = await lk.room.get_participant(
-            lkapi.RoomParticipantIdentity(room=room_name, identity=identity)
+    lk = await _lk()
+    participant = await lk.room.get_participant(
+        lkapi.RoomParticipantIdentity(room=room_name, identity=identity)
+    )
+    muted_any = False
+    for pub in participant.tracks:
+        is_mic = (
+            pub.source == lkm.TrackSource.MICROPHONE
+            or pub.type == lkm.TrackType.AUDIO
         )
-        muted_any = False
-        for pub in participant.tracks:
-            is_mic = (
-                pub.source == lkm.TrackSource.MICROPHONE
-                or pub.type == lkm.TrackType.AUDIO
-            )
-            if is_mic and not pub.muted:
-                await lk.room.mute_published_track(
-                    lkapi.MutePublishedTrackRequest(
-                        room=room_name,
-                        identity=identity,
-                        track_sid=pub.sid,
-                        muted=True,
-                    )
+        if is_mic and not pub.muted:
+            await lk.room.mute_published_track(
+                lkapi.MutePublishedTrackRequest(
+                    room=room_name,
+                    identity=identity,
+                    track_sid=pub.sid,
+                    muted=True,
                 )
-                muted_any = True
-        return muted_any
-    finally:
-        await lk.aclose()
+            )
+            muted_any = True
+    return muted_any
 
 
 def mute_participant_mic(room_name: str, identity: str) -> bool:
@@ -209,33 +209,36 @@ async def _mute_all_mics(room_name: str, except_identity: str | None):
     from livekit import api as lkapi
     from livekit.protocol import models as lkm
 
-    lk = _lk()
-    try:
-        resp = await lk.room.list_participants(
-            lkapi.ListParticipantsRequest(room=room_name)
-        )
-        count = 0
-        for p in resp.participants:
-            if except_identity and p.identity == except_identity:
-                continue
-            for pub in p.tracks:
-                is_mic = (
-                    pub.source == lkm.TrackSource.MICROPHONE
-                    or pub.type == lkm.TrackType.AUDIO
-                )
-                if is_mic and not pub.muted:
-                    await lk.room.mute_published_track(
-                        lkapi.MutePublishedTrackRequest(
-                            room=room_name,
-                            identity=p.identity,
-                            track_sid=pub.sid,
-                            muted=True,
-                        )
-                    )
-                    count += 1
-        return count
-    finally:
-        await lk.aclose()
+    lk = await _lk()
+    resp = await lk.room.list_participants(
+        lkapi.ListParticipantsRequest(room=room_name)
+    )
+    requests = []
+    for p in resp.participants:
+        if except_identity and p.identity == except_identity:
+            continue
+        for pub in p.tracks:
+            is_mic = (
+                pub.source == lkm.TrackSource.MICROPHONE
+                or pub.type == lkm.TrackType.AUDIO
+            )
+            if is_mic and not pub.muted:
+                requests.append(lkapi.MutePublishedTrackRequest(
+                    room=room_name,
+                    identity=p.identity,
+                    track_sid=pub.sid,
+                    muted=True,
+                ))
+
+    # Concurrent over the pooled session
+    results = await asyncio.gather(
+        *(lk.room.mute_published_track(r) for r in requests),
+        return_exceptions=True,
+    )
+    for r, res in zip(requests, results):
+        if isinstance(res, Exception):
+            logger.warning("Could not mute %s/%s: %s", r.identity, r.track_sid, res)
+    return sum(not isinstance(res, Exception) for res in results)
 
 
 def mute_all_participants(room_name: str, except_identity: str | None = None) -> int:
@@ -250,13 +253,10 @@ def mute_all_participants(room_name: str, except_identity: str | None = None) ->
 async def _remove_participant(room_name: str, identity: str):
     from livekit import api as lkapi
 
-    lk = _lk()
-    try:
-        await lk.room.remove_participant(
-            lkapi.RoomParticipantIdentity(room=room_name, identity=identity)
-        )
-    finally:
-        await lk.aclose()
+    lk = await _lk()
+    await lk.room.remove_participant(
+        lkapi.RoomParticipantIdentity(room=room_name, identity=identity)
+    )
 
 
 def remove_participant(room_name: str, identity: str) -> bool:
@@ -269,6 +269,62 @@ def remove_participant(room_name: str, identity: str) -> bool:
         return False
 
 
+# ──────────────────────────────────────────────────────
+# ASYNC ENTRY POINTS
+# Same behaviour as the sync functions above, for async views / consumers —
+# awaits the shared client loop instead of blocking the caller's loop.
+# ──────────────────────────────────────────────────────
+
+async def acreate_livekit_room(room_name: str, empty_timeout: int = 3600, max_participants: int = 2):
+    try:
+        return await _arun(_create_room(
+            room_name,
+            empty_timeout=empty_timeout,
+            max_participants=max_participants,
+        ))
+    except Exception as e:
+        logger.error("acreate_livekit_room [%s]: %s", room_name, e)
+
+
+async def adelete_livekit_room(room_name: str):
+    try:
+        await _arun(_delete_room(room_name))
+    except Exception as e:
+        logger.error("adelete_livekit_room [%s]: %s", room_name, e)
+
+
+async def adisconnect_all_participants(room_name: str):
+    try:
+        await _arun(_disconnect_all(room_name))
+    except Exception as e:
+        logger.error("adisconnect_all_participants [%s]: %s", room_name, e)
+
+
+async def amute_participant_mic(room_name: str, identity: str) -> bool:
+    try:
+        return bool(await _arun(_mute_participant_mic(room_name, identity)))
+    except Exception as e:
+        logger.error("amute_participant_mic [%s/%s]: %s", room_name, identity, e)
+        return False
+
+
+async def amute_all_participants(room_name: str, except_identity: str | None = None) -> int:
+    try:
+        return int(await _arun(_mute_all_mics(room_name, except_identity)))
+    except Exception as e:
+        logger.error("amute_all_participants [%s]: %s", room_name, e)
+        return 0
+
+
+async def aremove_participant(room_name: str, identity: str) -> bool:
+    try:
+        await _arun(_remove_participant(room_name, identity))
+        return True
+    except Exception as e:
+        logger.error("aremove_participant [%s/%s]: %s", room_name, identity, e)
+        return False
+
+
 # ──────────────────────────────────────────────────────
 # EGRESS — LOCAL FILE RECORDING
 # (Cloudinary upload happens AFTER egress ends via webhook)
@@ -282,35 +338,41 @@ async def _start_egress_local(room_name: str, local_filepath: str):
     from livekit import api as lkapi
     from livekit.protocol import egress as ep
 
-    lk = _lk()
-    try:
-        req = lkapi.RoomCompositeEgressRequest(
-            room_name=room_name,
-            layout="speaker",
-            audio_only=False,
-            video_only=False,
-            file_outputs=[
-                ep.EncodedFileOutput(
-                    file_type=ep.EncodedFileType.MP4,
-                    filepath=local_filepath,
-                )
-            ],
-        )
-        return await lk.egress.start_room_composite_egress(req)
-    finally:
-        await lk.aclose()
+    lk = await _lk()
+    req = lkapi.RoomCompositeEgressRequest(
+        room_name=room_name,
+        layout="speaker",
+        audio_only=False,
+        video_only=False,
+        file_outputs=[
+            ep.EncodedFileOutput(
+                file_type=ep.EncodedFileType.MP4,
+                filepath=local_filepath,
+            )
+        ],
+    )
+    return await lk.egress.start_room_composite_egress(req)
 
 
-def start_room_recording(*, call_room) -> str | None:
+def start_room_recording(*, call_room, recording=None) -> str | None:
     """
     Start recording for a CallRoom.
     Saves to local /recordings/<room_id>.mp4
     Returns egress_id on success.
+
+    `recording` is a placeholder CallRecording already claimed under the
+    room lock (process_livekit_event): it is filled in on success and
+    deleted on failure, so the next participant_joined tries again.
     """
     from calls.models import CallRecording
 
+    def _release_claim():
+        if recording is not None:
+            CallRecording.objects.filter(id=recording.id, egress_id="").delete()
+
     if not call_room.sfu_room_name:
         logger.error("start_room_recording: CallRoom %s has no sfu_room_name, skipping.", call_room.id)
+        _release_claim()
         return None
 
     local_path = f"/recordings/{call_room.id}.mp4"
@@ -318,30 +380,34 @@ def start_room_recording(*, call_room) -> str | None:
     try:
         info = _run(_start_egress_local(call_room.sfu_room_name, local_path))
 
-        CallRecording.objects.create(
-            room=call_room,
-            status=CallRecording.STATUS_RECORDING,
-            egress_id=info.egress_id,
-            local_file_path=local_path,
-        )
+        if recording is None:
+            CallRecording.objects.create(
+                room=call_room,
+                status=CallRecording.STATUS_RECORDING,
+                egress_id=info.egress_id,
+                local_file_path=local_path,
+            )
+        else:
+            CallRecording.objects.filter(id=recording.id).update(
+                egress_id=info.egress_id,
+                local_file_path=local_path,
+            )
 
         logger.info("Recording started: room=%s egress=%s", call_room.id, info.egress_id)
         return info.egress_id
 
     except Exception as e:
         logger.error("start_room_recording [%s]: %s", call_room.id, e)
+        _release_claim()
         return None
 
 
 async def _stop_egress(egress_id: str):
     from livekit import api as lkapi
-    lk = _lk()
-    try:
-        return await lk.egress.stop_egress(
-            lkapi.StopEgressRequest(egress_id=egress_id)
-        )
-    finally:
-        await lk.aclose()
+    lk = await _lk()
+    return await lk.egress.stop_egress(
+        lkapi.StopEgressRequest(egress_id=egress_id)
+    )
 
 
 def stop_room_recording(*, egress_id: str):
@@ -358,86 +424,9 @@ def stop_room_recording(*, egress_id: str):
 
 # ──────────────────────────────────────────────────────
 # CLOUDINARY — UPLOAD
+# Runs on the upload worker — see calls/services/recording_upload.py
 # ──────────────────────────────────────────────────────
 
-def upload_recording_to_cloudinary(*, recording) -> bool:
-    """
-    Upload local MP4 to Cloudinary.
-    Called from webhook handler after egress_ended.
-
-    Cloudinary folder structure: qkics/recordings/<room_id>
-    Type: video (not image/raw) so Cloudinary can stream it
-
-    Returns True on success, False on failure.
-    """
-    from calls.models import CallRecording
-
-    local_path = recording.local_file_path
-
-    if not local_path or not os.path.exists(local_path):
-        logger.error(
-            "Local file not found for recording %s: %s",
-            recording.id, local_path,
-        )
-        CallRecording.objects.filter(id=recording.id).update(
-            status=CallRecording.STATUS_FAILED,
-        )
-        return False
-
-    try:
-        _configure_cloudinary()
-
-        # Update status to UPLOADING
-        CallRecording.objects.filter(id=recording.id).update(
-            status=CallRecording.STATUS_UPLOADING,
-        )
-
-        # Upload to Cloudinary
-        public_id = f"qkics/recordings/{recording.room_id}"
-
-        result = cloudinary.uploader.upload(
-            local_path,
-            resource_type="video",
-            public_id=public_id,
-            overwrite=True,
-            # Private so direct URL doesn't work without signature
-            type="private",
-            # Tags for easy management
-            tags=["call_recording", str(recording.room_id)],
-        )
-
-        file_size = os.path.getsize(local_path)
-
-        # Update DB with Cloudinary info
-        CallRecording.objects.filter(id=recording.id).update(
-            status=CallRecording.STATUS_READY,
-            cloudinary_public_id=result["public_id"],
-            cloudinary_secure_url=result["secure_url"],
-            file_size_bytes=file_size,
-            duration_seconds=int(result.get("duration", 0)) or None,
-        )
-
-        logger.info(
-            "Cloudinary upload complete: recording=%s public_id=%s",
-            recording.id, result["public_id"],
-        )
-
-        # Delete local file after successful upload
-        os.remove(local_path)
-        CallRecording.objects.filter(id=recording.id).update(
-            local_file_path="",
-        )
-        logger.info("Local file deleted: %s", local_path)
-
-        return True
-
-    except Exception as e:
-        logger.error("Cloudinary upload failed [%s]: %s", recording.id, e)
-        CallRecording.objects.filter(id=recording.id).update(
-            status=CallRecording.STATUS_FAILED,
-        )
-        return False
-
 
 # ──────────────────────────────────────────────────────
 # CLOUDINARY — SIGNED URL FOR ADMIN DOWNLOAD
@@ -494,17 +483,12 @@ def delete_cloudinary_recording(*, public_id: str) -> bool:
 
 # ──────────────────────────────────────────────────────
 # WEBHOOK HANDLER
+# (view → verify_livekit_webhook → webhook_queue → process_livekit_event)
 # ──────────────────────────────────────────────────────
 
-def handle_livekit_webhook(raw_body: bytes, auth_header: str):
-    """
-    Handle LiveKit webhook events.
-
-    egress_ended  → upload local MP4 to Cloudinary (in background thread)
-    room_finished → mark CallRoom ENDED, stop active recordings
-    """
+def verify_livekit_webhook(raw_body: bytes, auth_header: str):
+    """Verify the LiveKit signature. Returns the parsed WebhookEvent or None."""
     from livekit import api as lkapi
-    from calls.models import CallRoom, CallRecording
 
     verifier = lkapi.TokenVerifier(
         api_key=settings.LIVEKIT_API_KEY,
@@ -513,11 +497,27 @@ def handle_livekit_webhook(raw_body: bytes, auth_header: str):
     receiver = lkapi.WebhookReceiver(verifier)
 
     try:
-        event = receiver.receive(raw_body.decode(), auth_header)
+        return receiver.receive(raw_body.decode(), auth_header)
     except Exception as e:
         logger.warning("Webhook verification failed: %s", e)
         return None
 
+
+def process_livekit_event(event):
+    """
+    Apply a verified LiveKit webhook event. Runs on a webhook_queue worker —
+    never in the request — so slow work (Cloudinary upload, egress start)
+    is done inline here. Raising makes the queue retry the event later.
+
+    egress_ended       → queue local MP4 for Cloudinary upload
+    participant_joined → mark ACTIVE, start recording once, open attendance session
+    participant_left   → close attendance session (duration rollups)
+    room_finished      → close open sessions; mark CallRoom ENDED, stop active recordings
+    """
+    from calls.services import attendance
+    from django.db import transaction
+    from calls.models import CallRoom, CallRecording
+
     event_name = event.event
 
     # ── Recording finished → upload to Cloudinary ──
@@ -532,20 +532,16 @@ def handle_livekit_webhook(raw_body: bytes, auth_header: str):
             _EGRESS_COMPLETE = 3  # fallback: EgressStatus.EGRESS_COMPLETE
 
         if ei.status == _EGRESS_COMPLETE:
-            # Run Cloudinary upload in background thread (non-blocking)
-            import threading
-            try:
-                recording = CallRecording.objects.get(egress_id=ei.egress_id)
-
-                def upload_in_background():
-                    upload_recording_to_cloudinary(recording=recording)
-
-                t = threading.Thread(target=upload_in_background, daemon=True)
-                t.start()
-                logger.info("Cloudinary upload started in background: egress=%s", ei.egress_id)
+            from calls.services.recording_upload import enqueue_upload
 
-            except CallRecording.DoesNotExist:
+            recording = CallRecording.objects.filter(egress_id=ei.egress_id).first()
+            if recording is None:
                 logger.warning("No CallRecording found for egress_id=%s", ei.egress_id)
+            elif not enqueue_upload(recording_id=recording.id):
+                logger.info(
+                    "egress_ended: recording %s already %s, skipping upload",
+                    recording.id, recording.status,
+                )
 
         else:
             # Egress failed/aborted
@@ -558,8 +554,22 @@ def handle_livekit_webhook(raw_body: bytes, auth_header: str):
     # ── First participant joins → start recording + mark ACTIVE ──
     elif event_name == "participant_joined":
         room_name = event.room.name
-        try:
-            call_room = CallRoom.objects.get(sfu_room_name=room_name)
+
+        # Row lock so two participant_joined events for the same room (two
+        # workers) cannot both see "no recording" and start two egresses.
+        # Only the claim (a placeholder CallRecording) is made under it; the
+        # egress API call runs after commit, so the room's other webhooks
+        # don't wait on LiveKit.
+        claim = None
+        with transaction.atomic():
+            call_room = (
+                CallRoom.objects.select_for_update()
+                .filter(sfu_room_name=room_name)
+                .first()
+            )
+            if call_room is None:
+                logger.warning("participant_joined: no CallRoom for sfu_room_name=%s", room_name)
+                return event_name
 
             # Mark ACTIVE on first join
             if call_room.status == CallRoom.STATUS_WAITING:
@@ -569,30 +579,49 @@ def handle_livekit_webhook(raw_body: bytes, auth_header: str):
                 )
                 logger.info("CallRoom ACTIVE: room=%s", room_name)
 
+            # A claim whose worker died before the egress call blocks nothing
+            CallRecording.objects.filter(
+                room=call_room, egress_id="",
+                started_at__lt=timezone.now() - RECORDING_CLAIM_TIMEOUT,
+            ).delete()
+
             # Start recording only once (no duplicate egress)
             if not CallRecording.objects.filter(room=call_room).exists():
-                import threading
-                def _start_rec():
-                    start_room_recording(call_room=call_room)
-                threading.Thread(target=_start_rec, daemon=True).start()
-                logger.info("Recording triggered: first participant joined room=%s", room_name)
-
-        except CallRoom.DoesNotExist:
-            logger.warning("participant_joined: no CallRoom for sfu_room_name=%s", room_name)
-        except Exception as e:
-            logger.error("participant_joined handler [%s]: %s", room_name, e)
+                claim = CallRecording.objects.create(
+                    room=call_room,
+                    status=CallRecording.STATUS_RECORDING,
+                )
+
+        if claim is not None:
+            start_room_recording(call_room=call_room, recording=claim)
+            logger.info("Recording triggered: first participant joined room=%s", room_name)
+
+        attendance.record_join(call_room, event.participant, attendance.event_time(event))
+
+    # ── Participant leaves → close their session ──
+    elif event_name == "participant_left":
+        room_name = event.room.name
+
+        call_room = CallRoom.objects.filter(sfu_room_name=room_name).first()
+        if call_room is None:
+            logger.warning("participant_left: no CallRoom for sfu_room_name=%s", room_name)
+            return event_name
+
+        attendance.record_leave(call_room, event.participant, attendance.event_time(event))
 
     # ── Room closed → mark ended only if the slot time has passed ──
     elif event_name == "room_finished":
         room_name = event.room.name
         now = timezone.now()
 
-        try:
-            call_room = CallRoom.objects.get(sfu_room_name=room_name)
-        except CallRoom.DoesNotExist:
+        call_room = CallRoom.objects.filter(sfu_room_name=room_name).first()
+        if call_room is None:
             logger.warning("room_finished: no CallRoom for sfu_room_name=%s", room_name)
             return event_name
 
+        # Everyone is gone — close sessions whose participant_left was lost
+        attendance.close_open_sessions(call_room, attendance.event_time(event))
+
         # If the scheduled slot is still active, do NOT mark as ENDED.
         # Participants may have temporarily disconnected; they can rejoin
         # and LiveKit will auto-create the room (auto_create: true in config).
@@ -0,0 +1,132 @@
+"""
+calls/services/recording_transcode.py
+
+ffmpeg stage between egress and upload (called by the recording upload worker).
+
+Egress writes the MP4 with the moov atom at the end, so the player can't
+start until the whole file is downloaded, and at the composite bitrate.
+Before upload the file is rewritten in place:
+
+  RECORDING_TRANSCODE_PROFILE
+    "faststart"   stream copy, moov moved to the front (-movflags +faststart)
+    "720p"/"480p" re-encode H.264/AAC to a capped bitrate (+faststart)
+    ""            off
+
+Done once per recording (CallRecording.transcode_profile), so upload
+retries never re-encode an already encoded file. Sizes before/after and
+ffmpeg time are stored on the row — see upload_stats(). Any ffmpeg problem
+(binary missing, error, timeout) just means the original file is uploaded;
+a run that failed or timed out is recorded as transcode_profile="failed",
+so retries don't spend another TRANSCODE_TIMEOUT_SECONDS on it.
+"""
+import logging
+import os
+import shutil
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Below STALE_LOCK_MINUTES in recording_upload, so a slow encode can't
+# make the row look abandoned (the worker refreshes its lock afterwards).
+TRANSCODE_TIMEOUT_SECONDS = 60 * 60
+TRANSCODE_FAILED          = "failed"
+
+_ENCODE = dict(
+    vcodec="libx264",
+    preset="veryfast",
+    pix_fmt="yuv420p",
+    acodec="aac",
+    audio_bitrate="96k",
+)
+
+TRANSCODE_PROFILES = {
+    "faststart": dict(c="copy"),
+    "720p": dict(_ENCODE, video_bitrate="1500k", maxrate="2000k", bufsize="3000k",
+                 vf="scale=-2:'min(720,ih)'"),
+    "480p": dict(_ENCODE, video_bitrate="800k", maxrate="1100k", bufsize="1600k",
+                 vf="scale=-2:'min(480,ih)'"),
+}
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(settings.FFMPEG_BINARY) is not None
+
+
+def build_command(src, dst, profile):
+    """ffmpeg-python stream for one profile (exposed for logging / inspection)."""
+    import ffmpeg
+
+    args = dict(TRANSCODE_PROFILES[profile], movflags="+faststart")
+    if profile != "faststart":
+        args["threads"] = settings.RECORDING_TRANSCODE_THREADS
+    return ffmpeg.input(src).output(dst, **args).overwrite_output()
+
+
+def transcode_recording(rec) -> bool:
+    """
+    Rewrite rec.local_file_path per RECORDING_TRANSCODE_PROFILE.
+    Returns True if the file was replaced. Never raises.
+    """
+    from calls.models import CallRecording
+
+    profile = settings.RECORDING_TRANSCODE_PROFILE
+    src     = rec.local_file_path
+
+    if not profile or rec.transcode_profile:
+        return False
+    if profile not in TRANSCODE_PROFILES:
+        logger.error("Unknown RECORDING_TRANSCODE_PROFILE %r — uploading original", profile)
+        return False
+    if not ffmpeg_available():
+        logger.warning("ffmpeg not found (%s) — uploading recording %s as-is", settings.FFMPEG_BINARY, rec.id)
+        return False
+
+    root, ext = os.path.splitext(src)
+    tmp       = f"{root}.{profile}.part{ext or '.mp4'}"
+    original  = os.path.getsize(src)
+    started   = time.monotonic()
+
+    try:
+        proc = build_command(src, tmp, profile).run_async(
+            cmd=settings.FFMPEG_BINARY, quiet=True,
+        )
+        try:
+            _out, err = proc.communicate(timeout=TRANSCODE_TIMEOUT_SECONDS)
+        except Exception:
+            proc.kill()
+            proc.communicate()
+            raise
+        if proc.returncode != 0:
+            raise RuntimeError(err.decode(errors="replace")[-1000:])
+        if not os.path.getsize(tmp):
+            raise RuntimeError("ffmpeg produced an empty file")
+        os.replace(tmp, src)
+    except Exception as e:
+        logger.warning("ffmpeg %s failed for recording %s — uploading original: %s", profile, rec.id, e)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        CallRecording.objects.filter(id=rec.id).update(
+            transcode_profile=TRANSCODE_FAILED,
+            transcode_seconds=round(time.monotonic() - started, 2),
+        )
+        rec.transcode_profile = TRANSCODE_FAILED
+        return False
+
+    elapsed = time.monotonic() - started
+    final   = os.path.getsize(src)
+    CallRecording.objects.filter(id=rec.id).update(
+        transcode_profile=profile,
+        original_size_bytes=original,
+        transcode_seconds=round(elapsed, 2),
+    )
+    rec.transcode_profile, rec.original_size_bytes, rec.transcode_seconds = profile, original, elapsed
+    logger.info(
+        "ffmpeg %s: recording=%s %.1f MB → %.1f MB (%.0f%% saved) in %.1fs",
+        profile, rec.id, original / 1024 / 1024, final / 1024 / 1024,
+        100 * (original - final) / original if original else 0, elapsed,
+    )
+    return True
@@ -0,0 +1,348 @@
+"""
+calls/services/recording_upload.py
+
+Recording upload worker — local MP4 → Cloudinary.
+
+Previously the upload ran in an untracked daemon thread with a single
+whole-file cloudinary.uploader.upload(); a worker restart lost it and left
+the row stuck in UPLOADING forever. Now the DB row is the job:
+
+  * egress_ended → enqueue_upload(): RECORDING → UPLOADING, hand id to a
+    bounded pool (RECORDING_UPLOAD_WORKERS per process). Saturated pool →
+    row just waits for the resume job.
+  * Worker claims the row (conditional UPDATE on upload_locked_at), runs
+    the ffmpeg faststart/transcode stage (recording_transcode), re-stamps
+    its lock so the upload gets a full STALE_LOCK_MINUTES, and streams it
+    with cloudinary.uploader.upload_large() in RECORDING_UPLOAD_CHUNK_MB
+    chunks.
+  * Failure → stays UPLOADING with next_upload_at = exponential backoff;
+    after RECORDING_UPLOAD_MAX_ATTEMPTS → FAILED (local file kept for the
+    cleanup task / manual retry).
+  * resume_pending_uploads() (APScheduler, every 60s) re-submits due rows,
+    rows whose worker died (stale lock), and RECORDING rows whose egress
+    finished but whose egress_ended webhook never arrived.
+  * upload_stats() — backlog + throughput for the admin stats endpoint.
+
+Offline testing: `manage.py fake_cloudinary` + CLOUDINARY_UPLOAD_PREFIX.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import cloudinary.uploader
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS  = 30 * 60
+STALE_LOCK_MINUTES   = 90   # longest sane single upload; after this the row is re-claimable
+RECORDING_GRACE      = timedelta(minutes=10)  # egress stopped but no egress_ended yet
+RECORDING_MAX_AGE    = timedelta(hours=5)     # token TTL is 4h — egress is surely over
+RESUME_BATCH_SIZE    = 20
+
+_executor = None
+_slots    = None
+_lock     = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers   = settings.RECORDING_UPLOAD_WORKERS
+                _slots    = threading.BoundedSemaphore(workers * 2)
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="rec-upload",
+                )
+    return _executor
+
+
+def _submit(recording_id) -> bool:
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        logger.info("Upload pool saturated — recording %s left for resume job", recording_id)
+        return False
+    future = executor.submit(upload_recording, recording_id)
+    future.add_done_callback(lambda _f: _slots.release())
+    return True
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def _claimable(now):
+    """UPLOADING rows that are due and not held by a live worker."""
+    from calls.models import CallRecording
+
+    return (
+        Q(status=CallRecording.STATUS_UPLOADING)
+        & (Q(next_upload_at__isnull=True) | Q(next_upload_at__lte=now))
+        & (
+            Q(upload_locked_at__isnull=True)
+            | Q(upload_locked_at__lt=now - timedelta(minutes=STALE_LOCK_MINUTES))
+        )
+    )
+
+
+# ──────────────────────────────────────────────────────
+# ENQUEUE
+# ──────────────────────────────────────────────────────
+
+def enqueue_upload(*, recording_id) -> bool:
+    """Mark a finished recording for upload. No-op if it isn't RECORDING."""
+    from calls.models import CallRecording
+
+    moved = CallRecording.objects.filter(
+        id=recording_id,
+        status=CallRecording.STATUS_RECORDING,
+    ).update(
+        status=CallRecording.STATUS_UPLOADING,
+        ended_at=timezone.now(),
+        next_upload_at=None,
+    )
+    if moved:
+        transaction.on_commit(lambda: _submit(recording_id))
+        logger.info("Recording %s queued for upload", recording_id)
+    return bool(moved)
+
+
+# ──────────────────────────────────────────────────────
+# WORKER
+# ──────────────────────────────────────────────────────
+
+def upload_recording(recording_id) -> bool:
+    """Claim one recording and upload it. Safe to call concurrently."""
+    from calls.models import CallRecording
+    from calls.services.livekit_service import _configure_cloudinary
+    from calls.services.recording_transcode import transcode_recording
+
+    close_old_connections()
+    try:
+        now = timezone.now()
+        claimed = CallRecording.objects.filter(_claimable(now), id=recording_id).update(
+            upload_locked_at=now,
+            upload_started_at=now,
+            upload_attempts=F("upload_attempts") + 1,
+        )
+        if not claimed:
+            return False
+
+        rec        = CallRecording.objects.get(id=recording_id)
+        local_path = rec.local_file_path
+
+        if not local_path or not os.path.exists(local_path):
+            logger.error("Local file not found for recording %s: %s", rec.id, local_path)
+            CallRecording.objects.filter(id=rec.id).update(
+                status=CallRecording.STATUS_FAILED,
+                upload_locked_at=None,
+                upload_error=f"Local file not found: {local_path}",
+            )
+            return False
+
+        # faststart remux / re-encode — once per recording, never fails the upload
+        transcode_recording(rec)
+
+        # ffmpeg may have used most of the lock window; restart it for the
+        # upload. Nothing matched → the lock went stale and another worker has
+        # the row.
+        if not CallRecording.objects.filter(id=rec.id, upload_locked_at=now).update(
+            upload_locked_at=timezone.now(),
+        ):
+            logger.warning("Recording %s re-claimed by another worker during transcode", rec.id)
+            return False
+
+        try:
+            _configure_cloudinary()
+            file_size = os.path.getsize(local_path)
+            started   = time.monotonic()
+
+            # Cloudinary folder structure: qkics/recordings/<room_id>
+            # Private so direct URL doesn't work without signature
+            result = cloudinary.uploader.upload_large(
+                local_path,
+                resource_type="video",
+                public_id=f"qkics/recordings/{rec.room_id}",
+                overwrite=True,
+                type="private",
+                tags=["call_recording", str(rec.room_id)],
+                chunk_size=settings.RECORDING_UPLOAD_CHUNK_MB * 1024 * 1024,
+            )
+            elapsed = time.monotonic() - started
+        except Exception as e:
+            _upload_failed(rec, e)
+            return False
+
+        CallRecording.objects.filter(id=rec.id).update(
+            status=CallRecording.STATUS_READY,
+            cloudinary_public_id=result["public_id"],
+            cloudinary_secure_url=result["secure_url"],
+            file_size_bytes=file_size,
+            duration_seconds=int(result.get("duration", 0)) or None,
+            uploaded_at=timezone.now(),
+            upload_locked_at=None,
+            upload_error="",
+        )
+        logger.info(
+            "Cloudinary upload complete: recording=%s public_id=%s %.1f MB in %.1fs (%.2f MB/s, attempt %d)",
+            rec.id, result["public_id"], file_size / 1024 / 1024, elapsed,
+            file_size / 1024 / 1024 / elapsed if elapsed else 0, rec.upload_attempts,
+        )
+
+        # Delete local file after successful upload
+        try:
+            os.remove(local_path)
+            CallRecording.objects.filter(id=rec.id).update(local_file_path="")
+            logger.info("Local file deleted: %s", local_path)
+        except OSError as e:
+            logger.warning("Could not delete local file %s: %s", local_path, e)
+
+        return True
+
+    except Exception as e:
+        logger.error("upload_recording [%s]: %s", recording_id, e)
+        return False
+    finally:
+        close_old_connections()
+
+
+def _upload_failed(rec, error):
+    from calls.models import CallRecording
+
+    if rec.upload_attempts >= settings.RECORDING_UPLOAD_MAX_ATTEMPTS:
+        logger.error(
+            "Cloudinary upload failed permanently [%s] after %d attempts: %s",
+            rec.id, rec.upload_attempts, error,
+        )
+        fields = {"status": CallRecording.STATUS_FAILED}
+    else:
+        next_at = timezone.now() + _backoff(rec.upload_attempts)
+        logger.warning(
+            "Cloudinary upload failed [%s] (attempt %d), retry at %s: %s",
+            rec.id, rec.upload_attempts, next_at, error,
+        )
+        fields = {"next_upload_at": next_at}
+
+    CallRecording.objects.filter(id=rec.id).update(
+        upload_locked_at=None,
+        upload_error=str(error)[:2000],
+        **fields,
+    )
+
+
+# ──────────────────────────────────────────────────────
+# RESUME (APScheduler, every 60s)
+# ──────────────────────────────────────────────────────
+
+def resume_pending_uploads(limit: int = RESUME_BATCH_SIZE) -> int:
+    """Submit due/abandoned uploads. Returns how many were handed to the pool."""
+    from calls.models import CallRecording
+
+    now = timezone.now()
+
+    # Egress is over but egress_ended never reached us → upload anyway
+    orphaned = (
+        CallRecording.objects
+        .filter(status=CallRecording.STATUS_RECORDING)
+        .exclude(local_file_path="")
+        .filter(
+            Q(ended_at__lt=now - RECORDING_GRACE)
+            | Q(started_at__lt=now - RECORDING_MAX_AGE)
+        )
+        .values_list("id", "local_file_path")[:limit]
+    )
+    for rec_id, path in orphaned:
+        if os.path.exists(path):
+            CallRecording.objects.filter(
+                id=rec_id, status=CallRecording.STATUS_RECORDING,
+            ).update(status=CallRecording.STATUS_UPLOADING, next_upload_at=None)
+            logger.info("Recording %s had no egress_ended — queued for upload", rec_id)
+
+    due = list(
+        CallRecording.objects
+        .filter(_claimable(now))
+        .exclude(local_file_path="")
+        .order_by("started_at")
+        .values_list("id", flat=True)[:limit]
+    )
+
+    submitted = 0
+    for rec_id in due:
+        if not _submit(rec_id):
+            break
+        submitted += 1
+
+    if submitted:
+        logger.info("Upload resume: %d recordings submitted", submitted)
+    return submitted
+
+
+# ──────────────────────────────────────────────────────
+# METRICS
+# ──────────────────────────────────────────────────────
+
+def upload_stats(*, hours: int = 24) -> dict:
+    """Backlog and throughput of uploads completed in the last `hours`."""
+    from calls.models import CallRecording
+
+    now   = timezone.now()
+    since = now - timedelta(hours=hours)
+
+    done = CallRecording.objects.filter(
+        uploaded_at__gte=since,
+        upload_started_at__isnull=False,
+        file_size_bytes__isnull=False,
+    ).values_list(
+        "upload_started_at", "uploaded_at", "file_size_bytes", "upload_attempts",
+        "original_size_bytes", "transcode_seconds",
+    )
+
+    total_bytes = total_seconds = retried = 0
+    count = transcoded = saved_bytes = transcode_seconds = 0
+    for started_at, uploaded_at, size, attempts, original, ffmpeg_seconds in done:
+        total_bytes   += size
+        total_seconds += max((uploaded_at - started_at).total_seconds(), 0)
+        retried       += attempts > 1
+        count         += 1
+        if original is not None:
+            transcoded        += 1
+            saved_bytes       += original - size
+            transcode_seconds += ffmpeg_seconds or 0
+    # upload_started_at → uploaded_at includes the ffmpeg stage
+    upload_seconds = total_seconds - transcode_seconds
+    mb_per_sec = total_bytes / 1024 / 1024 / upload_seconds if upload_seconds > 0 else None
+
+    uploading = CallRecording.objects.filter(status=CallRecording.STATUS_UPLOADING)
+    oldest    = uploading.order_by("ended_at").values_list("ended_at", flat=True).first()
+
+    return {
+        "window_hours":      hours,
+        "uploaded":          count,
+        "uploaded_mb":       round(total_bytes / 1024 / 1024, 1),
+        "avg_mb_per_sec":    round(mb_per_sec, 2) if mb_per_sec else None,
+        "avg_seconds":       round(total_seconds / count, 1) if count else None,
+        "needed_retry":      retried,
+        "transcode": {
+            "profile":            settings.RECORDING_TRANSCODE_PROFILE,
+            "recordings":         transcoded,
+            "saved_mb":           round(saved_bytes / 1024 / 1024, 1),
+            "avg_seconds":        round(transcode_seconds / transcoded, 1) if transcoded else None,
+            # at this window's upload speed
+            "upload_seconds_saved": round(saved_bytes / 1024 / 1024 / mb_per_sec) if mb_per_sec else None,
+        },
+        "backlog":           uploading.count(),
+        "in_progress":       uploading.filter(upload_locked_at__isnull=False).count(),
+        "oldest_backlog_age_seconds": int((now - oldest).total_seconds()) if oldest else None,
+        "failed_in_window":  CallRecording.objects.filter(
+            status=CallRecording.STATUS_FAILED, ended_at__gte=since,
+        ).count(),
+    }
@@ -0,0 +1,171 @@
+"""
+calls/services/room_provisioning.py
+
+LiveKit room creation, kept out of the booking/payment transaction.
+
+confirm_booking_after_payment holds a select_for_update lock on the Booking
+while it creates the CallRoom; creating the LiveKit room inline made a slow
+SFU stall the PayU callback and every confirmation queued behind the lock.
+Now:
+
+  * call_room_service creates the CallRoom row only and calls
+    provision_after_commit() — the LiveKit create_room runs on a small
+    pool (ROOM_PROVISION_WORKERS) once the transaction has committed.
+  * Success sets sfu_provisioned_at. Failure → sfu_next_provision_at with
+    exponential backoff.
+  * provision_pending_rooms() (APScheduler, every 60s) retries failed /
+    never-submitted rooms and warms up rooms ROOM_WARMUP_MINUTES before
+    scheduled_start: create_room is create-or-get, so calling it again
+    restores a room lost in a LiveKit restart and re-applies
+    empty_timeout / max_participants.
+
+Joining never depends on this — LiveKit also auto-creates rooms on join.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import DateTimeField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Extra buffer added on top of slot duration so LiveKit keeps the room
+# open even if participants join a little late or reconnect near the end.
+_BUFFER_SECONDS = 600  # 10 minutes
+
+BACKOFF_BASE_SECONDS = 15
+BACKOFF_MAX_SECONDS  = 10 * 60
+SWEEP_BATCH_SIZE     = 50
+
+_executor = None
+_slots    = None
+_lock     = threading.Lock()
+
+
+def _slot_empty_timeout(end_datetime) -> int:
+    """
+    Compute empty_timeout (seconds) for LiveKit room creation.
+    = seconds until slot ends + 10-min buffer, minimum 600 s.
+    """
+    if end_datetime:
+        remaining = int((end_datetime - timezone.now()).total_seconds())
+        return max(remaining + _BUFFER_SECONDS, _BUFFER_SECONDS)
+    return 3600  # fallback: 1 hour
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers   = settings.ROOM_PROVISION_WORKERS
+                _slots    = threading.BoundedSemaphore(workers * 8)
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="room-provision",
+                )
+    return _executor
+
+
+def _submit(room_id) -> bool:
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        logger.info("Provisioning pool saturated — room %s left for the sweeper", room_id)
+        return False
+    future = executor.submit(provision_room, room_id)
+    future.add_done_callback(lambda _f: _slots.release())
+    return True
+
+
+def provision_after_commit(call_room):
+    """Create the LiveKit room once the surrounding transaction commits."""
+    room_id = call_room.id
+    transaction.on_commit(lambda: _submit(room_id))
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def provision_room(room_id) -> bool:
+    """create_room for one CallRoom (create-or-get on LiveKit's side)."""
+    from calls.models import CallRoom
+    from calls.services.livekit_service import create_livekit_room
+
+    close_old_connections()
+    try:
+        room = CallRoom.objects.select_related("slot").filter(id=room_id).first()
+        if room is None or room.status == CallRoom.STATUS_ENDED or not room.sfu_room_name:
+            return False
+
+        # batch: capacity users + the expert
+        max_participants = room.slot.capacity + 1 if room.slot_id else 2
+        created = create_livekit_room(
+            room.sfu_room_name,
+            empty_timeout=_slot_empty_timeout(room.scheduled_end),
+            max_participants=max_participants,
+        )
+
+        if created is not None:
+            CallRoom.objects.filter(id=room.id).update(
+                sfu_provisioned_at=timezone.now(),
+                sfu_provision_attempts=0,
+                sfu_next_provision_at=None,
+            )
+            logger.info("LiveKit room provisioned: %s", room.sfu_room_name)
+            return True
+
+        attempts = room.sfu_provision_attempts + 1
+        next_at  = timezone.now() + _backoff(attempts)
+        CallRoom.objects.filter(id=room.id).update(
+            sfu_provision_attempts=attempts,
+            sfu_next_provision_at=next_at,
+        )
+        logger.warning(
+            "LiveKit room provisioning failed [%s] (attempt %d), retry at %s",
+            room.sfu_room_name, attempts, next_at,
+        )
+        return False
+    except Exception as e:
+        logger.error("provision_room [%s]: %s", room_id, e)
+        return False
+    finally:
+        close_old_connections()
+
+
+def provision_pending_rooms(limit: int = SWEEP_BATCH_SIZE) -> int:
+    """Retry unprovisioned rooms and warm up rooms about to start. Returns rooms submitted."""
+    from calls.models import CallRoom
+
+    now    = timezone.now()
+    warmup = timedelta(minutes=settings.ROOM_WARMUP_MINUTES)
+
+    due = list(
+        CallRoom.objects
+        .exclude(status=CallRoom.STATUS_ENDED)
+        .exclude(sfu_room_name="")
+        .filter(Q(scheduled_end__isnull=True) | Q(scheduled_end__gt=now))
+        .filter(Q(sfu_next_provision_at__isnull=True) | Q(sfu_next_provision_at__lte=now))
+        .annotate(warmup_from=ExpressionWrapper(F("scheduled_start") - warmup, output_field=DateTimeField()))
+        .filter(
+            Q(sfu_provisioned_at__isnull=True)
+            # starting soon, and last provisioned before the warm-up window opened
+            | Q(scheduled_start__lte=now + warmup, sfu_provisioned_at__lt=F("warmup_from"))
+        )
+        .order_by("scheduled_start")
+        .values_list("id", flat=True)[:limit]
+    )
+
+    submitted = 0
+    for room_id in due:
+        if not _submit(room_id):
+            break
+        submitted += 1
+
+    if submitted:
+        logger.info("Room provisioning sweep: %d rooms submitted", submitted)
+    return submitted
@@ -0,0 +1,298 @@
+"""
+calls/services/scheduler.py
+
+APScheduler wiring — one job-running process, many job-adding processes.
+
+Every gunicorn/uvicorn worker used to start a BackgroundScheduler on the
+shared DjangoJobStore, so 3 workers polled the job table and could fire the
+same _auto_cut_job, fighting over DB locks. Now:
+
+  * Web workers: get_scheduler() starts the scheduler PAUSED. add_job /
+    remove_job still write to DjangoJobStore, but nothing is executed here.
+  * `manage.py run_scheduler`: the only process that executes jobs. Several
+    can run (rolling deploy, a spare); leadership is a MySQL GET_LOCK held on
+    the command's DB connection — the others wait in standby and take over
+    within a few seconds if the leader's connection dies.
+  * SCHEDULER_EMBEDDED=True (local dev): the web process runs jobs itself,
+    like before, so `runserver` alone is enough.
+
+Metrics (lag, duration, errors per job; leader heartbeat) go to the Django
+cache — Redis in production, so any web worker can serve them:
+GET /api/v1/calls/admin/scheduler/.
+"""
+import logging
+import os
+import re
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+LEADER_LOCK_NAME = "qkics_scheduler_leader"
+METRICS_CACHE_KEY = "calls:scheduler:metrics"
+METRICS_TTL = 24 * 3600
+
+# (func import path, interval seconds, job id, name). Stored in DjangoJobStore,
+# so referenced by import path. Registered by the job-running process only.
+PERIODIC_JOBS = [
+    ("calls.services.webhook_queue:drain_due_events", 30,
+     "livekit_webhook_drain", "Drain LiveKit webhook queue"),
+    ("payments.services.callback_queue:drain_due_callbacks", 30,
+     "payment_callback_drain", "Drain PayU callback queue"),
+    ("calls.services.recording_upload:resume_pending_uploads", 60,
+     "recording_upload_resume", "Resume pending recording uploads"),
+    ("calls.services.auto_cut:sweep_due_rooms", 30,
+     "auto_cut_sweep", "Auto-cut rooms past scheduled_end"),
+    ("calls.services.chat_state:persist_block_lists", 60,
+     "chat_block_persist", "Persist call chat block lists"),
+    ("calls.services.room_provisioning:provision_pending_rooms", 60,
+     "room_provision_sweep", "Provision / warm up LiveKit rooms"),
+    ("bookings.services.slot_materializer:materialize_due_patterns", 900,
+     "slot_materialize", "Materialize recurring expert slots"),
+    ("bookings.services.booking_sweeper:sweep_bookings", 60,
+     "booking_sweep", "Expire stale / complete finished bookings"),
+    ("bookings.services.seat_holds:reconcile_batch_seats", 300,
+     "batch_seat_reconcile", "Reconcile batch seats with bookings"),
+    ("bookings.services.calendar:prune_past_days", 3600,
+     "calendar_prune", "Drop past expert calendar days"),
+    ("bookings.services.reminders:send_due_reminders", 60,
+     "session_reminders", "Send pre-session reminders"),
+    ("bookings.services.reminders:prune_reminder_markers", 3600,
+     "session_reminder_prune", "Drop old session reminder markers"),
+    ("bookings.services.earnings:reconcile_recent_earnings", 86400,
+     "earnings_reconcile", "Reconcile expert earnings rollups with the ledger"),
+]
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def build_scheduler():
+    from apscheduler.executors.pool import ThreadPoolExecutor
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from django_apscheduler.jobstores import DjangoJobStore
+
+    scheduler = BackgroundScheduler(
+        timezone="UTC",
+        executors={"default": ThreadPoolExecutor(settings.SCHEDULER_MAX_WORKERS)},
+    )
+    scheduler.add_jobstore(DjangoJobStore(), "default")
+    return scheduler
+
+
+def get_scheduler():
+    """
+    This process's scheduler. In web workers it is paused (enqueue only);
+    with SCHEDULER_EMBEDDED it also runs jobs.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                scheduler = build_scheduler()
+                if settings.SCHEDULER_EMBEDDED:
+                    install_metrics(scheduler)
+                    scheduler.start()
+                    register_periodic_jobs(scheduler)
+                    logger.info("APScheduler started (embedded — this process runs jobs).")
+                else:
+                    scheduler.start(paused=True)
+                    logger.info("APScheduler started paused (jobs run in `manage.py run_scheduler`).")
+                _scheduler = scheduler
+    return _scheduler
+
+
+def register_periodic_jobs(scheduler):
+    for func, seconds, job_id, name in PERIODIC_JOBS:
+        try:
+            scheduler.add_job(
+                func,
+                trigger="interval",
+                seconds=seconds,
+                id=job_id,
+                name=name,
+                replace_existing=True,
+                coalesce=True,
+                max_instances=1,
+            )
+        except Exception as e:
+            logger.error("Periodic job registration failed [%s]: %s", job_id, e)
+
+
+# ──────────────────────────────────────────────────────
+# LEADER ELECTION
+# ──────────────────────────────────────────────────────
+
+class LeaderLock:
+    """
+    MySQL advisory lock (GET_LOCK) on this thread's DB connection. The lock
+    lives exactly as long as the connection, so a crashed leader releases it
+    automatically. On other backends (sqlite dev) leadership is assumed.
+    """
+
+    def __init__(self, name=LEADER_LOCK_NAME):
+        self.name = name
+        self.supported = connection.vendor == "mysql"
+
+    def acquire(self) -> bool:
+        if not self.supported:
+            logger.warning("Leader lock needs MySQL (%s) — assuming leadership.", connection.vendor)
+            return True
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT GET_LOCK(%s, 0)", [self.name])
+            return cursor.fetchone()[0] == 1
+
+    def is_held(self) -> bool:
+        if not self.supported:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT IS_USED_LOCK(%s) = CONNECTION_ID()", [self.name])
+                return cursor.fetchone()[0] == 1
+        except Exception as e:
+            logger.error("Leader lock check failed: %s", e)
+            return False
+
+    def release(self):
+        if not self.supported:
+            return
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", [self.name])
+        except Exception:
+            pass
+
+
+# ──────────────────────────────────────────────────────
+# METRICS
+# ──────────────────────────────────────────────────────
+
+_metrics_lock = threading.Lock()
+_timing_lock  = threading.Lock()
+_submitted_at = {}     # (job_id, scheduled_run_time) → monotonic submit time
+_finished_first = set()  # fast jobs can finish before the SUBMITTED event is handled
+
+# auto_cut_<uuid> → auto_cut, so per-room jobs aggregate into one series
+_JOB_ID_SUFFIX = re.compile(r"_[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+def _job_key(job_id):
+    return _JOB_ID_SUFFIX.sub("", job_id)
+
+
+def _update_job_metrics(job_id, **changes):
+    with _metrics_lock:
+        data = cache.get(METRICS_CACHE_KEY) or {}
+        jobs = data.setdefault("jobs", {})
+        m = jobs.setdefault(_job_key(job_id), {
+            "runs": 0, "errors": 0, "missed": 0,
+            "last_run": None, "last_error": "",
+            "last_lag_seconds": None, "max_lag_seconds": 0.0,
+            "last_duration_seconds": None, "avg_duration_seconds": None,
+        })
+        for field, value in changes.items():
+            if callable(value):
+                m[field] = value(m)
+            else:
+                m[field] = value
+        cache.set(METRICS_CACHE_KEY, data, METRICS_TTL)
+
+
+def install_metrics(scheduler):
+    from apscheduler.events import (
+        EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED,
+    )
+
+    def on_submitted(event):
+        run_time = event.scheduled_run_times[0]
+        lag = max((timezone.now() - run_time).total_seconds(), 0.0)
+        key = (event.job_id, run_time)
+        with _timing_lock:
+            if key in _finished_first:
+                _finished_first.discard(key)
+            else:
+                _submitted_at[key] = time.monotonic()
+        _update_job_metrics(
+            event.job_id,
+            last_lag_seconds=round(lag, 3),
+            max_lag_seconds=lambda m: round(max(m["max_lag_seconds"], lag), 3),
+        )
+
+    def on_finished(event):
+        key = (event.job_id, event.scheduled_run_time)
+        with _timing_lock:
+            started = _submitted_at.pop(key, None)
+            if started is None:
+                _finished_first.add(key)
+        duration = round(time.monotonic() - started, 3) if started is not None else 0.0
+        failed = event.exception is not None
+
+        def _avg(m):
+            prev = m["avg_duration_seconds"]
+            return duration if prev is None else round(prev * 0.9 + duration * 0.1, 3)  # EWMA
+
+        _update_job_metrics(
+            event.job_id,
+            runs=lambda m: m["runs"] + 1,
+            errors=lambda m: m["errors"] + failed,
+            last_run=timezone.now().isoformat(),
+            last_duration_seconds=duration,
+            avg_duration_seconds=_avg,
+            last_error=repr(event.exception)[:500] if failed else "",
+        )
+
+    def on_missed(event):
+        _update_job_metrics(event.job_id, missed=lambda m: m["missed"] + 1)
+
+    scheduler.add_listener(on_submitted, EVENT_JOB_SUBMITTED)
+    scheduler.add_listener(on_finished, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+    scheduler.add_listener(on_missed, EVENT_JOB_MISSED)
+
+
+def record_heartbeat(*, since):
+    with _metrics_lock:
+        data = cache.get(METRICS_CACHE_KEY) or {}
+        data["leader"] = {
+            "host":      socket.gethostname(),
+            "pid":       os.getpid(),
+            "since":     since.isoformat(),
+            "heartbeat": timezone.now().isoformat(),
+        }
+        cache.set(METRICS_CACHE_KEY, data, METRICS_TTL)
+
+
+def scheduler_metrics() -> dict:
+    """Leader heartbeat + per-job metrics (cache) + job-store backlog (DB)."""
+    from django.utils.dateparse import parse_datetime
+    from django_apscheduler.models import DjangoJob
+
+    now = timezone.now()
+    data = cache.get(METRICS_CACHE_KEY) or {}
+    leader = data.get("leader")
+    if leader:
+        age = (now - parse_datetime(leader["heartbeat"])).total_seconds()
+        leader = {**leader, "heartbeat_age_seconds": int(age), "alive": age < 60}
+
+    # Jobs whose run time has passed but were not run — a dead/lagging leader
+    overdue = DjangoJob.objects.filter(next_run_time__lt=now - timezone.timedelta(seconds=60))
+    oldest = overdue.order_by("next_run_time").values_list("next_run_time", flat=True).first()
+
+    from calls.services.auto_cut import last_sweep
+
+    return {
+        "embedded":  settings.SCHEDULER_EMBEDDED,
+        "leader":    leader,
+        "jobs":      data.get("jobs", {}),
+        "auto_cut":  last_sweep(),
+        "store": {
+            "scheduled":             DjangoJob.objects.count(),
+            "overdue":               overdue.count(),
+            "oldest_overdue_seconds": int((now - oldest).total_seconds()) if oldest else None,
+        },
+    }
@@ -0,0 +1,204 @@
+"""
+calls/services/webhook_queue.py
+
+Durable queue for LiveKit webhooks.
+
+LiveKit retries deliveries freely and a burst (everyone joining at the top of
+the hour) used to hold the request open for DB work and spawn a bare thread
+per upload / egress start. Now:
+
+  1. View → enqueue_webhook(): verify signature, INSERT into
+     LiveKitWebhookEvent (event_id unique → duplicates are dropped), return.
+     Constant-time, no thread spawned.
+  2. After commit the row id is handed to a bounded ThreadPoolExecutor.
+     If the pool is saturated the row just stays PENDING.
+  3. Worker claims the row with a conditional UPDATE (PENDING → PROCESSING),
+     so the same event is never processed twice even across processes, then
+     runs livekit_service.process_livekit_event().
+  4. Failure → back to PENDING with exponential backoff; after
+     LIVEKIT_WEBHOOK_MAX_ATTEMPTS → FAILED (visible in admin).
+  5. drain_due_events() runs every 30s from APScheduler: picks up retries,
+     rows skipped under saturation, and rows left PROCESSING by a crashed
+     worker; also purges old DONE rows.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS  = 15 * 60
+STALE_LOCK_MINUTES   = 10   # PROCESSING longer than this = worker died, re-queue
+DRAIN_BATCH_SIZE     = 100
+
+_executor = None
+_slots    = None  # caps queued + running tasks so a burst can't grow the pool's queue
+_lock     = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers  = settings.LIVEKIT_WEBHOOK_WORKERS
+                _slots   = threading.BoundedSemaphore(workers * 4)
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="lk-webhook",
+                )
+    return _executor
+
+
+def _submit(event_pk) -> bool:
+    """Hand an event to the pool. False if saturated (drain job picks it up)."""
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        logger.warning("Webhook pool saturated — event %s left for drain job", event_pk)
+        return False
+    future = executor.submit(process_event, event_pk)
+    future.add_done_callback(lambda _f: _slots.release())
+    return True
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+# ──────────────────────────────────────────────────────
+# INGEST (request thread)
+# ──────────────────────────────────────────────────────
+
+def enqueue_webhook(raw_body: bytes, auth_header: str):
+    """
+    Verify + persist a webhook. Returns (event_name, created) or None if the
+    signature is invalid. created=False means LiveKit redelivered an event
+    we already have.
+    """
+    from calls.models import LiveKitWebhookEvent
+    from calls.services.livekit_service import verify_livekit_webhook
+
+    event = verify_livekit_webhook(raw_body, auth_header)
+    if event is None:
+        return None
+
+    try:
+        with transaction.atomic():
+            row = LiveKitWebhookEvent.objects.create(
+                event_id=event.id,
+                event=event.event,
+                payload=raw_body.decode(),
+            )
+    except IntegrityError:
+        logger.info("Duplicate LiveKit webhook ignored: %s %s", event.event, event.id)
+        return event.event, False
+
+    transaction.on_commit(lambda: _submit(row.pk))
+    return event.event, True
+
+
+# ──────────────────────────────────────────────────────
+# WORKER
+# ──────────────────────────────────────────────────────
+
+def process_event(event_pk):
+    """Claim and process one stored event. Safe to call more than once."""
+    from google.protobuf.json_format import Parse
+    from livekit.protocol.webhook import WebhookEvent
+    from calls.models import LiveKitWebhookEvent
+    from calls.services.livekit_service import process_livekit_event
+
+    close_old_connections()
+    try:
+        now = timezone.now()
+        claimed = LiveKitWebhookEvent.objects.filter(
+            pk=event_pk,
+            status=LiveKitWebhookEvent.STATUS_PENDING,
+            next_attempt_at__lte=now,
+        ).update(
+            status=LiveKitWebhookEvent.STATUS_PROCESSING,
+            attempts=F("attempts") + 1,
+            locked_at=now,
+        )
+        if not claimed:
+            return  # another worker has it, or it's not due yet
+
+        row = LiveKitWebhookEvent.objects.get(pk=event_pk)
+
+        try:
+            event = Parse(row.payload, WebhookEvent(), ignore_unknown_fields=True)
+            process_livekit_event(event)
+        except Exception as e:
+            if row.attempts >= settings.LIVEKIT_WEBHOOK_MAX_ATTEMPTS:
+                status, next_at = LiveKitWebhookEvent.STATUS_FAILED, row.next_attempt_at
+                logger.error("Webhook %s %s failed permanently: %s", row.event, row.event_id, e)
+            else:
+                status, next_at = LiveKitWebhookEvent.STATUS_PENDING, timezone.now() + _backoff(row.attempts)
+                logger.warning(
+                    "Webhook %s %s failed (attempt %d), retry at %s: %s",
+                    row.event, row.event_id, row.attempts, next_at, e,
+                )
+            LiveKitWebhookEvent.objects.filter(pk=event_pk).update(
+                status=status,
+                next_attempt_at=next_at,
+                locked_at=None,
+                last_error=str(e)[:2000],
+            )
+            return
+
+        LiveKitWebhookEvent.objects.filter(pk=event_pk).update(
+            status=LiveKitWebhookEvent.STATUS_DONE,
+            locked_at=None,
+            processed_at=timezone.now(),
+            last_error="",
+        )
+    except Exception as e:
+        logger.error("process_event [%s]: %s", event_pk, e)
+    finally:
+        close_old_connections()
+
+
+# ──────────────────────────────────────────────────────
+# PERIODIC DRAIN (APScheduler, every 30s)
+# ──────────────────────────────────────────────────────
+
+def drain_due_events(limit: int = DRAIN_BATCH_SIZE) -> int:
+    """Re-submit due PENDING events. Returns how many were handed to the pool."""
+    from calls.models import LiveKitWebhookEvent
+
+    now = timezone.now()
+
+    # Worker died mid-event (deploy/restart) → make it claimable again
+    LiveKitWebhookEvent.objects.filter(
+        status=LiveKitWebhookEvent.STATUS_PROCESSING,
+        locked_at__lt=now - timedelta(minutes=STALE_LOCK_MINUTES),
+    ).update(status=LiveKitWebhookEvent.STATUS_PENDING, locked_at=None)
+
+    due = list(
+        LiveKitWebhookEvent.objects
+        .filter(status=LiveKitWebhookEvent.STATUS_PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+    submitted = 0
+    for pk in due:
+        if not _submit(pk):
+            break
+        submitted += 1
+
+    LiveKitWebhookEvent.objects.filter(
+        status=LiveKitWebhookEvent.STATUS_DONE,
+        processed_at__lt=now - timedelta(days=LiveKitWebhookEvent.RETENTION_DAYS),
+    ).delete()
+
+    if submitted:
+        logger.info("Webhook drain: %d events submitted", submitted)
+    return submitted
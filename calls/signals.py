@@ -0,0 +1,19 @@
+"""
+Booking → call chat cache invalidation.
+
+CallChatConsumer caches "may this user join the batch room" per
+(slot, user); any saved Booking on a batch slot drops that entry. Bulk
+queryset.update() bypasses this — call invalidate_batch_membership().
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bookings.models import Booking
+from calls.services.chat_state import invalidate_batch_membership
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_chat_membership(sender, instance, **kwargs):
+    if instance.is_batch:
+        invalidate_batch_membership([(instance.slot_id, instance.user_id)])
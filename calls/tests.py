@@ -1,3 +1,175 @@
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.models import Booking, ExpertSlot
+from .models import CallRecording, CallRoom
+
+
+class MyCallRoomsQueryCountTests(TestCase):
+    """
+    GET /api/v1/calls/my/ runs one query per branch (user, advisor, batch
+    slot), however many rooms are on the page.
+    """
+    url = "/api/v1/calls/my/"
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username="caller", email="caller@example.com", password="x")
+        cls.advisor = User.objects.create_user(username="advisor", email="advisor@example.com", password="x")
+        others = [
+            User.objects.create_user(username=f"other{i}", email=f"other{i}@example.com", password="x")
+            for i in range(3)
+        ]
+        start = timezone.now() + timedelta(days=1)
+
+        for i, other in enumerate(others):
+            slot = ExpertSlot.objects.create(
+                expert=cls.advisor,
+                start_datetime=start + timedelta(hours=i),
+                end_datetime=start + timedelta(hours=i, minutes=30),
+                duration_minutes=30,
+                video_call_price=100,
+            )
+            booking = Booking.objects.create(
+                user=other if i else cls.user, expert=cls.advisor, slot=slot,
+                start_datetime=slot.start_datetime, end_datetime=slot.end_datetime,
+                duration_minutes=30, price=100, session_type=Booking.SESSION_TYPE_VIDEO_CALL,
+                status=Booking.STATUS_AWAITING_PAYMENT,
+            )
+            CallRoom.objects.create(
+                booking=booking, user=booking.user, advisor=cls.advisor,
+                scheduled_start=slot.start_datetime, scheduled_end=slot.end_datetime,
+            )
+
+        for i in range(2):
+            slot = ExpertSlot.objects.create(
+                expert=cls.advisor,
+                start_datetime=start + timedelta(days=1, hours=i),
+                end_datetime=start + timedelta(days=1, hours=i, minutes=30),
+                duration_minutes=30,
+                slot_mode=ExpertSlot.MODE_BATCH,
+                capacity=5,
+                batch_price=50,
+            )
+            for participant in (cls.user, *others):
+                Booking.objects.create(
+                    user=participant, expert=cls.advisor, slot=slot, is_batch=True,
+                    start_datetime=slot.start_datetime, end_datetime=slot.end_datetime,
+                    duration_minutes=30, price=50, session_type=Booking.SESSION_TYPE_VIDEO_CALL,
+                    status=Booking.STATUS_CONFIRMED,
+                )
+            CallRoom.objects.create(
+                slot=slot, advisor=cls.advisor,
+                scheduled_start=slot.start_datetime, scheduled_end=slot.end_datetime,
+            )
+
+    def _get(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.assertNumQueries(3):
+            response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_user_rooms(self):
+        data = self._get(self.user)
+        self.assertEqual(len(data["results"]), 3)  # own one-to-one room + both batch rooms
+        self.assertIsNone(data["next"])
+
+    def test_advisor_rooms(self):
+        data = self._get(self.advisor)
+        self.assertEqual(len(data["results"]), 5)
+        self.assertIsNone(data["next"])
+
+
+# close_old_connections() would drop the test's transaction on a real server
+@mock.patch("calls.services.recording_upload.close_old_connections")
+class RecordingUploadTranscodeTests(TestCase):
+    """A failed ffmpeg run is recorded once; the upload retry skips it."""
+
+    def setUp(self):
+        User = get_user_model()
+        user = User.objects.create_user(username="rec", email="rec@example.com", password="x")
+        advisor = User.objects.create_user(username="recadv", email="recadv@example.com", password="x")
+        room = CallRoom.objects.create(user=user, advisor=advisor)
+        scratch = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
+        scratch.write(os.urandom(1024))
+        scratch.close()
+        self.addCleanup(lambda: os.path.exists(scratch.name) and os.remove(scratch.name))
+        self.rec = CallRecording.objects.create(
+            room=room, status=CallRecording.STATUS_UPLOADING, local_file_path=scratch.name,
+        )
+
+    @mock.patch("calls.services.recording_upload.cloudinary.uploader.upload_large",
+                side_effect=RuntimeError("cloudinary down"))
+    @mock.patch("calls.services.livekit_service._configure_cloudinary")
+    @mock.patch("calls.services.recording_transcode.ffmpeg_available", return_value=True)
+    @mock.patch("calls.services.recording_transcode.build_command",
+                side_effect=RuntimeError("ffmpeg timed out"))
+    def test_failed_transcode_is_not_retried(self, build_command, *_):
+        from calls.services.recording_upload import upload_recording
+
+        with self.settings(RECORDING_TRANSCODE_PROFILE="faststart"):
+            self.assertFalse(upload_recording(self.rec.id))
+            self.rec.refresh_from_db()
+            self.assertEqual(self.rec.transcode_profile, "failed")
+            self.assertIsNone(self.rec.upload_locked_at)
+
+            CallRecording.objects.filter(id=self.rec.id).update(next_upload_at=None)
+            upload_recording(self.rec.id)
+        self.assertEqual(build_command.call_count, 1)
+        self.rec.refresh_from_db()
+        self.assertEqual(self.rec.upload_attempts, 2)
+
+
+class AttendanceRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username="att", email="att@example.com", password="x")
+        cls.advisor = User.objects.create_user(username="attadv", email="attadv@example.com", password="x")
+        cls.admin = User.objects.create_superuser(username="attadmin", email="attadmin@example.com", password="x")
+        cls.room = CallRoom.objects.create(user=cls.user, advisor=cls.advisor)
+
+    def _participant(self, sid, user, joined_at):
+        return mock.Mock(sid=sid, identity=str(user.id), joined_at=int(joined_at.timestamp()))
+
+    def test_out_of_order_joins_count_one_participant(self):
+        from calls.models import CallAttendance
+        from calls.services.attendance import record_join
+
+        first = timezone.now() - timedelta(minutes=30)
+        later = first + timedelta(minutes=10)
+        # the reconnect's webhook is processed before the original join's
+        record_join(self.room, self._participant("PA_2", self.user, later), later)
+        record_join(self.room, self._participant("PA_1", self.user, first), first)
+
+        attendance = CallAttendance.objects.get(room=self.room)
+        self.assertEqual((attendance.participants, attendance.reconnects, attendance.sessions), (1, 1, 2))
+        self.assertEqual(attendance.first_joined_at, first.replace(microsecond=0))
+
+    def test_early_morning_session_lands_on_the_local_day(self):
+        from calls.models import AdvisorCallStats
+        from calls.services.attendance import record_join
+
+        with timezone.override("Asia/Kolkata"):
+            # 02:00 IST is 20:30 UTC the previous day
+            joined = timezone.make_aware(timezone.datetime(2026, 3, 10, 2, 0))
+            record_join(self.room, self._participant("PA_3", self.advisor, joined), joined)
+            stats = AdvisorCallStats.objects.get(advisor=self.advisor)
+        self.assertEqual(stats.date.isoformat(), "2026-03-10")
 
-# Create your tests here.
+    def test_non_numeric_advisor_id_is_a_400(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        for url in ("/api/v1/calls/admin/attendance/rooms/", "/api/v1/calls/admin/attendance/advisors/"):
+            self.assertEqual(client.get(url, {"advisor_id": "abc"}).status_code, 400)
+            self.assertEqual(client.get(url, {"advisor_id": self.advisor.id}).status_code, 200)
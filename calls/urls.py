@@ -7,6 +7,8 @@ from .views import (
     MuteAllParticipantsView, RemoveParticipantView,
     LiveKitWebhookView,
     AdminCallRecordingListView, AdminCallRecordingSignedUrlView,
+    AdminRecordingUploadStatsView, AdminSchedulerMetricsView,
+    AdminRoomAttendanceView, AdminAdvisorAttendanceView,
 )
 
 urlpatterns = [
@@ -29,6 +31,14 @@ urlpatterns = [
     # ── Admin ─────────────────────────────────────────────
     path("admin/recordings/",
          AdminCallRecordingListView.as_view(), name="admin-call-recordings"),
+    path("admin/recordings/upload-stats/",
+         AdminRecordingUploadStatsView.as_view(), name="admin-recording-upload-stats"),
     path("admin/recordings/<uuid:recording_id>/signed-url/",
          AdminCallRecordingSignedUrlView.as_view(), name="admin-recording-signed-url"),
+    path("admin/attendance/rooms/",
+         AdminRoomAttendanceView.as_view(), name="admin-attendance-rooms"),
+    path("admin/attendance/advisors/",
+         AdminAdvisorAttendanceView.as_view(), name="admin-attendance-advisors"),
+    path("admin/scheduler/",
+         AdminSchedulerMetricsView.as_view(), name="admin-scheduler-metrics"),
 ]
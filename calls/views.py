@@ -1,7 +1,6 @@
 import logging
 
 from django.conf import settings
-from django.db.models import Q
 from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -9,7 +8,7 @@ from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import CallRoom, CallMessage, CallNote, CallRecording
+from .models import CallRoom, CallMessage, CallNote, CallRecording, CallAttendance
 from .serializers import (
     CallRoomSerializer,
     CallMessageSerializer,
@@ -53,34 +52,46 @@ def _get_room_for_user(room_id, user):
 # USER-FACING VIEWS
 # ─────────────────────────────────────────────
 
-class MyCallRoomsView(generics.ListAPIView):
+class MyCallRoomsView(APIView):
     """
-    GET /api/v1/calls/my/
-    Returns all CallRooms where the authenticated user is either
-    the user or the advisor, newest first.
+    GET /api/v1/calls/my/?status=ACTIVE,WAITING&page_size=20&cursor=<next>
+    Returns CallRooms where the authenticated user is the user, the advisor,
+    or holds a confirmed booking on the batch slot — newest first, keyset
+    paginated. Each branch is its own indexed query (see MergedKeysetPagination).
     """
-    serializer_class   = CallRoomSerializer
     permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
-        user = self.request.user
+    def get(self, request):
         from bookings.models import Booking
-        # One-to-one rooms (user or advisor) + batch rooms the user has a
-        # confirmed booking on.
+        from .pagination import MergedKeysetPagination
+
+        user = request.user
+        rooms = CallRoom.objects.select_related("user", "advisor")
+
+        statuses = [
+            s for s in request.query_params.get("status", "").upper().split(",")
+            if s in dict(CallRoom.STATUS_CHOICES)
+        ]
+        if statuses:
+            rooms = rooms.filter(status__in=statuses)
+
         batch_slot_ids = Booking.objects.filter(
             user=user,
             is_batch=True,
             status=Booking.STATUS_CONFIRMED,
-        ).values_list("slot_id", flat=True)
-        return (
-            CallRoom.objects
-            .filter(
-                Q(user=user)
-                | Q(advisor=user)
-                | Q(slot_id__in=batch_slot_ids)
-            )
-            .order_by("-created_at")
+        ).values("slot_id")
+
+        paginator = MergedKeysetPagination()
+        page = paginator.paginate_branches(
+            [
+                rooms.filter(user=user),
+                rooms.filter(advisor=user),
+                rooms.filter(slot_id__in=batch_slot_ids),
+            ],
+            request,
         )
+        serializer = CallRoomSerializer(page, many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
 
 
 class MyCallNotesView(generics.ListAPIView):
@@ -282,6 +293,7 @@ class CallMessageListView(generics.ListAPIView):
     """
     GET /api/v1/calls/<uuid:room_id>/messages/
     Returns all chat messages for a call room.
+    Optional ?before= / ?after= / ?around=<message_id> return a keyset window.
     """
     serializer_class   = CallMessageSerializer
     permission_classes = [IsAuthenticated]
@@ -292,6 +304,19 @@ class CallMessageListView(generics.ListAPIView):
             return CallMessage.objects.none()
         return room.call_messages.select_related("sender").order_by("created_at")
 
+    def list(self, request, *args, **kwargs):
+        # ?before= / ?after= / ?around= → keyset window (search jump links);
+        # no params → full history as before.
+        from chat.pagination import MessageWindowPagination
+
+        paginator = MessageWindowPagination()
+        if not paginator.is_requested(request):
+            return super().list(request, *args, **kwargs)
+
+        page, meta = paginator.paginate(self.get_queryset(), request)
+        serializer = self.get_serializer(page, many=True)
+        return Response({"results": serializer.data, **meta})
+
 
 class CallFileUploadView(APIView):
     """
@@ -386,6 +411,9 @@ class LiveKitWebhookView(APIView):
     POST /api/v1/calls/livekit/webhook/
     Receives events from LiveKit server (egress_ended, room_finished, etc.).
     No JWT auth — verified via LiveKit signature.
+
+    Only verifies + stores the event (idempotent on event id) and returns;
+    processing happens on the webhook queue workers.
     """
     authentication_classes = []
     permission_classes     = []
@@ -395,17 +423,21 @@ class LiveKitWebhookView(APIView):
         raw_body    = request.body
 
         try:
-            from calls.services.livekit_service import handle_livekit_webhook
-            event_name = handle_livekit_webhook(
+            from calls.services.webhook_queue import enqueue_webhook
+            result = enqueue_webhook(
                 raw_body=raw_body,
                 auth_header=auth_header,
             )
-            if event_name is None:
+            if result is None:
                 return Response(
                     {"message": "Webhook verification failed."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            return Response({"event": event_name}, status=status.HTTP_200_OK)
+            event_name, created = result
+            return Response(
+                {"event": event_name, "duplicate": not created},
+                status=status.HTTP_200_OK,
+            )
 
         except Exception as e:
             logger.error("LiveKitWebhookView error: %s", e)
@@ -497,4 +529,119 @@ class AdminCallRecordingSignedUrlView(APIView):
             return Response(
                 {"message": "Internal error."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
\ No newline at end of file
+            )
+
+
+class AdminRecordingUploadStatsView(APIView):
+    """
+    GET /api/v1/calls/admin/recordings/upload-stats/?hours=24
+    Admin: upload backlog + throughput of the recording upload worker.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        from calls.services.recording_upload import upload_stats
+
+        try:
+            hours = max(1, min(int(request.query_params.get("hours", 24)), 24 * 30))
+        except ValueError:
+            hours = 24
+        return Response(upload_stats(hours=hours))
+
+
+def _advisor_id_param(request):
+    """(advisor_id or None, 400 response or None) from ?advisor_id=."""
+    raw = request.query_params.get("advisor_id")
+    if not raw:
+        return None, None
+    try:
+        return int(raw), None
+    except ValueError:
+        return None, Response(
+            {"message": "advisor_id must be an integer."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class AdminRoomAttendanceView(APIView):
+    """
+    GET /api/v1/calls/admin/attendance/rooms/?days=30&advisor_id=<id>
+    Admin: per-room attendance rollups (participants, reconnects, minutes).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            days = max(1, min(int(request.query_params.get("days", 30)), 366))
+        except ValueError:
+            days = 30
+
+        advisor_id, error = _advisor_id_param(request)
+        if error:
+            return error
+
+        rows = (
+            CallAttendance.objects
+            .filter(first_joined_at__gte=timezone.now() - timezone.timedelta(days=days))
+            .select_related("room__advisor")
+            .order_by("-first_joined_at")
+        )
+        if advisor_id:
+            rows = rows.filter(room__advisor_id=advisor_id)
+
+        data = [
+            {
+                "room_id":             str(a.room_id),
+                "advisor":             a.room.advisor.username,
+                "is_batch":            a.room.is_batch,
+                "room_status":         a.room.status,
+                "participants":        a.participants,
+                "sessions":            a.sessions,
+                "reconnects":          a.reconnects,
+                "participant_minutes": round(a.participant_seconds / 60, 1),
+                "advisor_minutes":     round(a.advisor_seconds / 60, 1),
+                "first_joined_at":     a.first_joined_at,
+                "last_left_at":        a.last_left_at,
+            }
+            for a in rows[:500]
+        ]
+        return Response(data)
+
+
+class AdminAdvisorAttendanceView(APIView):
+    """
+    GET /api/v1/calls/admin/attendance/advisors/?days=30&advisor_id=<id>
+    Admin: per-advisor totals over the last `days` (from daily rollups).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        from calls.services.attendance import advisor_totals
+
+        try:
+            days = max(1, min(int(request.query_params.get("days", 30)), 366))
+        except ValueError:
+            days = 30
+
+        advisor_id, error = _advisor_id_param(request)
+        if error:
+            return error
+
+        totals = advisor_totals(days=days, advisor_id=advisor_id)
+        for t in totals:
+            t["participant_minutes"] = round(t.pop("participant_seconds") / 60, 1)
+            t["advisor_minutes"]     = round(t.pop("advisor_seconds") / 60, 1)
+            t["advisor"]             = t.pop("advisor__username")
+        return Response({"days": days, "advisors": totals})
+
+
+class AdminSchedulerMetricsView(APIView):
+    """
+    GET /api/v1/calls/admin/scheduler/
+    Admin: scheduler leader heartbeat, per-job lag/duration/errors, overdue jobs.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        from calls.services.scheduler import scheduler_metrics
+        return Response(scheduler_metrics())
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from chat.services.archive import archive_old_messages
+
+
+class Command(BaseCommand):
+    help = "Move chat messages (and their read receipts) older than CHAT_ARCHIVE_AFTER_DAYS into the compressed archive table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--max-batches", type=int, default=None,
+            help="Stop after N batches (the next run resumes where this one stopped).",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        self.stdout.write("Starting chat archive...")
+        result = archive_old_messages(
+            older_than_days=options["older_than_days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+            dry_run=options["dry_run"],
+        )
+        verb = "would be archived" if options["dry_run"] else "archived"
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {result['archived']} messages {verb} "
+            f"(cutoff {result['cutoff']:%Y-%m-%d %H:%M}, "
+            f"{result['batches']} batches, {result['seconds']}s)."
+        ))
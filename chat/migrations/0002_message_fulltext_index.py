@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Add a MySQL/MariaDB FULLTEXT index on chat message text so history
+    search can use MATCH ... AGAINST instead of LIKE '%q%' scans. InnoDB keeps
+    the index current on every INSERT, so no separate indexing job is needed.
+
+    Django doesn't model FULLTEXT indexes, so this is a raw ALTER TABLE. The
+    query that uses it lives in chat.services.search.
+    """
+
+    dependencies = [
+        ("chat", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "ALTER TABLE chat_message "
+                "ADD FULLTEXT INDEX chat_message_text_ft (text);"
+            ),
+            reverse_sql=(
+                "ALTER TABLE chat_message DROP INDEX chat_message_text_ft;"
+            ),
+        ),
+    ]
@@ -1,4 +1,8 @@
+import json
+import zlib
+
 from django.db import models
+from django.utils.functional import cached_property
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -77,3 +81,55 @@ class ReadReceipt(models.Model):
 
     def __str__(self):
         return f"{self.user.username} read message {self.message.id}"
+
+
+class ArchivedMessage(models.Model):
+    """
+    Cold storage for chat messages older than CHAT_ARCHIVE_AFTER_DAYS.
+
+    Rows are moved here from Message (with their read receipts) by
+    chat.services.archive in chunked batches, keeping chat_message and
+    chat_readreceipt down to the live working set. `id` is the original
+    Message id, so history paging by id spans both tables seamlessly.
+    Text and read receipts are zlib-compressed JSON in `payload`.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    room = models.ForeignKey(
+        ChatRoom, on_delete=models.CASCADE, related_name="archived_messages"
+    )
+    sender = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="archived_sent_messages"
+    )
+    file = models.FileField(upload_to="chat/files/", blank=True, null=True)
+    timestamp = models.DateTimeField()
+    is_read = models.BooleanField(default=False)
+    payload = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["timestamp"]
+        indexes = [
+            models.Index(fields=["room", "timestamp"]),
+        ]
+
+    def __str__(self):
+        return f"Archived message {self.id} in room {self.room_id}"
+
+    @staticmethod
+    def pack(*, text, read_by):
+        """read_by: list of (user_id, read_at ISO string)."""
+        raw = json.dumps({"text": text or "", "read_by": read_by})
+        return zlib.compress(raw.encode("utf-8"), 6)
+
+    @cached_property
+    def _unpacked(self):
+        return json.loads(zlib.decompress(bytes(self.payload)).decode("utf-8"))
+
+    @property
+    def text(self):
+        return self._unpacked["text"]
+
+    @property
+    def read_by(self):
+        return self._unpacked["read_by"]
@@ -0,0 +1,95 @@
+class MessageWindowPagination:
+    """
+    Opt-in keyset paging for message history (chat rooms and in-call chat).
+
+    Keyed on the auto-increment id, which is monotonic with the message
+    timestamp, so every page is a single indexed range read on (room, id):
+
+        ?before=<id>   older messages, ending just before <id>
+        ?after=<id>    newer messages, starting just after <id>
+        ?around=<id>   a window centred on <id> (used by search jump links)
+        ?limit=<n>     page size (default 50, max 200)
+
+    Requests without any of these params keep the legacy full-history
+    response, so existing clients are unaffected.
+
+    An optional `archive` queryset (chat.ArchivedMessage) is read after the
+    hot table runs out: archived ids are always the oldest prefix of the id
+    space, so concatenating the two reads keeps the order correct and the
+    archive is only touched when a page actually reaches it.
+    """
+
+    default_limit = 50
+    max_limit = 200
+    cursor_params = ("before", "after", "around")
+
+    def is_requested(self, request):
+        return any(p in request.query_params for p in self.cursor_params)
+
+    def _int_param(self, request, name):
+        try:
+            return int(request.query_params.get(name))
+        except (TypeError, ValueError):
+            return None
+
+    def get_limit(self, request):
+        limit = self._int_param(request, "limit") or self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def _read_older(self, sources, below, n):
+        """Up to n rows with id < below (None = newest), newest first."""
+        rows = []
+        for qs in sources:
+            if len(rows) >= n:
+                break
+            bound = rows[-1].id if rows else below
+            if bound is not None:
+                qs = qs.filter(id__lt=bound)
+            rows += list(qs.order_by("-id")[: n - len(rows)])
+        return rows
+
+    def _read_newer(self, sources, from_id, n, inclusive=False):
+        """Up to n rows with id > from_id (>= if inclusive), oldest first."""
+        rows = []
+        for qs in reversed(sources):
+            if len(rows) >= n:
+                break
+            if rows:
+                qs = qs.filter(id__gt=rows[-1].id)
+            elif inclusive:
+                qs = qs.filter(id__gte=from_id)
+            else:
+                qs = qs.filter(id__gt=from_id)
+            rows += list(qs.order_by("id")[: n - len(rows)])
+        return rows
+
+    def paginate(self, queryset, request, archive=None):
+        """
+        Return (messages, meta) — messages oldest first, meta carries the
+        has_older / has_newer flags the client needs to keep scrolling.
+        """
+        sources = [queryset] if archive is None else [queryset, archive]
+        limit = self.get_limit(request)
+        before = self._int_param(request, "before")
+        after = self._int_param(request, "after")
+        around = self._int_param(request, "around")
+
+        if around is not None:
+            half = limit // 2
+            older = self._read_older(sources, around, half + 1)
+            newer = self._read_newer(sources, around, limit - half + 1, inclusive=True)
+            has_older = len(older) > half
+            has_newer = len(newer) > limit - half
+            items = list(reversed(older[:half])) + newer[: limit - half]
+        elif after is not None:
+            newer = self._read_newer(sources, after, limit + 1)
+            has_newer = len(newer) > limit
+            has_older = True
+            items = newer[:limit]
+        else:
+            older = self._read_older(sources, before, limit + 1)
+            has_older = len(older) > limit
+            has_newer = before is not None
+            items = list(reversed(older[:limit]))
+
+        return items, {"has_older": has_older, "has_newer": has_newer}
@@ -29,7 +29,11 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         ]
 
     def get_last_message(self, obj):
-        msg = obj.messages.order_by("-timestamp").first()
+        # a room whose whole history was archived still has a last message
+        msg = (
+            obj.messages.order_by("-timestamp").first()
+            or obj.archived_messages.order_by("-id").first()
+        )
         if not msg:
             return None
         return {
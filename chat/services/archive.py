@@ -0,0 +1,125 @@
+"""
+Chat archival — moves old messages out of the hot tables.
+
+chat_message and chat_readreceipt otherwise grow without bound and every
+room query scans hot and cold rows together. Messages older than
+CHAT_ARCHIVE_AFTER_DAYS are moved into ArchivedMessage (text + read receipts
+compressed into one payload) in chunked batches:
+
+  * each batch is one transaction (insert archive rows, delete receipts,
+    delete messages), so an interrupted run leaves no half-moved batch and
+    simply resumes from the oldest remaining message next time;
+  * batches walk the primary key from the bottom, which is the oldest data
+    (ids are monotonic with timestamps), so each batch is a short PK range.
+
+History reads stay transparent: see read_room_history() and
+chat.pagination.MessageWindowPagination. Archived messages are not covered by
+the FULLTEXT search index (chat.services.search).
+
+Cron (VPS mein add karo):
+  30 3 * * * cd /opt/qkics && docker compose -f docker-compose.prod.yml exec -T django python manage.py archive_chat_messages >> /var/log/qkics_chat_archive.log 2>&1
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _archive_batch(ids):
+    from chat.models import ArchivedMessage, Message, ReadReceipt
+
+    with transaction.atomic():
+        messages = list(
+            Message.objects.select_for_update().filter(id__in=ids).order_by("id")
+        )
+        if not messages:
+            return 0
+
+        receipts = {}
+        for message_id, user_id, read_at in ReadReceipt.objects.filter(
+            message_id__in=ids
+        ).values_list("message_id", "user_id", "read_at"):
+            receipts.setdefault(message_id, []).append([user_id, read_at.isoformat()])
+
+        ArchivedMessage.objects.bulk_create(
+            [
+                ArchivedMessage(
+                    id=m.id,
+                    room_id=m.room_id,
+                    sender_id=m.sender_id,
+                    file=m.file.name if m.file else None,
+                    timestamp=m.timestamp,
+                    is_read=m.is_read,
+                    payload=ArchivedMessage.pack(
+                        text=m.text, read_by=receipts.get(m.id, [])
+                    ),
+                )
+                for m in messages
+            ],
+            ignore_conflicts=True,  # re-run after a crash mid-commit is harmless
+        )
+
+        moved_ids = [m.id for m in messages]
+        ReadReceipt.objects.filter(message_id__in=moved_ids).delete()
+        Message.objects.filter(id__in=moved_ids).delete()
+
+    return len(moved_ids)
+
+
+def archive_old_messages(*, older_than_days=None, batch_size=None, max_batches=None, dry_run=False):
+    """
+    Move messages older than `older_than_days` into ArchivedMessage.
+
+    Returns {"cutoff", "archived", "batches", "seconds"}. With dry_run=True,
+    only counts what would be moved.
+    """
+    from chat.models import Message
+
+    older_than_days = older_than_days or settings.CHAT_ARCHIVE_AFTER_DAYS
+    batch_size = batch_size or settings.CHAT_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+
+    candidates = Message.objects.filter(timestamp__lt=cutoff)
+    started = time.monotonic()
+
+    if dry_run:
+        return {
+            "cutoff": cutoff,
+            "archived": candidates.count(),
+            "batches": 0,
+            "seconds": round(time.monotonic() - started, 2),
+        }
+
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(candidates.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        archived += _archive_batch(ids)
+        batches += 1
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        "Chat archive: %d messages in %d batches (cutoff=%s, %.1fs)",
+        archived, batches, cutoff.isoformat(), elapsed,
+    )
+    return {
+        "cutoff": cutoff,
+        "archived": archived,
+        "batches": batches,
+        "seconds": round(elapsed, 2),
+    }
+
+
+def read_room_history(room):
+    """Full history of a room, archived messages first, oldest → newest."""
+    archived = list(
+        room.archived_messages.select_related("sender").order_by("id")
+    )
+    hot = list(room.messages.select_related("sender").order_by("timestamp"))
+    return archived + hot
@@ -0,0 +1,266 @@
+"""
+Per-user full-text search across consultation history.
+
+Covers permanent chat (chat.Message) and in-call chat (calls.CallMessage).
+Archived chat messages (chat.ArchivedMessage, compressed text) are not
+searched: a hit can only be as old as CHAT_ARCHIVE_AFTER_DAYS.
+Backed by the FULLTEXT indexes from chat/0002 and calls/0004 — InnoDB keeps
+them current on every INSERT, so there is no separate indexing job. When an
+index is missing on an environment, search degrades to a LIKE scan (same
+approach as community.views.SearchPostsView).
+
+Access is always scoped to rooms the user belongs to:
+  chat rooms → user or advisor
+  call rooms → user or advisor, or a CONFIRMED booking on the batch slot
+
+Pages are keyset-paged on (timestamp, source, id), newest first; the
+`next_before` cursor is opaque, so hits that share the last row's
+timestamp are not skipped.
+"""
+import html
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_datetime
+
+SOURCE_CHAT = "chat"
+SOURCE_CALL = "call"
+SOURCES = (SOURCE_CHAT, SOURCE_CALL)
+
+SNIPPET_RADIUS = 60  # characters of context kept on each side of the first hit
+# InnoDB's innodb_ft_min_token_size: shorter words are not in the FULLTEXT
+# index, so `+ab*` would match nothing — they are matched with LIKE instead.
+FT_MIN_TOKEN_SIZE = 3
+
+
+class SearchCursorError(ValueError):
+    pass
+
+# (table, index) → bool. Evaluated once per process; a deploy that adds the
+# index restarts the process, re-evaluating it.
+_FULLTEXT_AVAILABLE = {}
+
+
+def _fulltext_available(table, index):
+    key = (table, index)
+    if key not in _FULLTEXT_AVAILABLE:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM information_schema.STATISTICS "
+                    "WHERE table_schema = DATABASE() "
+                    "AND table_name = %s AND index_name = %s",
+                    [table, index],
+                )
+                _FULLTEXT_AVAILABLE[key] = cursor.fetchone()[0] > 0
+        except Exception:
+            _FULLTEXT_AVAILABLE[key] = False
+    return _FULLTEXT_AVAILABLE[key]
+
+
+def _text_match(model, index, tokens, query):
+    """
+    MATCH ... AGAINST when the index exists, LIKE fallback otherwise.
+    Tokens below FT_MIN_TOKEN_SIZE are each matched with LIKE on the rows
+    the indexed tokens already narrowed down.
+    """
+    table = model._meta.db_table
+    indexed = [t for t in tokens if len(t) >= FT_MIN_TOKEN_SIZE]
+    if not indexed or not _fulltext_available(table, index):
+        return Q(text__icontains=query)
+
+    match = Q(
+        pk__in=RawSQL(
+            f"SELECT id FROM {table} "
+            "WHERE MATCH(text) AGAINST (%s IN BOOLEAN MODE)",
+            [" ".join(f"+{t}*" for t in indexed)],
+        )
+    )
+    for t in tokens:
+        if len(t) < FT_MIN_TOKEN_SIZE:
+            match &= Q(text__icontains=t)
+    return match
+
+
+def _encode_cursor(hit):
+    raw = f"{hit['timestamp'].isoformat()}|{hit['source']}|{hit['message_id']}"
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(before):
+    """
+    (timestamp, source, id) from a next_before cursor. A bare ISO
+    timestamp (cursors issued before the keyset) means "strictly older".
+    """
+    try:
+        legacy = parse_datetime(before)
+    except ValueError:
+        raise SearchCursorError("Invalid before cursor.")
+    if legacy is not None:
+        return legacy, None, None
+    try:
+        timestamp, source, pk = urlsafe_b64decode(before.encode()).decode().split("|")
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None or source not in SOURCES:
+            raise ValueError
+        return timestamp, source, int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise SearchCursorError("Invalid before cursor.")
+
+
+def _older_than(cursor, source, field):
+    """Rows of `source` after `cursor` in (timestamp, source, id) descending order."""
+    timestamp, cursor_source, pk = cursor
+    older = Q(**{f"{field}__lt": timestamp})
+    if cursor_source is None or source > cursor_source:
+        return older
+    if source < cursor_source:
+        return older | Q(**{field: timestamp})
+    return older | Q(**{field: timestamp, "id__lt": pk})
+
+
+def _highlight(text, tokens):
+    """
+    Cut a snippet around the first matching token and wrap every token hit
+    in <mark>. Text is HTML-escaped before marking, so the result is safe to
+    render as-is.
+    """
+    text = text or ""
+    if not tokens:
+        return html.escape(text[: SNIPPET_RADIUS * 2])
+
+    pattern = re.compile("|".join(re.escape(t) for t in tokens), re.IGNORECASE)
+    first = pattern.search(text)
+    start = max((first.start() if first else 0) - SNIPPET_RADIUS, 0)
+    end = min((first.end() if first else 0) + SNIPPET_RADIUS, len(text))
+
+    window = text[start:end]
+    parts, last = [], 0
+    for m in pattern.finditer(window):
+        parts.append(html.escape(window[last:m.start()]))
+        parts.append(f"<mark>{html.escape(m.group(0))}</mark>")
+        last = m.end()
+    parts.append(html.escape(window[last:]))
+
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet = snippet + "…"
+    return snippet
+
+
+def _chat_room_ids(user):
+    from chat.models import ChatRoom
+
+    return ChatRoom.objects.filter(Q(user=user) | Q(advisor=user)).values("id")
+
+
+def _call_room_ids(user):
+    from bookings.models import Booking
+    from calls.models import CallRoom
+
+    batch_slot_ids = Booking.objects.filter(
+        user=user,
+        is_batch=True,
+        status=Booking.STATUS_CONFIRMED,
+    ).values("slot_id")
+    return CallRoom.objects.filter(
+        Q(user=user) | Q(advisor=user) | Q(slot_id__in=batch_slot_ids)
+    ).values("id")
+
+
+def _search_chat(user, tokens, query, before, limit):
+    from chat.models import Message
+
+    qs = (
+        Message.objects
+        .filter(room_id__in=_chat_room_ids(user))
+        .filter(_text_match(Message, "chat_message_text_ft", tokens, query))
+        .select_related("sender")
+    )
+    if before:
+        qs = qs.filter(_older_than(before, SOURCE_CHAT, "timestamp"))
+
+    return [
+        {
+            "source": SOURCE_CHAT,
+            "message_id": m.id,
+            "room_id": str(m.room_id),
+            "sender": {"id": m.sender_id, "username": m.sender.username},
+            "timestamp": m.timestamp,
+            "snippet": _highlight(m.text, tokens),
+            "jump": {
+                "room_id": str(m.room_id),
+                "around": m.id,
+                "history_url": f"/api/v1/chat/rooms/{m.room_id}/messages/?around={m.id}",
+            },
+        }
+        for m in qs.order_by("-timestamp", "-id")[:limit]
+    ]
+
+
+def _search_calls(user, tokens, query, before, limit):
+    from calls.models import CallMessage
+
+    qs = (
+        CallMessage.objects
+        .filter(room_id__in=_call_room_ids(user))
+        .filter(_text_match(CallMessage, "call_message_text_ft", tokens, query))
+        .select_related("sender")
+    )
+    if before:
+        qs = qs.filter(_older_than(before, SOURCE_CALL, "created_at"))
+
+    return [
+        {
+            "source": SOURCE_CALL,
+            "message_id": m.id,
+            "room_id": str(m.room_id),
+            "sender": {"id": m.sender_id, "username": m.sender.username},
+            "timestamp": m.created_at,
+            "snippet": _highlight(m.text, tokens),
+            "jump": {
+                "room_id": str(m.room_id),
+                "around": m.id,
+                "history_url": f"/api/v1/calls/{m.room_id}/messages/?around={m.id}",
+            },
+        }
+        for m in qs.order_by("-created_at", "-id")[:limit]
+    ]
+
+
+def search_messages(*, user, query, sources=SOURCES, before=None, limit=20):
+    """
+    Search the user's chat and in-call history, newest first.
+
+    `before` is the `next_before` cursor from a previous page.
+    Returns {"results": [...], "next_before": str | None}; raises
+    SearchCursorError for a malformed cursor.
+    """
+    query = (query or "").strip()
+    tokens = re.findall(r"\w+", query)
+    if not query:
+        return {"results": [], "next_before": None}
+
+    cursor = _decode_cursor(before) if before else None
+
+    # Each source is fetched with the same limit, then merged — the page is
+    # the newest `limit` hits overall.
+    hits = []
+    if SOURCE_CHAT in sources:
+        hits += _search_chat(user, tokens, query, cursor, limit + 1)
+    if SOURCE_CALL in sources:
+        hits += _search_calls(user, tokens, query, cursor, limit + 1)
+
+    hits.sort(key=lambda h: (h["timestamp"], h["source"], h["message_id"]), reverse=True)
+    page = hits[:limit]
+    next_before = _encode_cursor(page[-1]) if len(hits) > limit else None
+
+    for h in page:
+        h["timestamp"] = h["timestamp"].isoformat()
+
+    return {"results": page, "next_before": next_before}
@@ -1,3 +1,75 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import ChatRoom, Message
+
+
+# FULLTEXT rows only become visible to MATCH after commit, and TestCase never
+# commits: run the searches on the LIKE fallback.
+@mock.patch("chat.services.search._fulltext_available", return_value=False)
+class MessageSearchPagingTests(TestCase):
+    url = "/api/v1/chat/search/"
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username="searcher", email="searcher@example.com", password="x")
+        advisor = User.objects.create_user(username="adv", email="adv@example.com", password="x")
+        room = ChatRoom.objects.create(user=cls.user, advisor=advisor)
+        Message.objects.bulk_create([
+            Message(room=room, sender=advisor, text=f"budget review {i}") for i in range(5)
+        ])
+        # every hit on the same timestamp: a timestamp-only cursor would lose them
+        Message.objects.filter(room=room).update(timestamp=timezone.now())
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_through_hits_sharing_a_timestamp(self, _):
+        seen, before = [], None
+        for _page in range(5):
+            params = {"q": "budget", "limit": 2, **({"before": before} if before else {})}
+            data = self.client.get(self.url, params).json()
+            seen += [hit["message_id"] for hit in data["results"]]
+            before = data["next_before"]
+            if before is None:
+                break
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_short_tokens_are_matched_with_like(self, fulltext_available):
+        from chat.services.search import _text_match
+
+        fulltext_available.return_value = True
+        match = _text_match(Message, "chat_message_text_ft", ["budget", "q3"], "budget q3")
+        sql = str(Message.objects.filter(match).query)
+        self.assertIn("+budget*", str(match))
+        self.assertNotIn("+q3*", str(match))
+        self.assertIn("LIKE", sql)
+
+    def test_invalid_cursor_is_a_400(self, _):
+        for before in ("2024-13-45T00:00", "not-a-cursor"):
+            response = self.client.get(self.url, {"q": "budget", "before": before})
+            self.assertEqual(response.status_code, 400)
+
+
+class ChatRoomLastMessageTests(TestCase):
+    def test_last_message_falls_back_to_the_archive(self):
+        from .models import ArchivedMessage
+        from .serializers import ChatRoomSerializer
 
-# Create your tests here.
+        User = get_user_model()
+        user = User.objects.create_user(username="old", email="old@example.com", password="x")
+        advisor = User.objects.create_user(username="oldadv", email="oldadv@example.com", password="x")
+        room = ChatRoom.objects.create(user=user, advisor=advisor)
+        ArchivedMessage.objects.create(
+            id=1, room=room, sender=advisor, timestamp=timezone.now(),
+            payload=ArchivedMessage.pack(text="see you next week", read_by=[]),
+        )
+        last = ChatRoomSerializer(room).data["last_message"]
+        self.assertEqual((last["text"], last["sender"]), ("see you next week", "oldadv"))
@@ -1,8 +1,14 @@
 from django.urls import path
-from .views import ChatRoomListView, ChatRoomMessagesView, MarkRoomAsReadView
+from .views import (
+    ChatRoomListView,
+    ChatRoomMessagesView,
+    MarkRoomAsReadView,
+    MessageSearchView,
+)
 
 urlpatterns = [
     path("rooms/", ChatRoomListView.as_view(), name="chat-room-list"),
+    path("search/", MessageSearchView.as_view(), name="chat-message-search"),
     path(
         "rooms/<int:room_id>/messages/",
         ChatRoomMessagesView.as_view(),
@@ -7,6 +7,9 @@ from django.shortcuts import get_object_or_404
 from rest_framework import status
 from .models import ChatRoom, Message, ReadReceipt
 from .serializers import ChatRoomSerializer, MessageSerializer
+from .pagination import MessageWindowPagination
+from .services.archive import read_room_history
+from .services.search import SearchCursorError, search_messages, SOURCES
 from django.db.models import Q
 
 
@@ -35,7 +38,22 @@ class ChatRoomMessagesView(APIView):
             )
         )
 
-        messages = room.messages.all().order_by("timestamp")
+        # ?before= / ?after= / ?around= → keyset window (search jump links);
+        # no params → full history as before. Both read through to the
+        # archive table for messages moved out by archive_chat_messages.
+        paginator = MessageWindowPagination()
+        if paginator.is_requested(request):
+            page, meta = paginator.paginate(
+                room.messages.select_related("sender"),
+                request,
+                archive=room.archived_messages.select_related("sender"),
+            )
+            serializer = MessageSerializer(
+                page, many=True, context={"request": request}
+            )
+            return Response({"results": serializer.data, **meta})
+
+        messages = read_room_history(room)
 
         serializer = MessageSerializer(
             messages,
@@ -46,6 +64,51 @@ class ChatRoomMessagesView(APIView):
         return Response(serializer.data)
 
 
+class MessageSearchView(APIView):
+    """
+    GET /api/v1/chat/search/?q=<text>&source=chat|call&before=<next_before>&limit=<n>
+
+    Full-text search over the user's own chat and in-call messages.
+    Chat messages moved to the archive (archive_chat_messages) are not searched.
+    Each hit carries a highlighted snippet and a `jump` link into the room
+    history (?around=<message_id>).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {"status": "error", "message": "q is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        source = request.query_params.get("source")
+        sources = (source,) if source in SOURCES else SOURCES
+
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, 50))
+
+        try:
+            results = search_messages(
+                user=request.user,
+                query=query,
+                sources=sources,
+                before=request.query_params.get("before"),
+                limit=limit,
+            )
+        except SearchCursorError as e:
+            return Response(
+                {"status": "error", "message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(results)
+
+
 class MarkRoomAsReadView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -2,6 +2,7 @@ import logging
 import requests
 
 from django.conf import settings
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -184,6 +185,103 @@ def send_notification(
     return None
 
 
+def send_notifications(items):
+    """
+    Batch form of send_notification() for sweepers that notify many users
+    at once.
+
+    Same three steps, but: one INSERT for all local rows, one pooled HTTP
+    session for the external calls, and one UPDATE per outcome instead of
+    one per notification.
+
+    Args:
+        items: list of dicts with send_notification's keyword arguments.
+
+    Returns:
+        int: notifications accepted by the external service.
+    """
+    import uuid as uuid_lib
+    from notifications.models import Notification
+
+    if not items:
+        return 0
+
+    rows = []
+    for item in items:
+        rows.append(Notification(
+            uuid=uuid_lib.uuid4(),  # bulk_create doesn't return ids on MySQL; rows are tracked by uuid
+            user_id=item["user_id"],
+            event=item["event"],
+            title=item["title"],
+            body=item["body"],
+            channels=item.get("channels") or settings.DEFAULT_CHANNELS,
+            data=item.get("data") or {},
+            status=Notification.STATUS_PENDING,
+        ))
+    try:
+        Notification.objects.bulk_create(rows, batch_size=500)
+    except Exception as e:
+        logger.error("Failed to save %d notifications to local DB: %s", len(rows), str(e))
+        rows = [None] * len(items)
+
+    def _mark(uuids, **fields):
+        uuids = [u for u in uuids if u]
+        if uuids:
+            Notification.objects.filter(uuid__in=uuids).update(updated_at=timezone.now(), **fields)
+
+    if not settings.NOTIFICATION_API_KEY:
+        logger.warning(
+            "NOTIFICATION_API_KEY is not set. %d notifications saved to DB but not sent externally.",
+            len(items),
+        )
+        _mark(
+            [row.uuid for row in rows if row],
+            status=Notification.STATUS_FAILED,
+            failure_reason="NOTIFICATION_API_KEY not configured",
+        )
+        return 0
+
+    sent, failed = [], {}
+    with requests.Session() as session:
+        session.headers.update(_headers())
+        for item, row in zip(items, rows):
+            user_payload = {"id": str(item["user_id"])}
+            if item.get("user_email"):
+                user_payload["email"] = item["user_email"]
+            if item.get("user_mobile"):
+                user_payload["mobile"] = item["user_mobile"]
+
+            payload = {
+                "event": item["event"],
+                "user": user_payload,
+                "channels": item.get("channels") or settings.DEFAULT_CHANNELS,
+                "title": item["title"],
+                "body": item["body"],
+            }
+            if item.get("data"):
+                payload["data"] = item["data"]
+
+            try:
+                response = session.post(
+                    f"{settings.NOTIFICATION_SERVICE_URL}/api/notifications/send",
+                    json=payload,
+                    timeout=10,
+                )
+                if response.ok:
+                    sent.append(row.uuid if row else None)
+                    continue
+                reason = f"HTTP {response.status_code}: {response.text[:500]}"
+            except requests.exceptions.RequestException as e:
+                reason = str(e)[:500]
+            logger.error("Notification service error for event %s: %s", item["event"], reason)
+            failed.setdefault(reason, []).append(row.uuid if row else None)
+
+    _mark(sent, status=Notification.STATUS_SENT)
+    for reason, uuids in failed.items():
+        _mark(uuids, status=Notification.STATUS_FAILED, failure_reason=reason)
+    return len(sent)
+
+
 # ─────────────────────────────────────────────────────────────
 # PUSH TOKEN MANAGEMENT
 # These still go directly to external service
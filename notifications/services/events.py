@@ -1,5 +1,8 @@
 import threading
-from .client import send_notification
+
+from django.utils import timezone
+
+from .client import send_notification, send_notifications
 
 
 def _async(fn, *args, **kwargs):
@@ -198,17 +201,12 @@ def notify_booking_cancelled(booking, cancelled_by):
     _async(_send)
 
 
-def notify_booking_completed(booking):
-    """
-    Sent to the USER when a session is marked as completed.
-    Also notifies expert as a courtesy.
-    """
+def _booking_completed_messages(booking):
     user = booking.user
     expert = booking.expert
-
-    def _send():
+    return [
         # Notify user
-        send_notification(
+        dict(
             event="BOOKING_COMPLETED",
             user_id=user.id,
             user_email=user.email,
@@ -219,10 +217,9 @@ def notify_booking_completed(booking):
             ),
             channels=["IN_APP", "PUSH"],
             data={"bookingId": str(booking.uuid)},
-        )
-
+        ),
         # Notify expert
-        send_notification(
+        dict(
             event="BOOKING_COMPLETED_EXPERT",
             user_id=expert.id,
             user_email=expert.email,
@@ -233,34 +230,73 @@ def notify_booking_completed(booking):
             ),
             channels=["IN_APP", "PUSH"],
             data={"bookingId": str(booking.uuid)},
-        )
+        ),
+    ]
+
+
+def notify_booking_completed(booking):
+    """
+    Sent to the USER when a session is marked as completed.
+    Also notifies expert as a courtesy.
+    """
+    messages = _booking_completed_messages(booking)
+
+    def _send():
+        for message in messages:
+            send_notification(**message)
 
     _async(_send)
 
 
+def notify_bookings_completed(bookings):
+    """
+    notify_booking_completed for many bookings (booking sweeper):
+    one thread and one batch instead of a thread per booking.
+    Bookings need user and expert loaded (select_related).
+    """
+    messages = [m for booking in bookings for m in _booking_completed_messages(booking)]
+    if messages:
+        _async(send_notifications, messages)
+
+
+def _booking_expired_message(booking):
+    user = booking.user
+    return dict(
+        event="BOOKING_EXPIRED",
+        user_id=user.id,
+        user_email=user.email,
+        title="Booking Expired",
+        body=(
+            f"Your booking on {booking.start_datetime.strftime('%d %b %Y at %H:%M')} "
+            "has expired because no action was taken in time."
+        ),
+        channels=["IN_APP", "PUSH"],
+        data={"bookingId": str(booking.uuid)},
+    )
+
+
 def notify_booking_expired(booking):
     """
     Sent to the USER when a booking expires without action.
     """
-    user = booking.user
+    message = _booking_expired_message(booking)
 
     def _send():
-        send_notification(
-            event="BOOKING_EXPIRED",
-            user_id=user.id,
-            user_email=user.email,
-            title="Booking Expired",
-            body=(
-                f"Your booking on {booking.start_datetime.strftime('%d %b %Y at %H:%M')} "
-                "has expired because no action was taken in time."
-            ),
-            channels=["IN_APP", "PUSH"],
-            data={"bookingId": str(booking.uuid)},
-        )
+        send_notification(**message)
 
     _async(_send)
 
 
+def notify_bookings_expired(bookings):
+    """
+    notify_booking_expired for many bookings (booking sweeper).
+    Bookings need user loaded (select_related).
+    """
+    messages = [_booking_expired_message(booking) for booking in bookings]
+    if messages:
+        _async(send_notifications, messages)
+
+
 def notify_booking_payment_failed(booking):
     """
     Sent to the USER when payment fails for a booking.
@@ -285,6 +321,76 @@ def notify_booking_payment_failed(booking):
     _async(_send)
 
 
+# ============================================================
+# SESSION REMINDERS
+# ============================================================
+
+
+def _time_left_text(start):
+    """Time until `start` in its largest unit: "1 day", "2 hours", "15 minutes"."""
+    minutes = max(round((start - timezone.now()).total_seconds() / 60), 1)
+    if minutes >= 60:
+        hours = round(minutes / 60)
+        n, unit = (round(hours / 24), "day") if hours >= 24 else (hours, "hour")
+    else:
+        n, unit = minutes, "minute"
+    return f"{n} {unit}{'s' if n != 1 else ''}"
+
+
+def _reminder(person, other, session, lead_minutes, *, event, label, data):
+    """lead_minutes is the reminder window; the title says the time actually left."""
+    when = session.start_datetime.strftime('%d %b %Y at %H:%M')
+    with_whom = f" with {other.get_full_name() or other.username}" if other else ""
+    return dict(
+        event=event,
+        user_id=person.id,
+        user_email=person.email,
+        title=f"{label} in {_time_left_text(session.start_datetime)}",
+        body=f"Your {label.lower()}{with_whom} starts on {when}.",
+        channels=["IN_APP", "PUSH"],
+        data={**data, "startDatetime": session.start_datetime.isoformat(), "leadMinutes": lead_minutes},
+    )
+
+
+def booking_reminder_messages(booking, lead_minutes):
+    """User (and, for one-to-one, expert) reminder. Needs user and expert loaded."""
+    data = {"bookingId": str(booking.uuid)}
+    messages = [_reminder(
+        booking.user, booking.expert, booking, lead_minutes,
+        event="SESSION_REMINDER", label="Session", data=data,
+    )]
+    if not booking.is_batch:  # the expert of a batch session gets one reminder per slot
+        messages.append(_reminder(
+            booking.expert, booking.user, booking, lead_minutes,
+            event="SESSION_REMINDER_EXPERT", label="Session", data=data,
+        ))
+    return messages
+
+
+def batch_slot_reminder_messages(slot, lead_minutes):
+    """Expert reminder for a batch session. Needs expert loaded."""
+    return [_reminder(
+        slot.expert, None, slot, lead_minutes,
+        event="SESSION_REMINDER_EXPERT", label="Batch session",
+        data={"slotId": str(slot.uuid)},
+    )]
+
+
+def investor_booking_reminder_messages(booking, lead_minutes):
+    """User and investor reminders. Needs user and investor loaded."""
+    data = {"bookingId": str(booking.uuid)}
+    return [
+        _reminder(
+            booking.user, booking.investor, booking, lead_minutes,
+            event="INVESTOR_SESSION_REMINDER", label="Consultation", data=data,
+        ),
+        _reminder(
+            booking.investor, booking.user, booking, lead_minutes,
+            event="INVESTOR_SESSION_REMINDER", label="Consultation", data=data,
+        ),
+    ]
+
+
 # ============================================================
 # INVESTOR BOOKING NOTIFICATIONS
 # ============================================================
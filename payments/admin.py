@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Payment
+from .models import Payment, PaymentCallback
 
 
 @admin.register(Payment)
@@ -9,7 +9,10 @@ class PaymentAdmin(admin.ModelAdmin):
         'uuid', 'user', 'purpose', 'amount',
         'status_badge', 'gateway', 'reference_id', 'created_at',
     )
-    list_filter = ('purpose', 'status', 'gateway', 'created_at')
+    list_filter = (
+        'purpose', 'status', 'gateway',
+        ('refund_required_at', admin.EmptyFieldListFilter), 'created_at',
+    )
     search_fields = (
         'uuid', 'user__username', 'user__email',
         'reference_id', 'gateway_order_id', 'gateway_payment_id',
@@ -19,7 +22,8 @@ class PaymentAdmin(admin.ModelAdmin):
 
     # uuid is system-generated; reference_id and timestamps are audit field
     readonly_fields = (
-        'uuid', 'reference_id', 'created_at', 'updated_at',
+        'uuid', 'reference_id', 'created_at', 'updated_at', 'fulfilled_at',
+        'refund_required_at',
     )
 
     fieldsets = (
@@ -34,7 +38,10 @@ class PaymentAdmin(admin.ModelAdmin):
             ),
         }),
         ('System', {
-            'fields': ('uuid', 'created_at', 'updated_at'),
+            'fields': (
+                'uuid', 'created_at', 'updated_at', 'fulfilled_at',
+                'refund_required_at',
+            ),
             'classes': ('collapse',),
         }),
     )
@@ -66,3 +73,23 @@ class PaymentAdmin(admin.ModelAdmin):
             status=Payment.STATUS_INITIATED
         ).update(status=Payment.STATUS_FAILED)
         self.message_user(request, f'{updated} payment(s) marked as FAILED.')
+
+
+@admin.register(PaymentCallback)
+class PaymentCallbackAdmin(admin.ModelAdmin):
+    list_display    = ('id', 'txnid', 'status', 'source', 'state', 'attempts', 'received_at', 'processed_at')
+    list_filter     = ('state', 'status', 'source')
+    search_fields   = ('txnid', 'payment__uuid')
+    readonly_fields = ('payment', 'txnid', 'status', 'source', 'payload', 'attempts', 'locked_at',
+                       'last_error', 'received_at', 'processed_at')
+    actions         = ['retry_now']
+
+    @admin.action(description='Retry now')
+    def retry_now(self, request, queryset):
+        from django.utils import timezone
+        n = queryset.exclude(state=PaymentCallback.STATE_PROCESSING).update(
+            state=PaymentCallback.STATE_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f'{n} callback(s) re-queued (picked up within 30s).')
@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-19 05:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_fulfilled(apps, schema_editor):
+    # Payments that already succeeded were fulfilled inline by the old callback path.
+    Payment = apps.get_model("payments", "Payment")
+    Payment.objects.filter(status="SUCCESS", fulfilled_at__isnull=True).update(fulfilled_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_alter_payment_gateway'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='fulfilled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PaymentCallback',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('txnid', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('SUCCESS', 'Success'), ('FAILED', 'Failed')], max_length=20)),
+                ('source', models.CharField(choices=[('SURL', 'Success redirect'), ('FURL', 'Failure redirect'), ('WEBHOOK', 'Webhook')], max_length=10)),
+                ('payload', models.JSONField()),
+                ('state', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('payment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='callbacks', to='payments.payment')),
+            ],
+            options={
+                'ordering': ['-received_at'],
+                'indexes': [models.Index(fields=['state', 'next_attempt_at'], name='payments_pa_state_85e78b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('txnid', 'status'), name='unique_payment_callback')],
+            },
+        ),
+        migrations.RunPython(mark_fulfilled, migrations.RunPython.noop),
+    ]
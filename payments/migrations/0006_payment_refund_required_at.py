@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_payment_callback_inbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='refund_required_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 User = settings.AUTH_USER_MODEL
 
@@ -112,6 +113,12 @@ class Payment(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set (under a row lock) once fulfill_payment() ran for this payment:
+    # a second success callback never fulfils it again.
+    fulfilled_at = models.DateTimeField(null=True, blank=True)
+    # Paid, but what it paid for could no longer be honoured (e.g. the
+    # booking expired and its slot was taken meanwhile): refund by hand.
+    refund_required_at = models.DateTimeField(null=True, blank=True)
 
     # --------------------------------------------------
     # META
@@ -130,3 +137,69 @@ class Payment(models.Model):
             f"Payment {self.uuid} | {self.user} | "
             f"{self.purpose} | {self.amount} | {self.status}"
         )
+
+
+class PaymentCallback(models.Model):
+    """
+    Inbox for gateway callbacks (PayU surl / furl redirects and webhook).
+    The views only verify + store the callback and return;
+    payments.services.callback_queue applies it on a bounded worker pool.
+
+    (txnid, status) is unique: the surl redirect and the webhook reporting
+    the same outcome are stored once and processed once. `status` is the
+    VERIFIED outcome — a callback whose hash doesn't match is stored as
+    FAILED, so it can't take the slot of the genuine success.
+    """
+
+    SOURCE_SURL = "SURL"
+    SOURCE_FURL = "FURL"
+    SOURCE_WEBHOOK = "WEBHOOK"
+
+    SOURCE_CHOICES = (
+        (SOURCE_SURL, "Success redirect"),
+        (SOURCE_FURL, "Failure redirect"),
+        (SOURCE_WEBHOOK, "Webhook"),
+    )
+
+    STATE_PENDING    = "PENDING"     # waiting for a worker (or for next_attempt_at)
+    STATE_PROCESSING = "PROCESSING"  # claimed by a worker
+    STATE_DONE       = "DONE"
+    STATE_FAILED     = "FAILED"      # gave up after PAYMENT_CALLBACK_MAX_ATTEMPTS
+
+    STATE_CHOICES = (
+        (STATE_PENDING,    "Pending"),
+        (STATE_PROCESSING, "Processing"),
+        (STATE_DONE,       "Done"),
+        (STATE_FAILED,     "Failed"),
+    )
+
+    RETENTION_DAYS = 30  # DONE rows older than this are purged by the drain job
+
+    id      = models.BigAutoField(primary_key=True)
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name="callbacks")
+    txnid   = models.CharField(max_length=100)
+    status  = models.CharField(
+        max_length=20,
+        choices=((Payment.STATUS_SUCCESS, "Success"), (Payment.STATUS_FAILED, "Failed")),
+    )
+    source  = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    payload = models.JSONField()  # the gateway's form data, for confirm / fail
+
+    state           = models.CharField(max_length=10, choices=STATE_CHOICES, default=STATE_PENDING)
+    attempts        = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at       = models.DateTimeField(null=True, blank=True)
+    last_error      = models.TextField(blank=True)
+
+    received_at  = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-received_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["txnid", "status"], name="unique_payment_callback"),
+        ]
+        indexes = [models.Index(fields=["state", "next_attempt_at"])]
+
+    def __str__(self):
+        return f"{self.txnid} {self.status} via {self.source} [{self.state}]"
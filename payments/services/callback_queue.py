@@ -0,0 +1,248 @@
+"""
+payments/services/callback_queue.py
+
+Durable queue for PayU callbacks.
+
+PayU reports one payment up to three times — the browser's surl or furl
+redirect and the server webhook — and they race. Confirming, fulfilling
+(booking confirmation, chat / call rooms, seat, notifications) and failing
+all used to run inline in whichever request came first, so the user's
+redirect waited on every downstream service. Now:
+
+  1. View → record_payu_callback(): verify the hash, INSERT into
+     PaymentCallback ((txnid, verified status) unique → the second report
+     of the same outcome is dropped), redirect. One lookup, one INSERT.
+  2. After commit the row id is handed to a bounded ThreadPoolExecutor.
+     If the pool is saturated the row just stays PENDING.
+  3. Worker claims the row with a conditional UPDATE (PENDING →
+     PROCESSING), then applies it with the Payment row locked
+     (SELECT ... FOR UPDATE):
+       * SUCCESS — confirm the payment if needed, fulfill_payment(), set
+         Payment.fulfilled_at. A payment with fulfilled_at is never
+         fulfilled again, whichever callback or process gets there second.
+         Fulfilment's DB writes commit or roll back together with
+         fulfilled_at; everything else it triggers (notifications, LiveKit
+         room creation, calendar refresh) is deferred with on_commit, so
+         an attempt that rolls back and is retried never sends it twice;
+       * FAILED  — fail + release_payment() only while still INITIATED.
+  4. Failure → back to PENDING with exponential backoff; after
+     PAYMENT_CALLBACK_MAX_ATTEMPTS → FAILED (visible in admin).
+  5. drain_due_callbacks() runs every 30s from APScheduler: picks up
+     retries, rows skipped under saturation and rows left PROCESSING by a
+     crashed worker; also purges old DONE rows.
+
+The frontend learns the outcome from the payment status poll, which
+reports the booking once fulfilment has run.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS  = 10 * 60
+STALE_LOCK_MINUTES   = 10   # PROCESSING longer than this = worker died, re-queue
+DRAIN_BATCH_SIZE     = 100
+
+_executor = None
+_slots    = None  # caps queued + running tasks so a burst can't grow the pool's queue
+_lock     = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers  = settings.PAYMENT_CALLBACK_WORKERS
+                _slots   = threading.BoundedSemaphore(workers * 4)
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="payu-callback",
+                )
+    return _executor
+
+
+def _submit(callback_pk) -> bool:
+    """Hand a callback to the pool. False if saturated (drain job picks it up)."""
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        logger.warning("Payment callback pool saturated — callback %s left for drain job", callback_pk)
+        return False
+    future = executor.submit(process_callback, callback_pk)
+    future.add_done_callback(lambda _f: _slots.release())
+    return True
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+# ──────────────────────────────────────────────────────
+# INGEST (request thread)
+# ──────────────────────────────────────────────────────
+
+def record_payu_callback(data: dict, source: str):
+    """
+    Verify + persist a PayU callback. Returns (payment, ok) like
+    PayUPaymentService.verify_callback; payment is None (nothing stored)
+    when no payment matches.
+    """
+    from payments.models import Payment, PaymentCallback
+    from payments.services.payu import PayUPaymentService
+
+    payment, ok = PayUPaymentService().verify_callback(data=data)
+    if payment is None:
+        return None, False
+
+    status = Payment.STATUS_SUCCESS if ok else Payment.STATUS_FAILED
+    txnid = data.get("txnid") or payment.gateway_order_id or str(payment.uuid)
+    try:
+        with transaction.atomic():
+            row = PaymentCallback.objects.create(
+                payment=payment,
+                txnid=txnid,
+                status=status,
+                source=source,
+                payload=data,
+            )
+    except IntegrityError:
+        logger.info("Duplicate PayU callback ignored: %s %s via %s", txnid, status, source)
+        return payment, ok
+
+    transaction.on_commit(lambda: _submit(row.pk))
+    return payment, ok
+
+
+# ──────────────────────────────────────────────────────
+# WORKER
+# ──────────────────────────────────────────────────────
+
+def apply_callback(callback):
+    """
+    Apply one verified callback to its payment. The payment is fulfilled
+    once; fulfilment's side effects run only after this commits.
+    """
+    from payments.models import Payment
+    from payments.services.dispatch import fulfill_payment, release_payment
+    from payments.services.payu import PayUPaymentService
+
+    service = PayUPaymentService()
+    data = callback.payload or {}
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().get(pk=callback.payment_id)
+
+        if callback.status == Payment.STATUS_SUCCESS:
+            if payment.fulfilled_at:
+                return  # the other report of this payment got here first
+            if payment.status != Payment.STATUS_SUCCESS:
+                service.confirm_payment(
+                    payment=payment,
+                    gateway_payment_id=data.get("mihpayid"),
+                    raw=data,
+                )
+            fulfill_payment(payment)
+            payment.fulfilled_at = timezone.now()
+            payment.save(update_fields=["fulfilled_at", "updated_at"])
+        elif payment.status == Payment.STATUS_INITIATED:
+            service.fail_payment(payment=payment, reason=data.get("status"), raw=data)
+            release_payment(payment)
+
+
+def process_callback(callback_pk):
+    """Claim and process one stored callback. Safe to call more than once."""
+    from payments.models import PaymentCallback
+
+    close_old_connections()
+    try:
+        now = timezone.now()
+        claimed = PaymentCallback.objects.filter(
+            pk=callback_pk,
+            state=PaymentCallback.STATE_PENDING,
+            next_attempt_at__lte=now,
+        ).update(
+            state=PaymentCallback.STATE_PROCESSING,
+            attempts=F("attempts") + 1,
+            locked_at=now,
+        )
+        if not claimed:
+            return  # another worker has it, or it's not due yet
+
+        row = PaymentCallback.objects.get(pk=callback_pk)
+
+        try:
+            apply_callback(row)
+        except Exception as e:
+            if row.attempts >= settings.PAYMENT_CALLBACK_MAX_ATTEMPTS:
+                state, next_at = PaymentCallback.STATE_FAILED, row.next_attempt_at
+                logger.error("Payment callback %s %s failed permanently: %s", row.txnid, row.status, e)
+            else:
+                state, next_at = PaymentCallback.STATE_PENDING, timezone.now() + _backoff(row.attempts)
+                logger.warning(
+                    "Payment callback %s %s failed (attempt %d), retry at %s: %s",
+                    row.txnid, row.status, row.attempts, next_at, e,
+                )
+            PaymentCallback.objects.filter(pk=callback_pk).update(
+                state=state,
+                next_attempt_at=next_at,
+                locked_at=None,
+                last_error=str(e)[:2000],
+            )
+            return
+
+        PaymentCallback.objects.filter(pk=callback_pk).update(
+            state=PaymentCallback.STATE_DONE,
+            locked_at=None,
+            processed_at=timezone.now(),
+            last_error="",
+        )
+    except Exception as e:
+        logger.error("process_callback [%s]: %s", callback_pk, e)
+    finally:
+        close_old_connections()
+
+
+# ──────────────────────────────────────────────────────
+# PERIODIC DRAIN (APScheduler, every 30s)
+# ──────────────────────────────────────────────────────
+
+def drain_due_callbacks(limit: int = DRAIN_BATCH_SIZE) -> int:
+    """Re-submit due PENDING callbacks. Returns how many were handed to the pool."""
+    from payments.models import PaymentCallback
+
+    now = timezone.now()
+
+    # Worker died mid-callback (deploy/restart) → make it claimable again
+    PaymentCallback.objects.filter(
+        state=PaymentCallback.STATE_PROCESSING,
+        locked_at__lt=now - timedelta(minutes=STALE_LOCK_MINUTES),
+    ).update(state=PaymentCallback.STATE_PENDING, locked_at=None)
+
+    due = list(
+        PaymentCallback.objects
+        .filter(state=PaymentCallback.STATE_PENDING, next_attempt_at__lte=now)
+        .order_by("next_attempt_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+
+    submitted = 0
+    for pk in due:
+        if not _submit(pk):
+            break
+        submitted += 1
+
+    PaymentCallback.objects.filter(
+        state=PaymentCallback.STATE_DONE,
+        processed_at__lt=now - timedelta(days=PaymentCallback.RETENTION_DAYS),
+    ).delete()
+
+    if submitted:
+        logger.info("Payment callback drain: %d callbacks submitted", submitted)
+    return submitted
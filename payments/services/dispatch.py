@@ -24,3 +24,20 @@ def fulfill_payment(payment: Payment):
         activate_subscription_after_payment(payment=payment)
 
     # DOCUMENT / COMPANY_POST purposes can be wired here later.
+
+
+def release_payment(payment: Payment):
+    """
+    Counterpart of fulfill_payment for a FAILED payment: let go of whatever
+    the purpose was holding for it. Idempotent.
+    """
+    if payment.status != Payment.STATUS_FAILED:
+        return
+
+    if payment.purpose == Payment.PURPOSE_BOOKING:
+        from bookings.models import Booking
+        from bookings.services.seat_holds import release_hold
+
+        booking = Booking.objects.filter(uuid=payment.reference_id, is_batch=True).first()
+        if booking:
+            release_hold(booking)
@@ -1,3 +1,168 @@
-from django.test import TestCase
+import hashlib
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from bookings.models import Booking, ExpertSlot
+from .models import Payment, PaymentCallback
+from .services import callback_queue
+
+SALT = "test-salt"
+
+
+def _payu_post(payment, status="success", *, salt=SALT):
+    """A PayU POST-back for `payment`, signed with `salt`."""
+    data = {
+        "key": "test-key", "txnid": payment.gateway_order_id, "amount": f"{payment.amount:.2f}",
+        "productinfo": f"{payment.purpose}:{payment.reference_id}", "firstname": "Buyer",
+        "email": "buyer@example.com", "status": status, "udf1": str(payment.uuid),
+        "mihpayid": "403993715500000000",
+    }
+    udf = [data.get(f"udf{i}", "") for i in range(1, 11)]
+    fields = [salt, status, *reversed(udf), data["email"], data["firstname"],
+              data["productinfo"], data["amount"], data["txnid"], data["key"]]
+    data["hash"] = hashlib.sha512("|".join(fields).encode()).hexdigest()
+    return data
+
+
+# close_old_connections() would drop the test's transaction on a real server
+@mock.patch("payments.services.callback_queue.close_old_connections")
+@override_settings(PAYU_SALT=SALT, PAYMENT_CALLBACK_MAX_ATTEMPTS=3)
+class PayUCallbackQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username="payer", email="buyer@example.com", password="x")
+        expert = User.objects.create_user(username="payee", email="payee@example.com", password="x")
+        start = timezone.now() + timedelta(days=1)
+        slot = ExpertSlot.objects.create(
+            expert=expert, start_datetime=start, end_datetime=start + timedelta(minutes=30),
+            duration_minutes=30, chat_price=Decimal("100.00"), requires_approval=False,
+        )
+        cls.booking = Booking.objects.create(
+            user=cls.user, expert=expert, slot=slot,
+            start_datetime=slot.start_datetime, end_datetime=slot.end_datetime,
+            duration_minutes=30, price=Decimal("100.00"), session_type=Booking.SESSION_TYPE_CHAT,
+            status=Booking.STATUS_AWAITING_PAYMENT, requires_expert_approval=False,
+        )
+        cls.payment = Payment.objects.create(
+            user=cls.user, purpose=Payment.PURPOSE_BOOKING, reference_id=cls.booking.uuid,
+            amount=Decimal("100.00"), gateway=Payment.GATEWAY_PAYU, gateway_order_id="txn0001",
+        )
+
+    def _callback(self, **fields):
+        return PaymentCallback.objects.create(**{
+            "payment": self.payment, "txnid": self.payment.gateway_order_id,
+            "status": Payment.STATUS_SUCCESS, "source": PaymentCallback.SOURCE_SURL,
+            "payload": _payu_post(self.payment), **fields,
+        })
+
+    def test_surl_and_webhook_race_fulfils_once(self, _):
+        data = _payu_post(self.payment)
+        callback_queue.record_payu_callback(data, PaymentCallback.SOURCE_SURL)
+        callback_queue.record_payu_callback(data, PaymentCallback.SOURCE_WEBHOOK)
+        self.assertEqual(PaymentCallback.objects.count(), 1)  # same outcome stored once
+
+        # a success reported under another txnid still finds the payment fulfilled
+        self._callback(txnid="txn0001-retry", source=PaymentCallback.SOURCE_WEBHOOK)
+        with mock.patch("payments.services.dispatch.fulfill_payment") as fulfill:
+            for row in PaymentCallback.objects.order_by("id"):
+                callback_queue.process_callback(row.pk)
+
+        fulfill.assert_called_once()
+        self.assertEqual(
+            set(PaymentCallback.objects.values_list("state", flat=True)), {PaymentCallback.STATE_DONE},
+        )
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.STATUS_SUCCESS)
+        self.assertIsNotNone(self.payment.fulfilled_at)
+
+    def test_forged_success_is_stored_as_failure(self, _):
+        forged = _payu_post(self.payment, salt="not-the-salt")
+        payment, ok = callback_queue.record_payu_callback(forged, PaymentCallback.SOURCE_SURL)
+
+        self.assertFalse(ok)
+        row = PaymentCallback.objects.get()
+        self.assertEqual(row.status, Payment.STATUS_FAILED)
+        callback_queue.process_callback(row.pk)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, Payment.STATUS_FAILED)
+        self.assertIsNone(payment.fulfilled_at)
+
+        # the forgery didn't take the genuine success's place
+        _payment, ok = callback_queue.record_payu_callback(_payu_post(self.payment), PaymentCallback.SOURCE_WEBHOOK)
+        self.assertTrue(ok)
+        self.assertEqual(PaymentCallback.objects.count(), 2)
+
+    @mock.patch("payments.services.callback_queue.apply_callback", side_effect=RuntimeError("db gone"))
+    def test_failures_back_off_then_give_up(self, _apply, _):
+        row = self._callback()
+
+        callback_queue.process_callback(row.pk)
+        row.refresh_from_db()
+        self.assertEqual((row.state, row.attempts, row.last_error), (PaymentCallback.STATE_PENDING, 1, "db gone"))
+        self.assertGreater(row.next_attempt_at, timezone.now())
+        self.assertIsNone(row.locked_at)
+
+        callback_queue.process_callback(row.pk)  # not due yet: left alone
+        row.refresh_from_db()
+        self.assertEqual(row.attempts, 1)
+
+        for _attempt in (2, 3):
+            PaymentCallback.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+            callback_queue.process_callback(row.pk)
+        row.refresh_from_db()
+        self.assertEqual((row.state, row.attempts), (PaymentCallback.STATE_FAILED, 3))
+
+    @mock.patch("payments.services.callback_queue._submit", return_value=True)
+    def test_drain_requeues_stale_processing_rows(self, submit, _):
+        now = timezone.now()
+        stale = self._callback(
+            state=PaymentCallback.STATE_PROCESSING,
+            locked_at=now - timedelta(minutes=callback_queue.STALE_LOCK_MINUTES + 1),
+            next_attempt_at=now - timedelta(minutes=20),
+        )
+        live = self._callback(
+            txnid="txn0001-live", state=PaymentCallback.STATE_PROCESSING,
+            locked_at=now, next_attempt_at=now - timedelta(minutes=1),
+        )
+
+        self.assertEqual(callback_queue.drain_due_callbacks(), 1)
+        submit.assert_called_once_with(stale.pk)
+        stale.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual((stale.state, stale.locked_at), (PaymentCallback.STATE_PENDING, None))
+        self.assertEqual(live.state, PaymentCallback.STATE_PROCESSING)
+
+    @mock.patch("bookings.services.confirm_booking.notify_booking_confirmed")
+    def test_notifications_wait_for_commit(self, notify, _):
+        with self.captureOnCommitCallbacks() as callbacks:
+            callback_queue.apply_callback(self._callback())
+            notify.assert_not_called()
+        for callback in callbacks:
+            callback()
+        notify.assert_called_once()
+
+    @mock.patch("bookings.services.confirm_booking.notify_booking_confirmed")
+    def test_rolled_back_fulfilment_sends_nothing(self, notify, _):
+        row = self._callback()
+        save = Payment.save
+
+        def failing_save(payment, *args, **kwargs):
+            if "fulfilled_at" in (kwargs.get("update_fields") or ()):
+                raise RuntimeError("fulfilled_at save failed")
+            return save(payment, *args, **kwargs)
+
+        with mock.patch.object(Payment, "save", failing_save), \
+                self.captureOnCommitCallbacks(execute=True):
+            callback_queue.process_callback(row.pk)
+
+        notify.assert_not_called()
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, Booking.STATUS_AWAITING_PAYMENT)
+        row.refresh_from_db()
+        self.assertEqual(row.state, PaymentCallback.STATE_PENDING)
@@ -10,7 +10,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from bookings.models import Booking
-from payments.models import Payment
+from payments.models import Payment, PaymentCallback
 from payments.serializers import (
     FakeBookingPaymentSerializer,
     InitiatePaymentSerializer,
@@ -18,7 +18,6 @@ from payments.serializers import (
 )
 from payments.services.factory import get_payment_service
 from payments.services.dispatch import fulfill_payment
-from payments.services.payu import PayUPaymentService
 from bookings.services.confirm_booking import confirm_booking_after_payment
 from subscriptions.models import SubscriptionPlan, UserSubscription
 from subscriptions.serializers import UserSubscriptionSerializer
@@ -199,8 +198,14 @@ class PaymentStatusView(APIView):
 # ============================================================
 
 
-def _handle_payu_return(request):
-    """Verify PayU's POST-back, fulfil if valid, return (payment, ok)."""
+def _handle_payu_return(request, source):
+    """
+    Verify PayU's POST-back and queue it (payments.services.callback_queue);
+    return (payment, ok). Confirmation and fulfilment run on the callback
+    worker, so the browser is redirected without waiting for them.
+    """
+    from payments.services.callback_queue import record_payu_callback
+
     # PayU posts application/x-www-form-urlencoded. Under DRF, the body is
     # parsed into request.data — request.POST is empty. Read request.data,
     # falling back to POST/query for safety.
@@ -214,37 +219,23 @@ def _handle_payu_return(request):
     logger.info("PayU callback received: keys=%s status=%s txnid=%s",
                 list(data.keys()), data.get("status"), data.get("txnid"))
 
-    service = PayUPaymentService()
-    payment, ok = service.verify_callback(data=data)
+    payment, ok = record_payu_callback(data, source)
 
     if payment is None:
         logger.warning("PayU callback: no matching payment (udf1=%s txnid=%s)",
                        data.get("udf1"), data.get("txnid"))
-        return None, False
-
-    if ok:
-        if payment.status != Payment.STATUS_SUCCESS:
-            service.confirm_payment(
-                payment=payment,
-                gateway_payment_id=data.get("mihpayid"),
-                raw=data,
-            )
-            fulfill_payment(payment)
-    else:
-        if payment.status == Payment.STATUS_INITIATED:
-            service.fail_payment(payment=payment, reason=data.get("status"), raw=data)
     return payment, ok
 
 
 @method_decorator(csrf_exempt, name="dispatch")
 class PayUCallbackSuccessView(APIView):
-    """PayU `surl`. Verifies, fulfils, redirects browser to the frontend."""
+    """PayU `surl`. Verifies, queues, redirects browser to the frontend."""
 
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
 
     def post(self, request):
-        payment, ok = _handle_payu_return(request)
+        payment, ok = _handle_payu_return(request, PaymentCallback.SOURCE_SURL)
         return _redirect_to_frontend(payment, ok)
 
     # PayU may issue a GET on some flows.
@@ -260,7 +251,7 @@ class PayUCallbackFailureView(APIView):
     authentication_classes = []
 
     def post(self, request):
-        payment, ok = _handle_payu_return(request)
+        payment, ok = _handle_payu_return(request, PaymentCallback.SOURCE_FURL)
         return _redirect_to_frontend(payment, ok)
 
     def get(self, request):
@@ -270,15 +261,16 @@ class PayUCallbackFailureView(APIView):
 @method_decorator(csrf_exempt, name="dispatch")
 class PayUWebhookView(APIView):
     """
-    Optional PayU server-to-server webhook. Same verification + idempotent
-    fulfilment as the browser callback; returns plain 200 to PayU.
+    Optional PayU server-to-server webhook. Same verification + queue as
+    the browser callback (the same outcome is processed once, whichever
+    arrives first); returns plain 200 to PayU.
     """
 
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
 
     def post(self, request):
-        _handle_payu_return(request)
+        _handle_payu_return(request, PaymentCallback.SOURCE_WEBHOOK)
         return Response({"status": "ok"}, status=status.HTTP_200_OK)
 
 
@@ -1,5 +1,5 @@
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 # ==================================================
@@ -130,6 +130,18 @@ APScheduler_CONFIG = {
     },
 }
 
+# Jobs run ONLY in `manage.py run_scheduler` (leader-elected, see
+# calls.services.scheduler); web workers just add jobs. Set True to run jobs
+# inside the web process (local dev without a scheduler process).
+SCHEDULER_EMBEDDED    = config("SCHEDULER_EMBEDDED", default=False, cast=bool)
+SCHEDULER_MAX_WORKERS = APScheduler_CONFIG["apscheduler.executors.default"]["OPTIONS"]["max_workers"]
+
+# Auto-cut sweeper (calls.services.auto_cut): rooms per batch, rooms cut in
+# parallel against LiveKit, and how far back overdue rooms are still cut.
+AUTO_CUT_BATCH_SIZE     = config("AUTO_CUT_BATCH_SIZE", default=50, cast=int)
+AUTO_CUT_CONCURRENCY    = config("AUTO_CUT_CONCURRENCY", default=4, cast=int)
+AUTO_CUT_LOOKBACK_HOURS = config("AUTO_CUT_LOOKBACK_HOURS", default=24, cast=int)
+
 
 
 # ==================================================
@@ -210,6 +222,12 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Call chat block sets (calls/services/chat_state.py) — db 1, cache is db 0
+CALLS_REDIS_URL = config(
+    "CALLS_REDIS_URL",
+    default=f"redis://{config('REDIS_HOST', default='127.0.0.1')}:{config('REDIS_PORT', default=6380)}/1",
+)
+
 # ==================================================
 # CHANNELS (Redis)
 # ==================================================
@@ -218,6 +236,14 @@ NOTIFICATION_API_KEY = config("NOTIFICATION_API_KEY", default="")
 
 DEFAULT_CHANNELS = ["IN_APP", "PUSH"]
 
+# ==================================================
+# CHAT ARCHIVE
+# ==================================================
+# Messages older than this move to chat.ArchivedMessage (compressed) via
+# `manage.py archive_chat_messages`. History APIs read both transparently.
+CHAT_ARCHIVE_AFTER_DAYS = config("CHAT_ARCHIVE_AFTER_DAYS", default=180, cast=int)
+CHAT_ARCHIVE_BATCH_SIZE = config("CHAT_ARCHIVE_BATCH_SIZE", default=1000, cast=int)
+
 
 LIVEKIT_URL        = config("LIVEKIT_URL", ...)          # backend → LiveKit API (internal)
 LIVEKIT_PUBLIC_URL = config("LIVEKIT_PUBLIC_URL", default=config("LIVEKIT_URL", ...))  # returned to frontend
@@ -226,10 +252,55 @@ LIVEKIT_API_SECRET = config("LIVEKIT_API_SECRET", ...)
 CLOUDINARY_CLOUD_NAME = config("CLOUDINARY_CLOUD_NAME", ...)
 CLOUDINARY_API_KEY    = config("CLOUDINARY_API_KEY", ...)
 CLOUDINARY_API_SECRET = config("CLOUDINARY_API_SECRET", ...)
+# Blank = real Cloudinary. e.g. http://localhost:8765 for `manage.py fake_cloudinary`
+CLOUDINARY_UPLOAD_PREFIX = config("CLOUDINARY_UPLOAD_PREFIX", default="")
+# Recording upload worker (calls.services.recording_upload)
+RECORDING_UPLOAD_WORKERS      = config("RECORDING_UPLOAD_WORKERS", default=2, cast=int)
+RECORDING_UPLOAD_CHUNK_MB     = config("RECORDING_UPLOAD_CHUNK_MB", default=20, cast=int)
+RECORDING_UPLOAD_MAX_ATTEMPTS = config("RECORDING_UPLOAD_MAX_ATTEMPTS", default=6, cast=int)
+# ffmpeg stage before upload (calls.services.recording_transcode):
+# "faststart" = remux only, "720p" / "480p" = re-encode, "" = off.
+# Skipped automatically if the ffmpeg binary isn't installed.
+RECORDING_TRANSCODE_PROFILE = config("RECORDING_TRANSCODE_PROFILE", default="faststart")
+RECORDING_TRANSCODE_THREADS = config("RECORDING_TRANSCODE_THREADS", default=2, cast=int)
+FFMPEG_BINARY               = config("FFMPEG_BINARY", default="ffmpeg")
+# Shared LiveKit API client (calls.services.livekit_client): pooled HTTP
+# connections per process, and per-call timeout in seconds.
+LIVEKIT_HTTP_POOL_SIZE = config("LIVEKIT_HTTP_POOL_SIZE", default=20, cast=int)
+LIVEKIT_API_TIMEOUT    = config("LIVEKIT_API_TIMEOUT", default=10, cast=int)
+# Webhook queue (calls.services.webhook_queue): worker threads per process,
+# and attempts before an event is marked FAILED.
+LIVEKIT_WEBHOOK_WORKERS      = config("LIVEKIT_WEBHOOK_WORKERS", default=4, cast=int)
+LIVEKIT_WEBHOOK_MAX_ATTEMPTS = config("LIVEKIT_WEBHOOK_MAX_ATTEMPTS", default=6, cast=int)
+# Room provisioning (calls.services.room_provisioning): create_room workers
+# per process, and how long before scheduled_start rooms are re-checked.
+ROOM_PROVISION_WORKERS = config("ROOM_PROVISION_WORKERS", default=2, cast=int)
+ROOM_WARMUP_MINUTES    = config("ROOM_WARMUP_MINUTES", default=10, cast=int)
 TURN_HOST     = config("TURN_HOST", default="")
 TURN_USERNAME = config("TURN_USERNAME", default="")
 TURN_PASSWORD = config("TURN_PASSWORD", default="")
 
+# ==================================================
+# BOOKINGS
+# ==================================================
+# Recurring slots (bookings.services.slot_materializer): days ahead that
+# SlotRecurringPattern rows are expanded into concrete ExpertSlots.
+SLOT_MATERIALIZE_HORIZON_DAYS = config("SLOT_MATERIALIZE_HORIZON_DAYS", default=28, cast=int)
+# Booking sweeper (bookings.services.booking_sweeper): how long an unapproved
+# or unpaid booking holds its slot before it is EXPIRED, and how recent a
+# started payment must be to keep the booking alive past that.
+BOOKING_APPROVAL_TTL_HOURS    = config("BOOKING_APPROVAL_TTL_HOURS", default=24, cast=int)
+BOOKING_PAYMENT_TTL_MINUTES   = config("BOOKING_PAYMENT_TTL_MINUTES", default=30, cast=int)
+BOOKING_PAYMENT_GRACE_MINUTES = config("BOOKING_PAYMENT_GRACE_MINUTES", default=20, cast=int)
+# Batch seat holds (bookings.services.seat_holds): an unpaid seat can be
+# taken by the next buyer after this long.
+BATCH_SEAT_HOLD_MINUTES = config("BATCH_SEAT_HOLD_MINUTES", default=10, cast=int)
+# Session reminders (bookings.services.reminders): how long before a session
+# reminders go out (one per lead), and how many notification batches are
+# sent in parallel.
+SESSION_REMINDER_LEADS_MINUTES = config("SESSION_REMINDER_LEADS_MINUTES", default="1440,15", cast=Csv(int))
+SESSION_REMINDER_CONCURRENCY   = config("SESSION_REMINDER_CONCURRENCY", default=4, cast=int)
+
 # ==================================================
 # PAYMENTS (gateway-agnostic)
 # ==================================================
@@ -255,3 +326,8 @@ PAYU_MODE = config("PAYU_MODE", default="test")
 PAYU_BASE_URL = (
     "https://secure.payu.in" if PAYU_MODE == "prod" else "https://test.payu.in"
 )
+
+# Callback queue (payments.services.callback_queue): worker threads per
+# process, and attempts before a callback is marked FAILED.
+PAYMENT_CALLBACK_WORKERS      = config("PAYMENT_CALLBACK_WORKERS", default=4, cast=int)
+PAYMENT_CALLBACK_MAX_ATTEMPTS = config("PAYMENT_CALLBACK_MAX_ATTEMPTS", default=8, cast=int)
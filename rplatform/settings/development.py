@@ -2,6 +2,9 @@ from .base import *
 
 DEBUG = True
 
+# runserver alone runs scheduled jobs (no separate run_scheduler process)
+SCHEDULER_EMBEDDED = config("SCHEDULER_EMBEDDED", default=True, cast=bool)
+
 ALLOWED_HOSTS = [
     "localhost",
     "127.0.0.1",
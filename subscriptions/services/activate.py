@@ -47,5 +47,6 @@ def activate_subscription_after_payment(*, payment: Payment):
             is_active=True,
         )
 
-    notify_subscription_activated(subscription)
+    # after commit: a rolled-back (and retried) callback must not notify twice
+    transaction.on_commit(lambda: notify_subscription_activated(subscription))
     return subscription